@@ -0,0 +1,233 @@
+//! Reversal of bit sequences whose length is not a multiple of 8.
+//!
+//! A sequence of `nbits` bits fills `nbits.div_ceil(8)` bytes: its first bit is
+//! the most significant bit of byte 0 (`BitOrder::Msb`) or the least significant
+//! one (`BitOrder::Lsb`), and the last `8 * len - nbits` bits of the buffer are
+//! padding. Mirroring the whole buffer with `kernels::reverse_whole` reverses the
+//! sequence but moves the padding to its start, so the result is then shifted
+//! towards the start by the padding, eight bytes at a time. Both steps are done
+//! one tile at a time, so the buffer is traversed once.
+
+use crate::BIT_REVERSE_TABLE;
+use crate::kernels;
+
+/// Position of the first bit of a sequence within each byte.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub(crate) enum BitOrder {
+    /// The first bit is the most significant bit of a byte (`0x80`).
+    Msb,
+    /// The first bit is the least significant bit of a byte (`0x01`).
+    Lsb,
+}
+
+impl BitOrder {
+    pub(crate) fn from_name(name: &str) -> Option<Self> {
+        match name {
+            "msb" => Some(Self::Msb),
+            "lsb" => Some(Self::Lsb),
+            _ => None,
+        }
+    }
+}
+
+/// Number of bytes mirrored and then shifted at a time in place, so the shift
+/// reads them from L1.
+const TILE: usize = 4096;
+
+/// Reverse the sequence of the first `nbits` bits of `src` into `dst`, or of `dst`
+/// in place when `src` is `None`. The padding bits of the result are zero.
+///
+/// `dst` must be `nbits.div_ceil(8)` bytes long.
+pub(crate) fn reverse_bitstream(src: Option<&[u8]>, dst: &mut [u8], nbits: usize, order: BitOrder) {
+    let len = dst.len();
+    debug_assert_eq!(len, nbits.div_ceil(8));
+    let shift = (len * 8 - nbits) as u32;
+    if shift == 0 {
+        kernels::reverse_whole(src, dst);
+        return;
+    }
+    let shift = Shift::new(order, shift);
+    match src {
+        Some(src) => {
+            // Word `k` of the mirrored buffer is source block `k` from the end, so
+            // each word is mirrored and shifted in registers
+            let (blocks, tail) = dst.as_chunks_mut::<8>();
+            let mut words = src.rchunks_exact(8);
+            for (d, &s) in tail.iter_mut().zip(words.remainder().iter().rev()) {
+                *d = BIT_REVERSE_TABLE[s as usize];
+            }
+            let mut words =
+                words.map(|block| u64::from_le_bytes(block.try_into().expect("8-byte block")).reverse_bits());
+            if let Some(mut word) = words.next() {
+                let after_last = u64::from(tail.first().copied().unwrap_or(0));
+                for block in blocks {
+                    let after = words.next().unwrap_or(after_last);
+                    *block = shift.words(word, after).to_le_bytes();
+                    word = after;
+                }
+            }
+            shift.bytes(tail, 0);
+        }
+        None => {
+            // Tiles are swapped from both ends; `next` is the first byte of the
+            // last tail tile before it was shifted, i.e. the byte after the middle.
+            let mut next = 0;
+            let mut buffer = [0u8; TILE];
+            let mut start = 0;
+            while len - 2 * start >= 2 * TILE {
+                let (head, rest) = dst[start..len - start].split_at_mut(TILE);
+                let (middle, tail) = rest.split_at_mut(rest.len() - TILE);
+                buffer.copy_from_slice(head);
+                kernels::reverse_whole(Some(tail), head);
+                kernels::reverse_whole(Some(&buffer), tail);
+                let tail_next = next;
+                next = tail[0];
+                let head_next = middle.last().map_or(next, |&byte| BIT_REVERSE_TABLE[byte as usize]);
+                shift.in_place(head, head_next);
+                shift.in_place(tail, tail_next);
+                start += TILE;
+            }
+            let middle = &mut dst[start..len - start];
+            kernels::reverse_whole(None, middle);
+            shift.in_place(middle, next);
+        }
+    }
+}
+
+/// A move of every bit `shift` (1 to 7) positions towards the start of the
+/// sequence, which drops the first `shift` bits and fills the end with the first
+/// bits of the byte that follows.
+#[derive(Clone, Copy)]
+struct Shift {
+    order: BitOrder,
+    shift: u32,
+    /// Bits of each byte that come from the same byte in the MSB-first order.
+    high: u64,
+}
+
+impl Shift {
+    fn new(order: BitOrder, shift: u32) -> Self {
+        debug_assert!((1..8).contains(&shift));
+        let high = u64::from_ne_bytes([0xFF << shift; 8]);
+        Self { order, shift, high }
+    }
+
+    /// Shift a little-endian word, given the unshifted word after it (of which
+    /// only the first byte may be known).
+    #[inline(always)]
+    fn words(self, word: u64, after: u64) -> u64 {
+        let shift = self.shift;
+        match self.order {
+            // Bytes are shifted left within the word, which needs no byte swap;
+            // the masks keep the bits of each byte from the bytes they belong to
+            BitOrder::Msb => {
+                let following = (word >> 8) | (after << 56);
+                ((word << shift) & self.high) | ((following >> (8 - shift)) & !self.high)
+            }
+            BitOrder::Lsb => (word >> shift) | (after << (64 - shift)),
+        }
+    }
+
+    /// Shift `bytes` one at a time; `next` is the unshifted byte after them.
+    fn bytes(self, bytes: &mut [u8], next: u8) {
+        let shift = self.shift;
+        for i in 0..bytes.len() {
+            let after = bytes.get(i + 1).copied().unwrap_or(next);
+            bytes[i] = match self.order {
+                BitOrder::Msb => (bytes[i] << shift) | (after >> (8 - shift)),
+                BitOrder::Lsb => (bytes[i] >> shift) | (after << (8 - shift)),
+            };
+        }
+    }
+
+    /// Shift `data` in place, eight bytes at a time; `next` is the unshifted byte after it.
+    fn in_place(self, data: &mut [u8], next: u8) {
+        let (blocks, tail) = data.as_chunks_mut::<8>();
+        if let Some(&first) = blocks.first() {
+            let after_last = u64::from(tail.first().copied().unwrap_or(next));
+            let mut word = u64::from_le_bytes(first);
+            for i in 1..blocks.len() {
+                let after = u64::from_le_bytes(blocks[i]);
+                blocks[i - 1] = self.words(word, after).to_le_bytes();
+                word = after;
+            }
+            let last = blocks.len() - 1;
+            blocks[last] = self.words(word, after_last).to_le_bytes();
+        }
+        self.bytes(tail, next);
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn bits(data: &[u8], nbits: usize, order: BitOrder) -> Vec<bool> {
+        (0..nbits)
+            .map(|i| {
+                let bit = match order {
+                    BitOrder::Msb => 7 - i % 8,
+                    BitOrder::Lsb => i % 8,
+                };
+                data[i / 8] >> bit & 1 == 1
+            })
+            .collect()
+    }
+
+    #[test]
+    fn matches_reference() {
+        let data: Vec<u8> = (0..40u32)
+            .map(|i| (i.wrapping_mul(2_654_435_761) >> 11) as u8)
+            .collect();
+        for order in [BitOrder::Msb, BitOrder::Lsb] {
+            for nbits in 0..=data.len() * 8 {
+                let len = nbits.div_ceil(8);
+                let src = &data[..len];
+                let mut expected = bits(src, nbits, order);
+                expected.reverse();
+
+                let mut dst = vec![0xAA; len];
+                reverse_bitstream(Some(src), &mut dst, nbits, order);
+                assert_eq!(bits(&dst, nbits, order), expected, "{order:?} {nbits}");
+                // The padding is cleared
+                assert_eq!(bits(&dst, len * 8, order)[nbits..], vec![false; len * 8 - nbits]);
+
+                let mut in_place = src.to_vec();
+                reverse_bitstream(None, &mut in_place, nbits, order);
+                assert_eq!(in_place, dst, "{order:?} {nbits} in place");
+            }
+        }
+    }
+
+    #[test]
+    fn tiles() {
+        for len in [2 * TILE - 1, 2 * TILE, 2 * TILE + 1, 4 * TILE + 3, 5 * TILE] {
+            let data: Vec<u8> = (0..len as u32)
+                .map(|i| (i.wrapping_mul(2_654_435_761) >> 13) as u8)
+                .collect();
+            for order in [BitOrder::Msb, BitOrder::Lsb] {
+                let nbits = len * 8 - 5;
+                let mut expected = bits(&data, nbits, order);
+                expected.reverse();
+                let mut dst = vec![0; len];
+                reverse_bitstream(Some(&data), &mut dst, nbits, order);
+                assert_eq!(bits(&dst, nbits, order), expected, "{order:?} {len}");
+                let mut in_place = data.clone();
+                reverse_bitstream(None, &mut in_place, nbits, order);
+                assert_eq!(in_place, dst, "{order:?} {len} in place");
+            }
+        }
+    }
+
+    #[test]
+    fn involution() {
+        let data: Vec<u8> = (0..=255).collect();
+        let nbits = data.len() * 8 - 3;
+        let mut once = vec![0; data.len()];
+        reverse_bitstream(Some(&data), &mut once, nbits, BitOrder::Msb);
+        reverse_bitstream(None, &mut once, nbits, BitOrder::Msb);
+        let mut expected = data.clone();
+        *expected.last_mut().unwrap() &= 0xF8;
+        assert_eq!(once, expected);
+    }
+}
@@ -0,0 +1,343 @@
+//! Chains of byte-wise transforms compiled into a single pass.
+//!
+//! Every supported operation maps byte `p` of a buffer to a function of one
+//! input byte in the same aligned 8-byte block:
+//!
+//! * `reverse`: the bits of every byte are reversed
+//! * `swap16` / `swap32` / `swap64`: the bytes of every 2, 4 or 8-byte word are
+//!   reversed, which moves byte `p` to `p ^ 1`, `p ^ 3` or `p ^ 7`
+//! * `xor:KEY`: byte `p` is XORed with byte `p % len` of the key
+//! * `invert`: every bit is flipped, i.e. `xor:ff`
+//!
+//! Reversing the bits of a byte commutes with XOR (`rev(x ^ k) = rev(x) ^ rev(k)`)
+//! and byte swaps compose by XOR of their index masks, so any chain reduces to
+//!
+//! ```text
+//! out[p] = R(in[p ^ swap]) ^ mask[p % mask.len()]
+//! ```
+//!
+//! where `R` reverses the bits of a byte or not. The buffer is then transformed
+//! one tile at a time: the bulk kernels permute and reverse a tile, and the mask
+//! is applied while the tile is still in L1.
+
+use crate::BIT_REVERSE_TABLE;
+use crate::kernels;
+
+/// Number of bytes transformed at a time.
+const TILE: usize = 16 << 10;
+
+/// Longest repetition period of the combined XOR mask.
+pub(crate) const MAX_PERIOD: usize = 1 << 20;
+
+/// One operation of a chain.
+#[derive(Clone, Debug, PartialEq, Eq)]
+pub(crate) enum Op {
+    Reverse,
+    /// Byte swap of words of `mask + 1` bytes: byte `p` moves to `p ^ mask`.
+    Swap(usize),
+    Xor(Vec<u8>),
+    Invert,
+}
+
+impl Op {
+    /// Parse an operation such as `"swap32"` or `"xor:5a3c"`.
+    pub(crate) fn parse(text: &str) -> Result<Self, String> {
+        let text = text.trim();
+        match text.to_ascii_lowercase().as_str() {
+            "reverse" => Ok(Self::Reverse),
+            "swap16" => Ok(Self::Swap(1)),
+            "swap32" => Ok(Self::Swap(3)),
+            "swap64" => Ok(Self::Swap(7)),
+            "invert" => Ok(Self::Invert),
+            op => {
+                let Some(key) = op.strip_prefix("xor:") else {
+                    return Err(format!(
+                        "Unknown operation '{text}'. Supported operations are reverse, swap16, swap32, swap64, \
+                         xor:HEX, invert."
+                    ));
+                };
+                let key = key.strip_prefix("0x").unwrap_or(key);
+                parse_hex(key).ok_or_else(|| format!("Invalid XOR key '{text}': expected an even number of hex digits"))
+            }
+            .map(Self::Xor),
+        }
+    }
+
+    /// The canonical text of the operation, which `parse` accepts.
+    pub(crate) fn name(&self) -> String {
+        match self {
+            Self::Reverse => "reverse".to_owned(),
+            Self::Swap(mask) => format!("swap{}", (mask + 1) * 8),
+            Self::Xor(key) => format!(
+                "xor:{}",
+                key.iter().map(|byte| format!("{byte:02x}")).collect::<String>()
+            ),
+            Self::Invert => "invert".to_owned(),
+        }
+    }
+}
+
+fn parse_hex(text: &str) -> Option<Vec<u8>> {
+    if text.is_empty() || text.len() % 2 != 0 || !text.is_ascii() {
+        return None;
+    }
+    (0..text.len())
+        .step_by(2)
+        .map(|i| u8::from_str_radix(&text[i..i + 2], 16).ok())
+        .collect()
+}
+
+fn gcd(a: usize, b: usize) -> usize {
+    if b == 0 { a } else { gcd(b, a % b) }
+}
+
+/// A compiled chain: `out[p] = R(in[p ^ swap]) ^ mask[p % period]`.
+#[derive(Clone, Debug)]
+pub(crate) struct Chain {
+    swap: usize,
+    reverse: bool,
+    /// Length of one repetition of the mask; 0 if the mask is all zeros.
+    period: usize,
+    /// The mask repeated to `period + TILE` bytes, so every tile finds its mask
+    /// in one contiguous slice starting at any phase.
+    pattern: Vec<u8>,
+}
+
+impl Chain {
+    /// Reduce `ops`, applied in order, to a single transform.
+    ///
+    /// # Errors
+    /// A message if the combined XOR mask repeats only every `MAX_PERIOD` bytes or more
+    pub(crate) fn compile(ops: &[Op]) -> Result<Self, String> {
+        let (mut swap, mut reverse, mut mask) = (0, false, vec![0u8]);
+        for op in ops {
+            match op {
+                Op::Reverse => {
+                    reverse = !reverse;
+                    mask.iter_mut()
+                        .for_each(|byte| *byte = BIT_REVERSE_TABLE[*byte as usize]);
+                }
+                Op::Invert => mask.iter_mut().for_each(|byte| *byte = !*byte),
+                Op::Xor(key) => {
+                    mask = repeat(&mask, period(mask.len(), key.len())?);
+                    for (i, byte) in mask.iter_mut().enumerate() {
+                        *byte ^= key[i % key.len()];
+                    }
+                }
+                Op::Swap(step) => {
+                    // The new mask byte of `p` is the old one of `p ^ step`, in the same block
+                    let extended = repeat(&mask, period(mask.len(), step + 1)?);
+                    mask = (0..extended.len()).map(|p| extended[p ^ step]).collect();
+                    swap ^= step;
+                }
+            }
+        }
+        let period = if mask.iter().all(|&byte| byte == 0) {
+            0
+        } else {
+            mask.len()
+        };
+        let pattern = if period == 0 {
+            Vec::new()
+        } else {
+            repeat(&mask, period + TILE)
+        };
+        Ok(Self {
+            swap,
+            reverse,
+            period,
+            pattern,
+        })
+    }
+
+    /// Transforms must start at and cover whole blocks of this many bytes (1, 2, 4 or 8).
+    pub(crate) fn block_size(&self) -> usize {
+        (self.swap + 1).next_power_of_two()
+    }
+
+    /// Apply the chain to `src` into `dst`, or to `dst` in place when `src` is
+    /// `None`; `offset` is the position of the first byte within the stream,
+    /// which sets the phase of the mask.
+    ///
+    /// `offset` and the length must be multiples of `block_size()`.
+    pub(crate) fn apply(&self, src: Option<&[u8]>, dst: &mut [u8], offset: usize) {
+        debug_assert_eq!(dst.len() % self.block_size(), 0);
+        debug_assert_eq!(offset % self.block_size(), 0);
+        for (index, tile) in dst.chunks_mut(TILE).enumerate() {
+            let start = index * TILE;
+            self.permute(src.map(|src| &src[start..start + tile.len()]), tile);
+            if self.period > 0 {
+                let phase = (offset + start) % self.period;
+                for (byte, mask) in tile.iter_mut().zip(&self.pattern[phase..]) {
+                    *byte ^= mask;
+                }
+            }
+        }
+    }
+
+    /// Apply the byte permutation and bit reversal of the chain.
+    fn permute(&self, src: Option<&[u8]>, dst: &mut [u8]) {
+        match (self.reverse, self.swap) {
+            // A bit reversal of words: the bulk kernels
+            (true, 0 | 1 | 3 | 7) => kernels::reverse_words(src, dst, self.swap + 1),
+            (false, 0) => {
+                if let Some(src) = src {
+                    dst.copy_from_slice(src);
+                }
+            }
+            (reverse, swap) => {
+                let transform = |block: [u8; 8]| {
+                    let word = swap_lanes(u64::from_le_bytes(block), swap);
+                    let word = if reverse {
+                        word.reverse_bits().swap_bytes()
+                    } else {
+                        word
+                    };
+                    word.to_le_bytes()
+                };
+                let (blocks, tail) = dst.as_chunks_mut::<8>();
+                match src {
+                    Some(src) => {
+                        let (src_blocks, src_tail) = src.as_chunks::<8>();
+                        for (d, s) in blocks.iter_mut().zip(src_blocks) {
+                            *d = transform(*s);
+                        }
+                        tail.copy_from_slice(src_tail);
+                    }
+                    None => blocks.iter_mut().for_each(|block| *block = transform(*block)),
+                }
+                // The tail is a whole number of blocks of at most 4 bytes, whose
+                // bytes stay among the first `tail.len()` lanes of a padded word
+                let mut last = [0u8; 8];
+                last[..tail.len()].copy_from_slice(tail);
+                tail.copy_from_slice(&transform(last)[..tail.len()]);
+            }
+        }
+    }
+}
+
+/// Move byte `p` of a little-endian word to `p ^ swap`.
+fn swap_lanes(word: u64, swap: usize) -> u64 {
+    let mut word = word;
+    if swap & 1 != 0 {
+        word = ((word & 0x00FF_00FF_00FF_00FF) << 8) | ((word >> 8) & 0x00FF_00FF_00FF_00FF);
+    }
+    if swap & 2 != 0 {
+        word = ((word & 0x0000_FFFF_0000_FFFF) << 16) | ((word >> 16) & 0x0000_FFFF_0000_FFFF);
+    }
+    if swap & 4 != 0 {
+        word = word.rotate_left(32);
+    }
+    word
+}
+
+/// The period of a mask combining masks of periods `a` and `b`.
+fn period(a: usize, b: usize) -> Result<usize, String> {
+    let period = a / gcd(a, b) * b;
+    if period > MAX_PERIOD {
+        return Err(format!(
+            "The XOR keys of the chain repeat every {period} bytes, more than {MAX_PERIOD}"
+        ));
+    }
+    Ok(period)
+}
+
+/// `data` repeated to `len` bytes.
+fn repeat(data: &[u8], len: usize) -> Vec<u8> {
+    data.iter().copied().cycle().take(len).collect()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// Apply `ops` one after another, one byte at a time.
+    fn reference(ops: &[Op], data: &[u8], offset: usize) -> Vec<u8> {
+        let mut data = data.to_vec();
+        for op in ops {
+            data = (0..data.len())
+                .map(|p| match op {
+                    Op::Reverse => BIT_REVERSE_TABLE[data[p] as usize],
+                    Op::Swap(step) => data[p ^ step],
+                    Op::Xor(key) => data[p] ^ key[(offset + p) % key.len()],
+                    Op::Invert => !data[p],
+                })
+                .collect();
+        }
+        data
+    }
+
+    fn ops(text: &str) -> Vec<Op> {
+        text.split(',').map(|op| Op::parse(op).unwrap()).collect()
+    }
+
+    #[test]
+    fn parse() {
+        assert_eq!(Op::parse(" XOR:0xA5ff ").unwrap(), Op::Xor(vec![0xA5, 0xFF]));
+        assert_eq!(Op::parse("swap32").unwrap().name(), "swap32");
+        assert_eq!(Op::parse("xor:00a5").unwrap().name(), "xor:00a5");
+        assert!(Op::parse("xor:abc").is_err());
+        assert!(Op::parse("xor:").is_err());
+        assert!(
+            Op::parse("rotate")
+                .unwrap_err()
+                .starts_with("Unknown operation 'rotate'")
+        );
+    }
+
+    #[test]
+    fn matches_reference() {
+        let data: Vec<u8> = (0..3 * TILE as u32 + 40)
+            .map(|i| (i.wrapping_mul(2_654_435_761) >> 13) as u8)
+            .collect();
+        for text in [
+            "reverse",
+            "invert",
+            "swap16",
+            "reverse,swap32",
+            "swap64,reverse",
+            "reverse,swap32,xor:deadbeef,invert",
+            "xor:0102030405,reverse,swap16",
+            "swap16,swap32",
+            "swap32,swap64,xor:ff",
+            "reverse,reverse,xor:5a,xor:5a",
+            "xor:0011223344556677889900,swap64,reverse",
+        ] {
+            let ops = ops(text);
+            let chain = Chain::compile(&ops).unwrap();
+            let block = chain.block_size();
+            for (start, len) in [(0, data.len() / 8 * 8), (8, 24), (16, 2 * TILE + 8), (64, 8)] {
+                let src = &data[start..start + len];
+                let expected = reference(&ops, src, start);
+                let mut dst = vec![0; len];
+                chain.apply(Some(src), &mut dst, start);
+                assert_eq!(dst, expected, "{text} {start} {len}");
+                let mut in_place = src.to_vec();
+                chain.apply(None, &mut in_place, start);
+                assert_eq!(in_place, expected, "{text} {start} {len} in place");
+            }
+            // Tails shorter than eight bytes
+            let len = 12 / block * block;
+            let mut dst = vec![0; len];
+            chain.apply(Some(&data[..len]), &mut dst, 0);
+            assert_eq!(dst, reference(&ops, &data[..len], 0), "{text} tail");
+        }
+    }
+
+    #[test]
+    fn compiled_form() {
+        let chain = Chain::compile(&ops("reverse,reverse,xor:5a,xor:5a")).unwrap();
+        assert_eq!((chain.swap, chain.reverse, chain.period), (0, false, 0));
+        let chain = Chain::compile(&ops("swap16,swap32,swap64")).unwrap();
+        assert_eq!((chain.swap, chain.block_size()), (5, 8));
+        let chain = Chain::compile(&ops("invert,reverse")).unwrap();
+        assert_eq!((chain.reverse, chain.period, chain.pattern[0]), (true, 1, 0xFF));
+    }
+
+    #[test]
+    fn period_limit() {
+        let long = Op::Xor(vec![1; 1 << 19]);
+        assert!(Chain::compile(&[long.clone(), Op::Xor(vec![1; 3])]).is_err());
+        assert!(Chain::compile(&[long, Op::Xor(vec![1; 4])]).is_ok());
+    }
+}
@@ -0,0 +1,253 @@
+//! Incremental bit reversal of data arriving in chunks of any size.
+//!
+//! `Incremental` holds the state of one stream: the bytes of a word that is
+//! not complete yet, and whatever a mode needs to see the end of the input
+//! before it can produce output. Every call first reports how many bytes it
+//! will write, so the caller can allocate the output exactly once and the
+//! transform writes into it directly.
+
+use crate::kernels;
+
+/// How a stream is transformed.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub(crate) enum StreamMode {
+    /// 1, 2, 4 and 8 byte inputs are reversed as one word, others byte by byte.
+    Auto,
+    /// Every byte is reversed.
+    Byte,
+    /// Every word of the given number of bytes is reversed.
+    Word(usize),
+    /// The whole input is reversed as one integer.
+    Whole,
+}
+
+/// Largest input that `StreamMode::Auto` may still reverse as one word.
+const AUTO_WORD_MAX: usize = 8;
+
+/// The input ended in the middle of a word.
+#[derive(Debug, PartialEq, Eq)]
+pub(crate) struct IncompleteWord {
+    pub(crate) total: u64,
+    pub(crate) width: usize,
+}
+
+pub(crate) struct Incremental {
+    /// The mode given at creation, restored by `finish`.
+    initial: StreamMode,
+    mode: StreamMode,
+    /// Bytes of an incomplete word, or the whole input so far in `Auto` mode
+    /// while it may still be a single word.
+    pending: [u8; AUTO_WORD_MAX],
+    pending_len: usize,
+    /// Copies of the input chunks in `Whole` mode, in order.
+    chunks: Vec<Vec<u8>>,
+    total: u64,
+}
+
+impl Incremental {
+    pub(crate) fn new(mode: StreamMode) -> Self {
+        Self {
+            initial: mode,
+            mode,
+            pending: [0; AUTO_WORD_MAX],
+            pending_len: 0,
+            chunks: Vec::new(),
+            total: 0,
+        }
+    }
+
+    /// Number of input bytes held back until more input or the end arrives.
+    pub(crate) fn pending(&self) -> usize {
+        self.pending_len + self.chunks.iter().map(Vec::len).sum::<usize>()
+    }
+
+    /// Number of bytes `update` writes for `len` more input bytes.
+    pub(crate) fn update_len(&self, len: usize) -> usize {
+        match self.mode {
+            StreamMode::Byte => len,
+            StreamMode::Word(width) => (self.pending_len + len) / width * width,
+            StreamMode::Auto if self.pending_len + len <= AUTO_WORD_MAX => 0,
+            StreamMode::Auto => self.pending_len + len,
+            StreamMode::Whole => 0,
+        }
+    }
+
+    /// Transform `input` into `out`, which holds exactly `update_len(input.len())` bytes.
+    pub(crate) fn update(&mut self, input: &[u8], out: &mut [u8]) {
+        debug_assert_eq!(out.len(), self.update_len(input.len()));
+        self.total += input.len() as u64;
+        match self.mode {
+            StreamMode::Byte => kernels::reverse_words(Some(input), out, 1),
+            StreamMode::Word(width) => self.update_words(input, out, width),
+            StreamMode::Auto if out.is_empty() => self.hold(input),
+            StreamMode::Auto => {
+                // Too long to be a single word: from now on every byte is reversed
+                let (head, tail) = out.split_at_mut(self.pending_len);
+                kernels::reverse_words(Some(&self.pending[..self.pending_len]), head, 1);
+                kernels::reverse_words(Some(input), tail, 1);
+                self.pending_len = 0;
+                self.mode = StreamMode::Byte;
+            }
+            StreamMode::Whole => self.chunks.push(input.to_vec()),
+        }
+    }
+
+    fn update_words(&mut self, mut input: &[u8], mut out: &mut [u8], width: usize) {
+        if self.pending_len > 0 {
+            let needed = width - self.pending_len;
+            if input.len() < needed {
+                return self.hold(input);
+            }
+            // Complete the carried word with the head of this chunk
+            let (head, rest) = input.split_at(needed);
+            self.hold(head);
+            let (word, rest_out) = out.split_at_mut(width);
+            kernels::reverse_words(Some(&self.pending[..width]), word, width);
+            self.pending_len = 0;
+            (input, out) = (rest, rest_out);
+        }
+        let (words, rest) = input.split_at(out.len());
+        kernels::reverse_words(Some(words), out, width);
+        self.hold(rest);
+    }
+
+    fn hold(&mut self, input: &[u8]) {
+        self.pending[self.pending_len..self.pending_len + input.len()].copy_from_slice(input);
+        self.pending_len += input.len();
+    }
+
+    /// Number of bytes `finish` writes.
+    pub(crate) fn finish_len(&self) -> usize {
+        match self.mode {
+            StreamMode::Word(_) => 0,
+            _ => self.pending(),
+        }
+    }
+
+    /// Write the output held back until the end of the input into `out`, which
+    /// holds exactly `finish_len()` bytes, and reset the state.
+    pub(crate) fn finish(&mut self, out: &mut [u8]) -> Result<(), IncompleteWord> {
+        debug_assert_eq!(out.len(), self.finish_len());
+        let pending = &self.pending[..self.pending_len];
+        let result = match self.mode {
+            StreamMode::Word(width) if !pending.is_empty() => Err(IncompleteWord {
+                total: self.total,
+                width,
+            }),
+            StreamMode::Auto if matches!(pending.len(), 1 | 2 | 4 | 8) => {
+                kernels::reverse_whole(Some(pending), out);
+                Ok(())
+            }
+            StreamMode::Auto | StreamMode::Byte => {
+                kernels::reverse_words(Some(pending), out, 1);
+                Ok(())
+            }
+            StreamMode::Word(_) => Ok(()),
+            StreamMode::Whole => {
+                // The last chunk comes first, each one mirrored
+                let mut offset = 0;
+                for chunk in self.chunks.iter().rev() {
+                    kernels::reverse_whole(Some(chunk), &mut out[offset..offset + chunk.len()]);
+                    offset += chunk.len();
+                }
+                Ok(())
+            }
+        };
+        self.mode = self.initial;
+        self.pending_len = 0;
+        self.chunks.clear();
+        self.total = 0;
+        result
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn reverse_byte(byte: u8) -> u8 {
+        byte.reverse_bits()
+    }
+
+    /// The result of transforming `data` in one piece.
+    fn reference(data: &[u8], mode: StreamMode) -> Vec<u8> {
+        match mode {
+            StreamMode::Auto if matches!(data.len(), 1 | 2 | 4 | 8) => reference(data, StreamMode::Whole),
+            StreamMode::Auto | StreamMode::Byte => data.iter().copied().map(reverse_byte).collect(),
+            StreamMode::Word(width) => data
+                .chunks(width)
+                .flat_map(|word| word.iter().rev().copied().map(reverse_byte))
+                .collect(),
+            StreamMode::Whole => data.iter().rev().copied().map(reverse_byte).collect(),
+        }
+    }
+
+    fn run(data: &[u8], mode: StreamMode, pieces: &[usize]) -> Result<Vec<u8>, IncompleteWord> {
+        let mut state = Incremental::new(mode);
+        let mut output = Vec::new();
+        let mut rest = data;
+        for &size in pieces.iter().cycle() {
+            if rest.is_empty() {
+                break;
+            }
+            let (piece, tail) = rest.split_at(size.min(rest.len()));
+            let mut out = vec![0; state.update_len(piece.len())];
+            state.update(piece, &mut out);
+            output.extend(out);
+            rest = tail;
+        }
+        let mut out = vec![0; state.finish_len()];
+        state.finish(&mut out)?;
+        output.extend(out);
+        Ok(output)
+    }
+
+    #[test]
+    fn matches_single_pass() {
+        let modes = [
+            StreamMode::Auto,
+            StreamMode::Byte,
+            StreamMode::Word(2),
+            StreamMode::Word(4),
+            StreamMode::Word(8),
+            StreamMode::Whole,
+        ];
+        for mode in modes {
+            for len in [0, 1, 2, 3, 4, 8, 9, 24, 64, 1000] {
+                if let StreamMode::Word(width) = mode
+                    && len % width != 0
+                {
+                    continue;
+                }
+                let data: Vec<u8> = (0..len).map(|i| (i * 37 + 11) as u8).collect();
+                for pieces in [&[1][..], &[3], &[5, 1, 7], &[1000]] {
+                    assert_eq!(
+                        run(&data, mode, pieces),
+                        Ok(reference(&data, mode)),
+                        "{mode:?} len {len} pieces {pieces:?}"
+                    );
+                }
+            }
+        }
+    }
+
+    #[test]
+    fn reusable_after_finish() {
+        let mut state = Incremental::new(StreamMode::Auto);
+        let mut out = vec![0; state.update_len(9)];
+        state.update(&[1; 9], &mut out);
+        state.finish(&mut []).unwrap();
+        state.update(&[1, 0], &mut []);
+        let mut out = vec![0; state.finish_len()];
+        state.finish(&mut out).unwrap();
+        assert_eq!(out, [0, 0x80]);
+    }
+
+    #[test]
+    fn incomplete_word() {
+        assert_eq!(
+            run(&[1, 2, 3, 4, 5], StreamMode::Word(4), &[2]),
+            Err(IncompleteWord { total: 5, width: 4 })
+        );
+    }
+}
@@ -0,0 +1,620 @@
+//! Bulk bit-reversal kernels with a per-size registry.
+//!
+//! Every kernel reverses the bits of each `width`-byte word (1, 2, 4 or 8 bytes)
+//! of a buffer:
+//!
+//! * `avx2` / `ssse3` (x86_64): byte shuffle within each word, then a nibble
+//!   lookup with `pshufb`, 32 or 16 bytes at a time
+//! * `neon` (aarch64): `rev16`/`rev32`/`rev64` and `rbit`, 16 bytes at a time
+//! * `portable`: 64-bit swap-and-mask (one `rbit` on aarch64), 8 bytes at a time
+//! * `lut16` / `lut8`: lookup of every 16-bit pair or byte in a table
+//!
+//! Buffers fall into the size classes of `SIZE_CLASSES`, and each class uses its
+//! own kernel. The selection is made once, on first use, by `tuning`: from the
+//! `REVBITS_KERNEL` environment variable, the calibration cached on disk, or a
+//! short calibration of every available kernel.
+
+use std::sync::atomic::{AtomicBool, AtomicU8, Ordering};
+use std::sync::{Once, OnceLock};
+
+use crate::BIT_REVERSE_TABLE;
+use crate::tuning;
+
+/// Signature shared by all kernels.
+///
+/// # Safety
+/// `src` must be valid for reading and `dst` for writing `len` bytes, `src` must
+/// either equal `dst` or not overlap it, and `len` must be a multiple of `width`.
+pub(crate) type KernelFn = unsafe fn(src: *const u8, dst: *mut u8, len: usize, width: usize);
+
+/// A bulk bit-reversal kernel.
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub(crate) enum Kernel {
+    Lut8 = 0,
+    Lut16 = 1,
+    Portable = 2,
+    #[cfg(target_arch = "x86_64")]
+    Ssse3 = 3,
+    #[cfg(target_arch = "x86_64")]
+    Avx2 = 4,
+    #[cfg(target_arch = "aarch64")]
+    Neon = 5,
+}
+
+impl Kernel {
+    /// Every kernel compiled for this architecture, whether the CPU supports it or
+    /// not, the ones needing the most specific instruction sets last.
+    pub(crate) const ALL: &[Kernel] = &[
+        Kernel::Lut8,
+        Kernel::Lut16,
+        Kernel::Portable,
+        #[cfg(target_arch = "x86_64")]
+        Kernel::Ssse3,
+        #[cfg(target_arch = "x86_64")]
+        Kernel::Avx2,
+        #[cfg(target_arch = "aarch64")]
+        Kernel::Neon,
+    ];
+
+    /// The name of the kernel as exposed to Python.
+    pub(crate) fn name(self) -> &'static str {
+        match self {
+            Kernel::Lut8 => "lut8",
+            Kernel::Lut16 => "lut16",
+            Kernel::Portable => "portable",
+            #[cfg(target_arch = "x86_64")]
+            Kernel::Ssse3 => "ssse3",
+            #[cfg(target_arch = "x86_64")]
+            Kernel::Avx2 => "avx2",
+            #[cfg(target_arch = "aarch64")]
+            Kernel::Neon => "neon",
+        }
+    }
+
+    /// The kernel called `name`, if it was compiled for this architecture.
+    pub(crate) fn from_name(name: &str) -> Option<Self> {
+        Self::ALL.iter().copied().find(|kernel| kernel.name() == name)
+    }
+
+    /// Whether the running CPU supports the kernel.
+    pub(crate) fn is_supported(self) -> bool {
+        match self {
+            Kernel::Lut8 | Kernel::Lut16 | Kernel::Portable => true,
+            #[cfg(target_arch = "x86_64")]
+            Kernel::Ssse3 => is_x86_feature_detected!("ssse3"),
+            #[cfg(target_arch = "x86_64")]
+            Kernel::Avx2 => is_x86_feature_detected!("avx2"),
+            #[cfg(target_arch = "aarch64")]
+            Kernel::Neon => std::arch::is_aarch64_feature_detected!("neon"),
+        }
+    }
+
+    /// The fastest kernel supported by the running CPU, by its instruction set.
+    pub(crate) fn detect() -> Self {
+        Self::ALL
+            .iter()
+            .rev()
+            .copied()
+            .find(|kernel| kernel.is_supported())
+            .unwrap_or(Kernel::Portable)
+    }
+
+    pub(crate) fn function(self) -> KernelFn {
+        match self {
+            Kernel::Lut8 => reverse_lut8,
+            Kernel::Lut16 => reverse_lut16,
+            Kernel::Portable => reverse_portable,
+            #[cfg(target_arch = "x86_64")]
+            Kernel::Ssse3 => x86::reverse_ssse3,
+            #[cfg(target_arch = "x86_64")]
+            Kernel::Avx2 => x86::reverse_avx2,
+            #[cfg(target_arch = "aarch64")]
+            Kernel::Neon => arm::reverse_neon,
+        }
+    }
+
+    fn from_index(index: u8) -> Self {
+        Self::ALL
+            .iter()
+            .copied()
+            .find(|kernel| *kernel as u8 == index)
+            .expect("stored kernel index")
+    }
+}
+
+/// The kernels supported by the running CPU, in the order of `Kernel::ALL`.
+pub(crate) fn available() -> Vec<Kernel> {
+    Kernel::ALL
+        .iter()
+        .copied()
+        .filter(|kernel| kernel.is_supported())
+        .collect()
+}
+
+/// Names of the buffer size classes that each have their own kernel.
+pub(crate) const SIZE_CLASSES: [&str; 3] = ["small", "medium", "large"];
+
+/// Smallest buffer size, in bytes, of the medium and the large class.
+const CLASS_LIMITS: [usize; 2] = [256, 64 << 10];
+
+/// The index in `SIZE_CLASSES` of the class of `len`-byte buffers.
+pub(crate) fn size_class(len: usize) -> usize {
+    CLASS_LIMITS.iter().take_while(|&&limit| len >= limit).count()
+}
+
+/// A kernel for each size class.
+pub(crate) type Selection = [Kernel; SIZE_CLASSES.len()];
+
+const NO_KERNEL: AtomicU8 = AtomicU8::new(Kernel::Portable as u8);
+
+/// The kernel of each size class, as found by `tuning` or set by `select`.
+static SELECTED: [AtomicU8; SIZE_CLASSES.len()] = [NO_KERNEL; SIZE_CLASSES.len()];
+
+/// The selection found by `tuning`, restored by `reset`.
+static TUNED: [AtomicU8; SIZE_CLASSES.len()] = [NO_KERNEL; SIZE_CLASSES.len()];
+
+static INIT: Once = Once::new();
+
+/// Whether `init` left the calibration to the first reversal of a medium or large buffer.
+static CALIBRATION_PENDING: AtomicBool = AtomicBool::new(false);
+
+static CALIBRATION: Once = Once::new();
+
+fn store(slots: &[AtomicU8; SIZE_CLASSES.len()], selection: Selection) {
+    for (slot, kernel) in slots.iter().zip(selection) {
+        slot.store(kernel as u8, Ordering::Relaxed);
+    }
+}
+
+fn load(slots: &[AtomicU8; SIZE_CLASSES.len()]) -> Selection {
+    std::array::from_fn(|class| Kernel::from_index(slots[class].load(Ordering::Relaxed)))
+}
+
+fn init() {
+    INIT.call_once(|| {
+        let (selection, pending) = tuning::initial_selection();
+        store(&TUNED, selection);
+        store(&SELECTED, selection);
+        CALIBRATION_PENDING.store(pending, Ordering::Relaxed);
+    });
+}
+
+/// `init`, followed by the calibration it deferred, if any.
+fn init_calibrated() {
+    init();
+    CALIBRATION.call_once(|| {
+        if CALIBRATION_PENDING.load(Ordering::Relaxed) {
+            let selection = tuning::calibrate_and_save();
+            store(&TUNED, selection);
+            store(&SELECTED, selection);
+        }
+    });
+}
+
+/// The kernel used for buffers of `len` bytes.
+///
+/// Small buffers use the detected kernels until a calibration is needed for a
+/// larger one, so a process reversing only a few bytes never calibrates.
+pub(crate) fn active(len: usize) -> Kernel {
+    let class = size_class(len);
+    if class == 0 {
+        init();
+    } else {
+        init_calibrated();
+    }
+    Kernel::from_index(SELECTED[class].load(Ordering::Relaxed))
+}
+
+/// The kernel used for each size class.
+pub(crate) fn selection() -> Selection {
+    init_calibrated();
+    load(&SELECTED)
+}
+
+/// Use `kernel` for the size class `class`, or for all classes when `None`.
+pub(crate) fn select(kernel: Kernel, class: Option<usize>) {
+    // Calibrate first, so that a deferred calibration does not replace the choice
+    init_calibrated();
+    match class {
+        Some(class) => SELECTED[class].store(kernel as u8, Ordering::Relaxed),
+        None => store(&SELECTED, [kernel; SIZE_CLASSES.len()]),
+    }
+}
+
+/// Replace the tuned selection, e.g. after a new calibration, and use it.
+pub(crate) fn retune(selection: Selection) {
+    init();
+    // A deferred calibration is no longer needed
+    CALIBRATION.call_once(|| {});
+    store(&TUNED, selection);
+    store(&SELECTED, selection);
+}
+
+/// Go back to the tuned kernel for the size class `class`, or for all classes when `None`.
+pub(crate) fn reset(class: Option<usize>) {
+    init_calibrated();
+    match class {
+        Some(class) => SELECTED[class].store(TUNED[class].load(Ordering::Relaxed), Ordering::Relaxed),
+        None => store(&SELECTED, load(&TUNED)),
+    }
+}
+
+/// Bit-reverse every `width`-byte word (1, 2, 4 or 8) of `src` into `dst`, or of
+/// `dst` in place when `src` is `None`.
+///
+/// Reversing all bits of a word moves byte `k` to byte `width - 1 - k`, so the
+/// result does not depend on the byte order the words are stored in.
+pub(crate) fn reverse_words(src: Option<&[u8]>, dst: &mut [u8], width: usize) {
+    assert!(matches!(width, 1 | 2 | 4 | 8), "unsupported word width {width}");
+    assert_eq!(dst.len() % width, 0, "length is not a multiple of the word width");
+    let len = match src {
+        Some(src) => src.len().min(dst.len()),
+        None => dst.len(),
+    };
+    let dst_ptr = dst.as_mut_ptr();
+    let src_ptr = src.map_or(dst_ptr.cast_const(), <[u8]>::as_ptr);
+    // SAFETY: both pointers are valid for `len` bytes; a separate `src` slice
+    // cannot overlap the exclusively borrowed `dst`; `len` is whole words.
+    unsafe { (active(len).function())(src_ptr, dst_ptr, len, width) }
+}
+
+/// Bit-reverse `src` as one integer into `dst`, or `dst` in place when `src` is
+/// `None`: byte `k` of the result is byte `len - 1 - k` with its bits reversed.
+///
+/// Eight-byte blocks are taken from opposite ends of the buffer and reversed with
+/// one 64-bit swap-and-mask each, so the buffer is traversed once.
+pub(crate) fn reverse_whole(src: Option<&[u8]>, dst: &mut [u8]) {
+    let reverse_block = |block: [u8; 8]| u64::from_le_bytes(block).reverse_bits().to_le_bytes();
+    match src {
+        Some(src) => {
+            let (blocks, tail) = dst.as_chunks_mut::<8>();
+            let mut src_blocks = src.rchunks_exact(8);
+            for (d, s) in blocks.iter_mut().zip(&mut src_blocks) {
+                *d = reverse_block(s.try_into().expect("8-byte block"));
+            }
+            for (d, &s) in tail.iter_mut().zip(src_blocks.remainder().iter().rev()) {
+                *d = BIT_REVERSE_TABLE[s as usize];
+            }
+        }
+        None => {
+            let outer = dst.len() / 16 * 8;
+            let (head, rest) = dst.split_at_mut(outer);
+            let (middle, tail) = rest.split_at_mut(rest.len() - outer);
+            let tail_blocks = tail.as_chunks_mut::<8>().0.iter_mut().rev();
+            for (a, b) in head.as_chunks_mut::<8>().0.iter_mut().zip(tail_blocks) {
+                (*a, *b) = (reverse_block(*b), reverse_block(*a));
+            }
+            middle.reverse();
+            for d in middle {
+                *d = BIT_REVERSE_TABLE[*d as usize];
+            }
+        }
+    }
+}
+
+/// Reverse the bits of each `width`-byte lane of `x`, keeping lanes in place.
+#[inline(always)]
+fn reverse_lanes(x: u64, width: usize) -> u64 {
+    // `reverse_bits` is a byte swap plus swap-and-mask steps (or `rbit`), which
+    // also mirrors the lane order; undo that for lanes narrower than 64 bits.
+    let x = x.reverse_bits();
+    match width {
+        1 => x.swap_bytes(),
+        2 => {
+            let x = x.rotate_left(32);
+            ((x >> 16) & 0x0000_FFFF_0000_FFFF) | ((x & 0x0000_FFFF_0000_FFFF) << 16)
+        }
+        4 => x.rotate_left(32),
+        _ => x,
+    }
+}
+
+/// Bit-reverse whole words one byte at a time, for the tail of a buffer.
+///
+/// # Safety
+/// Same contract as `KernelFn`.
+unsafe fn reverse_tail(src: *const u8, dst: *mut u8, len: usize, width: usize) {
+    let mut word = [0u8; 8];
+    for start in (0..len).step_by(width) {
+        // SAFETY: `start + width <= len` since `len` is a multiple of `width`;
+        // the whole word is read before any of it is written.
+        unsafe {
+            std::ptr::copy(src.add(start), word.as_mut_ptr(), width);
+            for k in 0..width {
+                *dst.add(start + k) = BIT_REVERSE_TABLE[word[width - 1 - k] as usize];
+            }
+        }
+    }
+}
+
+/// Portable kernel: 64-bit swap-and-mask, 8 bytes at a time.
+///
+/// # Safety
+/// Same contract as `KernelFn`.
+unsafe fn reverse_portable(src: *const u8, dst: *mut u8, len: usize, width: usize) {
+    let mut i = 0;
+    while i + 8 <= len {
+        // SAFETY: `i + 8 <= len`; each block is loaded before it is stored.
+        unsafe {
+            let x = u64::from_le_bytes(src.add(i).cast::<[u8; 8]>().read_unaligned());
+            dst.add(i)
+                .cast::<[u8; 8]>()
+                .write_unaligned(reverse_lanes(x, width).to_le_bytes());
+        }
+        i += 8;
+    }
+    // SAFETY: the remaining `len - i` bytes are whole words.
+    unsafe { reverse_tail(src.add(i), dst.add(i), len - i, width) }
+}
+
+/// Mirror the bytes within each `width`-byte lane of `x`.
+#[inline(always)]
+fn mirror_lanes(x: u64, width: usize) -> u64 {
+    match width {
+        2 => ((x >> 8) & 0x00FF_00FF_00FF_00FF) | ((x & 0x00FF_00FF_00FF_00FF) << 8),
+        4 => x.swap_bytes().rotate_left(32),
+        8 => x.swap_bytes(),
+        _ => x,
+    }
+}
+
+/// 8-bit lookup kernel: every byte through `BIT_REVERSE_TABLE`, 8 bytes at a time.
+///
+/// # Safety
+/// Same contract as `KernelFn`.
+unsafe fn reverse_lut8(src: *const u8, dst: *mut u8, len: usize, width: usize) {
+    let mut i = 0;
+    while i + 8 <= len {
+        // SAFETY: `i + 8 <= len`; each block is loaded before it is stored.
+        unsafe {
+            let block = src.add(i).cast::<[u8; 8]>().read_unaligned();
+            let x = u64::from_le_bytes(block.map(|b| BIT_REVERSE_TABLE[b as usize]));
+            dst.add(i)
+                .cast::<[u8; 8]>()
+                .write_unaligned(mirror_lanes(x, width).to_le_bytes());
+        }
+        i += 8;
+    }
+    // SAFETY: the remaining `len - i` bytes are whole words.
+    unsafe { reverse_tail(src.add(i), dst.add(i), len - i, width) }
+}
+
+/// `LUT16[x]` is `x` with the bits of both of its bytes reversed, each byte in place.
+fn lut16() -> &'static [u16; 1 << 16] {
+    static LUT16: OnceLock<Box<[u16; 1 << 16]>> = OnceLock::new();
+    LUT16.get_or_init(|| {
+        let mut table = Box::new([0u16; 1 << 16]);
+        for (x, entry) in table.iter_mut().enumerate() {
+            *entry = u16::from_le_bytes((x as u16).to_le_bytes().map(|b| BIT_REVERSE_TABLE[b as usize]));
+        }
+        table
+    })
+}
+
+/// 16-bit lookup kernel: every byte pair through a 128 KiB table, 8 bytes at a time.
+///
+/// # Safety
+/// Same contract as `KernelFn`.
+unsafe fn reverse_lut16(src: *const u8, dst: *mut u8, len: usize, width: usize) {
+    let table = lut16();
+    let mut i = 0;
+    while i + 8 <= len {
+        // SAFETY: `i + 8 <= len`; each block is loaded before it is stored.
+        unsafe {
+            let x = u64::from_le_bytes(src.add(i).cast::<[u8; 8]>().read_unaligned());
+            let x = (0..64).step_by(16).fold(0, |acc, shift| {
+                acc | u64::from(table[(x >> shift) as u16 as usize]) << shift
+            });
+            dst.add(i)
+                .cast::<[u8; 8]>()
+                .write_unaligned(mirror_lanes(x, width).to_le_bytes());
+        }
+        i += 8;
+    }
+    // SAFETY: the remaining `len - i` bytes are whole words.
+    unsafe { reverse_tail(src.add(i), dst.add(i), len - i, width) }
+}
+
+/// Byte shuffle that mirrors the bytes of each `width`-byte word of a 16-byte block.
+const fn word_byte_order(width: usize) -> [u8; 16] {
+    let mut order = [0u8; 16];
+    let mut j = 0;
+    while j < 16 {
+        order[j] = ((j / width) * width + (width - 1 - j % width)) as u8;
+        j += 1;
+    }
+    order
+}
+
+/// Bit reversal of a 4-bit value.
+const fn reverse_nibble(n: u8) -> u8 {
+    ((n & 1) << 3) | ((n & 2) << 1) | ((n & 4) >> 1) | ((n & 8) >> 3)
+}
+
+/// Lookup tables for the nibble shuffle: `LOW[n]` is the reversed low nibble `n`
+/// moved to the high half, `HIGH[n]` the reversed high nibble `n` in the low half.
+const NIBBLE_TABLES: ([u8; 16], [u8; 16]) = {
+    let mut low = [0u8; 16];
+    let mut high = [0u8; 16];
+    let mut n = 0;
+    while n < 16 {
+        low[n] = reverse_nibble(n as u8) << 4;
+        high[n] = reverse_nibble(n as u8);
+        n += 1;
+    }
+    (low, high)
+};
+
+#[cfg(target_arch = "x86_64")]
+mod x86 {
+    use std::arch::x86_64::*;
+
+    use super::{NIBBLE_TABLES, reverse_portable, word_byte_order};
+
+    const ORDERS: [[u8; 16]; 4] = [
+        word_byte_order(1),
+        word_byte_order(2),
+        word_byte_order(4),
+        word_byte_order(8),
+    ];
+
+    /// Shuffle mask mirroring the bytes of each `width`-byte word.
+    fn order_index(width: usize) -> usize {
+        width.trailing_zeros() as usize
+    }
+
+    /// SSSE3 kernel: 16 bytes per `pshufb` nibble lookup.
+    ///
+    /// # Safety
+    /// Same contract as `KernelFn`, and the CPU must support SSSE3.
+    #[target_feature(enable = "ssse3")]
+    pub(super) unsafe fn reverse_ssse3(src: *const u8, dst: *mut u8, len: usize, width: usize) {
+        // SAFETY: all loads/stores stay within `len` bytes; each block is loaded
+        // before it is stored, so `src == dst` is fine.
+        unsafe {
+            let low = _mm_loadu_si128(NIBBLE_TABLES.0.as_ptr().cast());
+            let high = _mm_loadu_si128(NIBBLE_TABLES.1.as_ptr().cast());
+            let order = _mm_loadu_si128(ORDERS[order_index(width)].as_ptr().cast());
+            let mask = _mm_set1_epi8(0x0F);
+            let mut i = 0;
+            while i + 16 <= len {
+                let v = _mm_shuffle_epi8(_mm_loadu_si128(src.add(i).cast()), order);
+                let lo = _mm_shuffle_epi8(low, _mm_and_si128(v, mask));
+                let hi = _mm_shuffle_epi8(high, _mm_and_si128(_mm_srli_epi16::<4>(v), mask));
+                _mm_storeu_si128(dst.add(i).cast(), _mm_or_si128(lo, hi));
+                i += 16;
+            }
+            reverse_portable(src.add(i), dst.add(i), len - i, width);
+        }
+    }
+
+    /// AVX2 kernel: 32 bytes per `vpshufb` nibble lookup.
+    ///
+    /// # Safety
+    /// Same contract as `KernelFn`, and the CPU must support AVX2.
+    #[target_feature(enable = "avx2")]
+    pub(super) unsafe fn reverse_avx2(src: *const u8, dst: *mut u8, len: usize, width: usize) {
+        // SAFETY: as in `reverse_ssse3`; AVX2 implies SSSE3 for the tail.
+        unsafe {
+            // `vpshufb` shuffles within 128-bit lanes, so every table is repeated.
+            let low = _mm256_broadcastsi128_si256(_mm_loadu_si128(NIBBLE_TABLES.0.as_ptr().cast()));
+            let high = _mm256_broadcastsi128_si256(_mm_loadu_si128(NIBBLE_TABLES.1.as_ptr().cast()));
+            let order = _mm256_broadcastsi128_si256(_mm_loadu_si128(ORDERS[order_index(width)].as_ptr().cast()));
+            let mask = _mm256_set1_epi8(0x0F);
+            let mut i = 0;
+            while i + 32 <= len {
+                let v = _mm256_shuffle_epi8(_mm256_loadu_si256(src.add(i).cast()), order);
+                let lo = _mm256_shuffle_epi8(low, _mm256_and_si256(v, mask));
+                let hi = _mm256_shuffle_epi8(high, _mm256_and_si256(_mm256_srli_epi16::<4>(v), mask));
+                _mm256_storeu_si256(dst.add(i).cast(), _mm256_or_si256(lo, hi));
+                i += 32;
+            }
+            reverse_ssse3(src.add(i), dst.add(i), len - i, width);
+        }
+    }
+}
+
+#[cfg(target_arch = "aarch64")]
+mod arm {
+    use std::arch::aarch64::*;
+
+    use super::reverse_portable;
+
+    /// NEON kernel: byte reversal within words with `rev*`, then `rbit`.
+    ///
+    /// # Safety
+    /// Same contract as `KernelFn`, and the CPU must support NEON.
+    #[target_feature(enable = "neon")]
+    pub(super) unsafe fn reverse_neon(src: *const u8, dst: *mut u8, len: usize, width: usize) {
+        // SAFETY: all loads/stores stay within `len` bytes; each block is loaded
+        // before it is stored, so `src == dst` is fine.
+        unsafe {
+            let mut i = 0;
+            while i + 16 <= len {
+                let v = vld1q_u8(src.add(i));
+                let v = match width {
+                    2 => vrev16q_u8(v),
+                    4 => vrev32q_u8(v),
+                    8 => vrev64q_u8(v),
+                    _ => v,
+                };
+                vst1q_u8(dst.add(i), vrbitq_u8(v));
+                i += 16;
+            }
+            reverse_portable(src.add(i), dst.add(i), len - i, width);
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn reference(data: &[u8], width: usize) -> Vec<u8> {
+        data.chunks(width)
+            .flat_map(|word| word.iter().rev().map(|&b| BIT_REVERSE_TABLE[b as usize]))
+            .collect()
+    }
+
+    #[test]
+    fn registry() {
+        for &kernel in Kernel::ALL {
+            assert_eq!(Kernel::from_name(kernel.name()), Some(kernel));
+            assert_eq!(Kernel::from_index(kernel as u8), kernel);
+        }
+        assert_eq!(Kernel::from_name("missing"), None);
+        assert!(Kernel::detect().is_supported());
+        assert!(available().contains(&Kernel::Lut8));
+    }
+
+    #[test]
+    fn size_classes() {
+        let classes: Vec<usize> = [0, 255, 256, (64 << 10) - 1, 64 << 10, usize::MAX]
+            .into_iter()
+            .map(size_class)
+            .collect();
+        assert_eq!(classes, [0, 0, 1, 1, 2, 2]);
+    }
+
+    #[test]
+    fn reverse_whole_matches_reference() {
+        let data: Vec<u8> = (0..300u32)
+            .map(|i| (i.wrapping_mul(2_654_435_761) >> 13) as u8)
+            .collect();
+        for len in 0..=100 {
+            let src = &data[1..1 + len];
+            let expected: Vec<u8> = src.iter().rev().map(|&b| BIT_REVERSE_TABLE[b as usize]).collect();
+
+            let mut dst = vec![0u8; len];
+            reverse_whole(Some(src), &mut dst);
+            assert_eq!(dst, expected, "len {len}");
+
+            let mut buf = src.to_vec();
+            reverse_whole(None, &mut buf);
+            assert_eq!(buf, expected, "in place, len {len}");
+        }
+    }
+
+    #[test]
+    fn kernels_match_reference() {
+        let data: Vec<u8> = (0..1000u32)
+            .map(|i| (i.wrapping_mul(2_654_435_761) >> 11) as u8)
+            .collect();
+        for kernel in available() {
+            for width in [1, 2, 4, 8] {
+                for len in (0..=200).step_by(width) {
+                    let src = &data[3..3 + len];
+                    let expected = reference(src, width);
+
+                    let mut dst = vec![0u8; len];
+                    unsafe { (kernel.function())(src.as_ptr(), dst.as_mut_ptr(), len, width) };
+                    assert_eq!(dst, expected, "{kernel:?} width {width} len {len}");
+
+                    let mut buf = src.to_vec();
+                    unsafe { (kernel.function())(buf.as_ptr(), buf.as_mut_ptr(), len, width) };
+                    assert_eq!(buf, expected, "{kernel:?} in place, width {width} len {len}");
+                }
+            }
+        }
+    }
+}
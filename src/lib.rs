@@ -1,5 +1,26 @@
+use std::ffi::{CStr, OsString, c_int};
+use std::mem::MaybeUninit;
+use std::slice;
+
+use pyo3::exceptions::{PyTypeError, PyValueError};
+use pyo3::ffi;
+use pyo3::marker::Ungil;
 use pyo3::prelude::*;
-use pyo3::types::PyBytes;
+use pyo3::types::{PyBytes, PyDict, PyInt, PyString, PyTuple};
+
+mod bitstream;
+mod chain;
+mod incremental;
+mod kernels;
+mod parallel;
+mod permute;
+mod records;
+mod tuning;
+
+use bitstream::BitOrder;
+use incremental::{IncompleteWord, StreamMode};
+use kernels::{Kernel, SIZE_CLASSES, Selection};
+use records::{RecordError, RecordFormat};
 
 // Lookup table for bit reversal of all 256 possible byte values
 // Generated at compile time
@@ -22,6 +43,369 @@ const BIT_REVERSE_TABLE: [u8; 256] = {
     table
 };
 
+/// Buffers of at least this many bytes are processed with the GIL released.
+/// Below it, the cost of releasing and re-acquiring the GIL outweighs the work.
+const GIL_RELEASE_THRESHOLD: usize = 64 * 1024;
+
+/// Request a buffer view of `obj` with the given `PyBUF_*` flags.
+///
+/// The view is boxed because exporters may point `shape`/`strides` into the
+/// struct itself, so it must not move while it is held.
+fn acquire_buffer(obj: &Bound<'_, PyAny>, flags: c_int) -> PyResult<Box<ffi::Py_buffer>> {
+    let mut view = Box::new(MaybeUninit::<ffi::Py_buffer>::uninit());
+    // SAFETY: `view` points to writable storage for a `Py_buffer`, which
+    // `PyObject_GetBuffer` fully initializes when it succeeds.
+    let rc = unsafe { ffi::PyObject_GetBuffer(obj.as_ptr(), view.as_mut_ptr(), flags) };
+    if rc == -1 {
+        return Err(PyErr::fetch(obj.py()));
+    }
+    // SAFETY: initialized by the successful `PyObject_GetBuffer` call above.
+    Ok(unsafe { view.assume_init() })
+}
+
+/// Release a view obtained from `acquire_buffer`.
+fn release_buffer(view: &mut ffi::Py_buffer) {
+    // SAFETY: the view was filled by `PyObject_GetBuffer` and is released once.
+    Python::attach(|_| unsafe { ffi::PyBuffer_Release(view) });
+}
+
+/// The raw bytes of an object supporting the buffer protocol.
+///
+/// Unlike `pyo3::buffer::PyBuffer<u8>`, the element format is ignored, so typed
+/// buffers such as `array.array('I')` are seen as plain bytes. The buffer must be
+/// C-contiguous. It is released when dropped.
+struct ByteBuffer {
+    view: Box<ffi::Py_buffer>,
+}
+
+impl ByteBuffer {
+    /// Acquire a read-only view of `obj`.
+    fn get(obj: &Bound<'_, PyAny>) -> PyResult<Self> {
+        let view = acquire_buffer(obj, ffi::PyBUF_C_CONTIGUOUS)?;
+        Ok(Self { view })
+    }
+
+    /// Acquire a view of `obj` that will be written to.
+    fn get_mut(obj: &Bound<'_, PyAny>) -> PyResult<Self> {
+        let buffer = Self::get(obj)?;
+        if buffer.view.readonly != 0 {
+            return Err(PyTypeError::new_err("buffer is read-only"));
+        }
+        Ok(buffer)
+    }
+
+    fn len(&self) -> usize {
+        self.view.len as usize
+    }
+
+    fn as_ptr(&self) -> *const u8 {
+        self.view.buf as *const u8
+    }
+
+    fn as_slice(&self) -> &[u8] {
+        if self.len() == 0 {
+            return &[];
+        }
+        // SAFETY: the exporter guarantees `len` contiguous bytes at `buf` for as
+        // long as the view is held.
+        unsafe { slice::from_raw_parts(self.as_ptr(), self.len()) }
+    }
+
+    /// # Safety
+    /// The buffer must have been acquired with `get_mut`, and no other slice of
+    /// the same memory may be alive while the returned slice is in use.
+    unsafe fn as_mut_slice(&mut self) -> &mut [u8] {
+        if self.len() == 0 {
+            return &mut [];
+        }
+        unsafe { slice::from_raw_parts_mut(self.view.buf as *mut u8, self.len()) }
+    }
+
+    /// Whether both buffers cover exactly the same memory.
+    fn same_memory(&self, other: &ByteBuffer) -> bool {
+        self.as_ptr() == other.as_ptr() && self.len() == other.len()
+    }
+
+    /// Whether the memory of both buffers overlaps.
+    fn overlaps(&self, other: &ByteBuffer) -> bool {
+        let (a, b) = (self.as_ptr() as usize, other.as_ptr() as usize);
+        a < b + other.len() && b < a + self.len()
+    }
+}
+
+impl Drop for ByteBuffer {
+    fn drop(&mut self) {
+        release_buffer(&mut self.view);
+    }
+}
+
+/// A strided view of an array of unsigned integers supporting the buffer
+/// protocol, such as a NumPy `uint8`..`uint64` array. No data is copied.
+/// It is released when dropped.
+struct ArrayBuffer {
+    view: Box<ffi::Py_buffer>,
+}
+
+impl ArrayBuffer {
+    /// Acquire a strided view of `obj` and check that it holds unsigned integers.
+    fn get(obj: &Bound<'_, PyAny>) -> PyResult<Self> {
+        let buffer = Self {
+            view: acquire_buffer(obj, ffi::PyBUF_RECORDS_RO)?,
+        };
+        let format = buffer.format();
+        let code = format.trim_start_matches(['@', '=', '<', '>', '!']);
+        if !matches!(code, "B" | "H" | "I" | "L" | "Q") || !matches!(buffer.itemsize(), 1 | 2 | 4 | 8) {
+            return Err(PyTypeError::new_err(format!(
+                "Unsupported array format '{format}', expected an unsigned integer type (uint8, uint16, uint32 or uint64)"
+            )));
+        }
+        Ok(buffer)
+    }
+
+    fn readonly(&self) -> bool {
+        self.view.readonly != 0
+    }
+
+    fn as_ptr(&self) -> *mut u8 {
+        self.view.buf as *mut u8
+    }
+
+    fn itemsize(&self) -> usize {
+        self.view.itemsize as usize
+    }
+
+    fn format(&self) -> String {
+        if self.view.format.is_null() {
+            return "B".to_owned();
+        }
+        // SAFETY: a non-null format is a NUL-terminated string owned by the view.
+        unsafe { CStr::from_ptr(self.view.format) }
+            .to_string_lossy()
+            .into_owned()
+    }
+
+    /// The shape of the array; a 0-d array is treated as one element.
+    fn shape(&self) -> Vec<usize> {
+        let ndim = self.view.ndim as usize;
+        if ndim == 0 {
+            return vec![1];
+        }
+        // SAFETY: with `PyBUF_STRIDES` requested, `shape` holds `ndim` entries.
+        unsafe { slice::from_raw_parts(self.view.shape, ndim) }
+            .iter()
+            .map(|&n| n as usize)
+            .collect()
+    }
+
+    /// The byte strides of the array, matching `shape`.
+    fn strides(&self) -> Vec<isize> {
+        let ndim = self.view.ndim as usize;
+        if ndim == 0 {
+            return vec![0];
+        }
+        // SAFETY: with `PyBUF_STRIDES` requested, `strides` holds `ndim` entries.
+        unsafe { slice::from_raw_parts(self.view.strides, ndim) }.to_vec()
+    }
+
+    /// Total size in bytes of the elements.
+    fn len(&self) -> usize {
+        self.view.len as usize
+    }
+}
+
+impl Drop for ArrayBuffer {
+    fn drop(&mut self) {
+        release_buffer(&mut self.view);
+    }
+}
+
+/// Whether `strides` describe a C-contiguous layout of `shape`.
+fn is_c_contiguous(shape: &[usize], strides: &[isize], itemsize: usize) -> bool {
+    let mut expected = itemsize as isize;
+    for (&n, &stride) in shape.iter().zip(strides).rev() {
+        if n > 1 && stride != expected {
+            return false;
+        }
+        expected *= n as isize;
+    }
+    true
+}
+
+/// The half-open range of addresses covered by the elements of a strided array,
+/// None if it has no elements.
+fn address_range(ptr: *const u8, shape: &[usize], strides: &[isize], itemsize: usize) -> Option<(usize, usize)> {
+    if shape.contains(&0) {
+        return None;
+    }
+    let (mut start, mut end) = (ptr as usize, ptr as usize + itemsize);
+    for (&n, &stride) in shape.iter().zip(strides) {
+        let extent = (n - 1) * stride.unsigned_abs();
+        if stride < 0 {
+            start -= extent;
+        } else {
+            end += extent;
+        }
+    }
+    Some((start, end))
+}
+
+/// A raw pointer that may be moved to the thread running with the GIL released.
+#[derive(Clone, Copy)]
+struct SendPtr(*mut u8);
+
+// SAFETY: the pointed-to buffer is kept alive and exported by its owner for the
+// whole call; callers are responsible for not aliasing it unsoundly.
+unsafe impl Send for SendPtr {}
+
+/// Run `f`, releasing the GIL while it runs if `len` bytes are worth it.
+fn run_detached<T, F>(py: Python<'_>, len: usize, f: F) -> T
+where
+    F: Ungil + FnOnce() -> T,
+    T: Ungil,
+{
+    if len >= GIL_RELEASE_THRESHOLD {
+        py.detach(f)
+    } else {
+        f()
+    }
+}
+
+/// Bit-reverse every byte of `src` into `dst` (same length), or every byte of
+/// `dst` in place when `src` is `None`.
+fn reverse_each_byte(src: Option<&[u8]>, dst: &mut [u8]) {
+    kernels::reverse_words(src, dst, 1)
+}
+
+#[inline]
+fn reversed_byte(bytes: [u8; 1]) -> [u8; 1] {
+    [inverse_byte(bytes[0])]
+}
+
+#[inline]
+fn reversed_word(bytes: [u8; 2]) -> [u8; 2] {
+    inverse_word(u16::from_le_bytes(bytes)).to_le_bytes()
+}
+
+#[inline]
+fn reversed_dword(bytes: [u8; 4]) -> [u8; 4] {
+    inverse_dword(u32::from_le_bytes(bytes)).to_le_bytes()
+}
+
+#[inline]
+fn reversed_qword(bytes: [u8; 8]) -> [u8; 8] {
+    inverse_qword(u64::from_le_bytes(bytes)).to_le_bytes()
+}
+
+/// Apply `reverse` to every `N`-byte element of a strided array, reading from
+/// `src` and writing to `dst` (which may be the same array).
+///
+/// # Safety
+/// Every element addressed by `shape` and the strides must be valid to read
+/// through `src` and to write through `dst`.
+unsafe fn reverse_strided<const N: usize>(
+    src: SendPtr,
+    dst: SendPtr,
+    shape: &[usize],
+    src_strides: &[isize],
+    dst_strides: &[isize],
+    reverse: impl Fn([u8; N]) -> [u8; N],
+) {
+    if shape.contains(&0) {
+        return;
+    }
+    // Odometer over all but the innermost dimension, which is walked directly.
+    let inner = shape.len() - 1;
+    let mut index = vec![0usize; inner];
+    loop {
+        let (mut s, mut d) = (src.0.cast_const(), dst.0);
+        for (dim, &i) in index.iter().enumerate() {
+            s = s.wrapping_offset(i as isize * src_strides[dim]);
+            d = d.wrapping_offset(i as isize * dst_strides[dim]);
+        }
+        for _ in 0..shape[inner] {
+            // SAFETY: `s` and `d` address elements of the arrays (caller contract).
+            unsafe {
+                d.cast::<[u8; N]>()
+                    .write_unaligned(reverse(s.cast::<[u8; N]>().read_unaligned()))
+            };
+            s = s.wrapping_offset(src_strides[inner]);
+            d = d.wrapping_offset(dst_strides[inner]);
+        }
+
+        let mut dim = inner;
+        loop {
+            if dim == 0 {
+                return;
+            }
+            dim -= 1;
+            index[dim] += 1;
+            if index[dim] < shape[dim] {
+                break;
+            }
+            index[dim] = 0;
+        }
+    }
+}
+
+/// Apply a length-preserving transform to the bytes of `source`.
+///
+/// `apply(Some(src), dst)` must write the result for `src` into `dst`, and
+/// `apply(None, dst)` must transform `dst` in place. The result goes into a new
+/// `bytes` object, or into `out` when given (in place when `out` is the input).
+fn transform<'py, F>(
+    py: Python<'py>,
+    source: ByteBuffer,
+    out: Option<&Bound<'py, PyAny>>,
+    apply: F,
+) -> PyResult<Bound<'py, PyAny>>
+where
+    F: Fn(Option<&[u8]>, &mut [u8]) + Sync,
+{
+    let Some(out) = out else {
+        let src = source.as_slice();
+        let result = PyBytes::new_with(py, src.len(), |dst| {
+            run_detached(py, src.len(), || apply(Some(src), dst));
+            Ok(())
+        })?;
+        return Ok(result.into_any());
+    };
+
+    let mut target = ByteBuffer::get_mut(out)?;
+    if target.len() != source.len() {
+        return Err(PyValueError::new_err(format!(
+            "Output buffer length {} does not match input length {}",
+            target.len(),
+            source.len()
+        )));
+    }
+    if target.same_memory(&source) {
+        drop(source);
+        // SAFETY: `source` is released, so `dst` is the only slice of this memory.
+        let dst = unsafe { target.as_mut_slice() };
+        run_detached(py, dst.len(), || apply(None, dst));
+    } else if target.overlaps(&source) {
+        return Err(PyValueError::new_err("Output buffer overlaps the input buffer"));
+    } else {
+        let src = source.as_slice();
+        // SAFETY: `dst` does not overlap `src`, checked above.
+        let dst = unsafe { target.as_mut_slice() };
+        run_detached(py, dst.len(), || apply(Some(src), dst));
+    }
+    Ok(out.clone())
+}
+
+/// Apply an in-place transform to the bytes of a writable buffer.
+fn transform_in_place<F>(py: Python<'_>, buffer: &Bound<'_, PyAny>, apply: F) -> PyResult<()>
+where
+    F: Fn(Option<&[u8]>, &mut [u8]) + Sync,
+{
+    let mut target = ByteBuffer::get_mut(buffer)?;
+    // SAFETY: this is the only slice of the buffer's memory held by this call.
+    let data = unsafe { target.as_mut_slice() };
+    run_detached(py, data.len(), || apply(None, data));
+    Ok(())
+}
+
 /// Reverse the bits of an 8-bit unsigned integer.
 ///
 /// # Arguments
@@ -50,9 +434,7 @@ fn inverse_byte(value: u8) -> u8 {
 #[pyfunction]
 #[inline]
 fn inverse_word(value: u16) -> u16 {
-    let low = BIT_REVERSE_TABLE[(value & 0xFF) as usize] as u16;
-    let high = BIT_REVERSE_TABLE[(value >> 8) as usize] as u16;
-    (low << 8) | high
+    value.reverse_bits()
 }
 
 /// Reverse the bits of a 32-bit unsigned integer.
@@ -65,11 +447,7 @@ fn inverse_word(value: u16) -> u16 {
 #[pyfunction]
 #[inline]
 fn inverse_dword(value: u32) -> u32 {
-    let b0 = BIT_REVERSE_TABLE[(value & 0xFF) as usize] as u32;
-    let b1 = BIT_REVERSE_TABLE[((value >> 8) & 0xFF) as usize] as u32;
-    let b2 = BIT_REVERSE_TABLE[((value >> 16) & 0xFF) as usize] as u32;
-    let b3 = BIT_REVERSE_TABLE[(value >> 24) as usize] as u32;
-    (b0 << 24) | (b1 << 16) | (b2 << 8) | b3
+    value.reverse_bits()
 }
 
 /// Reverse the bits of a 64-bit unsigned integer.
@@ -82,39 +460,911 @@ fn inverse_dword(value: u32) -> u32 {
 #[pyfunction]
 #[inline]
 fn inverse_qword(value: u64) -> u64 {
-    let b0 = BIT_REVERSE_TABLE[(value & 0xFF) as usize] as u64;
-    let b1 = BIT_REVERSE_TABLE[((value >> 8) & 0xFF) as usize] as u64;
-    let b2 = BIT_REVERSE_TABLE[((value >> 16) & 0xFF) as usize] as u64;
-    let b3 = BIT_REVERSE_TABLE[((value >> 24) & 0xFF) as usize] as u64;
-    let b4 = BIT_REVERSE_TABLE[((value >> 32) & 0xFF) as usize] as u64;
-    let b5 = BIT_REVERSE_TABLE[((value >> 40) & 0xFF) as usize] as u64;
-    let b6 = BIT_REVERSE_TABLE[((value >> 48) & 0xFF) as usize] as u64;
-    let b7 = BIT_REVERSE_TABLE[(value >> 56) as usize] as u64;
-    (b0 << 56) | (b1 << 48) | (b2 << 40) | (b3 << 32) | (b4 << 24) | (b5 << 16) | (b6 << 8) | b7
+    value.reverse_bits()
+}
+
+/// Reverse the bits of a single byte, validating its range.
+///
+/// Native implementation of `revbits.reverser.reverse_byte`.
+///
+/// # Arguments
+/// * `value` - An unsigned 8-bit integer (0-255)
+///
+/// # Returns
+/// The bit-reversed value as an 8-bit integer
+///
+/// # Errors
+/// `ValueError` if `value` is an integer outside 0-255
+#[pyfunction]
+fn reverse_byte(value: &Bound<'_, PyAny>) -> PyResult<u8> {
+    match value.extract::<u8>() {
+        Ok(value) => Ok(BIT_REVERSE_TABLE[value as usize]),
+        Err(_) if value.is_instance_of::<PyInt>() => Err(PyValueError::new_err(format!(
+            "Value {value} is out of range for byte (0-255)"
+        ))),
+        Err(err) => Err(err),
+    }
 }
 
-/// Reverse the bits of each byte in a bytes object.
+/// Reverse the bits of a bytes object, validating and dispatching in one call.
+///
+/// Native implementation of `revbits.reverser.reverse_bytes`. Without
+/// `bit_width`, inputs of 1, 2, 4 or 8 bytes are reversed as a single word and
+/// other lengths byte by byte. With `bit_width`, every word of that width is
+/// reversed.
 ///
 /// # Arguments
-/// * `value` - A bytes slice
+/// * `value` - Any C-contiguous buffer
+/// * `bit_width` - Optional word size in bits (8, 16, 32 or 64); the length of
+///   `value` must be a multiple of the word size
 ///
 /// # Returns
-/// A new PyBytes object with each byte's bits reversed individually
+/// A new PyBytes object with bits reversed
+///
+/// # Errors
+/// `ValueError` if the length is not a multiple of `bit_width`, or if
+/// `bit_width` is not supported
 #[pyfunction]
-fn inverse_bytes<'py>(py: Python<'py>, value: &[u8]) -> Bound<'py, PyBytes> {
-    let result: Vec<u8> = value.iter().map(|&b| BIT_REVERSE_TABLE[b as usize]).collect();
-    PyBytes::new(py, &result)
+#[pyo3(signature = (value, bit_width = None))]
+fn reverse_bytes<'py>(
+    py: Python<'py>,
+    value: &Bound<'py, PyAny>,
+    bit_width: Option<i64>,
+) -> PyResult<Bound<'py, PyAny>> {
+    let source = ByteBuffer::get(value)?;
+    let len = source.len();
+    let width = match bit_width {
+        Some(bit_width) => {
+            let expected_len = bit_width.div_euclid(8);
+            if expected_len <= 0 || len as i64 % expected_len != 0 {
+                return Err(PyValueError::new_err(format!(
+                    "Value length {len} bytes does not match specified bit_width {bit_width} \
+                     (expected a multiple of {expected_len} bytes)"
+                )));
+            }
+            word_size(bit_width as usize, len)?
+        }
+        None if matches!(len, 1 | 2 | 4 | 8) => len,
+        None => 1,
+    };
+    transform(py, source, None, |src, dst| kernels::reverse_words(src, dst, width))
+}
+
+/// Reverse the lowest `width` bits of an unsigned integer of any size.
+///
+/// Widths up to 64 bits are reversed within a single machine word. Wider values,
+/// including Python big ints, are converted to little-endian bytes, every byte is
+/// reversed by the bulk kernel and the bytes are read back in big-endian order;
+/// a final shift drops the padding bits of the most significant byte.
+///
+/// # Arguments
+/// * `value` - A non-negative integer below `2**width`
+/// * `width` - Number of bits to reverse (at least 1)
+///
+/// # Returns
+/// The bit-reversed value
+///
+/// # Errors
+/// `ValueError` if `width` is 0, or if `value` is negative or wider than `width` bits
+#[pyfunction]
+fn inverse_bits<'py>(value: &Bound<'py, PyInt>, width: usize) -> PyResult<Bound<'py, PyAny>> {
+    let py = value.py();
+    if width == 0 {
+        return Err(PyValueError::new_err("Bit width must be at least 1"));
+    }
+    let bit_length: usize = value.call_method0("bit_length")?.extract()?;
+    if bit_length > width || value.lt(0)? {
+        return Err(PyValueError::new_err(format!(
+            "Value {value} is out of range for bit width {width}"
+        )));
+    }
+
+    if width <= 64 {
+        let value: u64 = value.extract()?;
+        return Ok((value.reverse_bits() >> (64 - width)).into_pyobject(py)?.into_any());
+    }
+
+    let len = width.div_ceil(8);
+    let bytes = value.call_method1("to_bytes", (len, "little"))?;
+    let source = ByteBuffer::get(&bytes)?;
+    let reversed = PyBytes::new_with(py, len, |dst| {
+        reverse_each_byte(Some(source.as_slice()), dst);
+        Ok(())
+    })?;
+    let result = py.get_type::<PyInt>().call_method1("from_bytes", (reversed, "big"))?;
+    result.rshift(len * 8 - width)
+}
+
+/// Reverse the bits of each byte in a buffer.
+///
+/// # Arguments
+/// * `value` - Any C-contiguous buffer (`bytes`, `bytearray`, `memoryview`, ...)
+/// * `out` - Optional writable buffer of the same length receiving the result.
+///   It may be `value` itself, which reverses `value` in place.
+/// * `threads` - Number of threads for buffers above the parallel threshold
+///   (0: one per CPU, `None`: the default set by `set_num_threads`)
+///
+/// # Returns
+/// A new PyBytes object with each byte's bits reversed individually, or `out`
+/// if it was given
+///
+/// # Errors
+/// `TypeError` if `out` is read-only, `ValueError` if `out` has a different
+/// length than `value` or partially overlaps it
+#[pyfunction]
+#[pyo3(signature = (value, /, out = None, *, threads = None))]
+fn inverse_bytes<'py>(
+    py: Python<'py>,
+    value: &Bound<'py, PyAny>,
+    out: Option<&Bound<'py, PyAny>>,
+    threads: Option<usize>,
+) -> PyResult<Bound<'py, PyAny>> {
+    let threads = parallel::resolve_threads(threads);
+    transform(py, ByteBuffer::get(value)?, out, |src, dst| {
+        parallel::for_each_chunk(src, dst, threads, &reverse_each_byte)
+    })
+}
+
+/// Reverse the bits of each byte of a writable buffer in place.
+///
+/// The buffer is modified directly, without any intermediate copy, which makes
+/// this suitable for memory-mapped files and recycled receive buffers. The
+/// element format is ignored, so `array.array` of any type code is accepted.
+///
+/// # Arguments
+/// * `buffer` - A writable, C-contiguous buffer (e.g. `bytearray`, `mmap`)
+/// * `threads` - Number of threads, as for `inverse_bytes`
+///
+/// # Errors
+/// `TypeError` if the buffer is read-only, `BufferError` if it is not C-contiguous
+#[pyfunction]
+#[pyo3(signature = (buffer, /, *, threads = None))]
+fn inverse_bytes_inplace(py: Python<'_>, buffer: &Bound<'_, PyAny>, threads: Option<usize>) -> PyResult<()> {
+    let threads = parallel::resolve_threads(threads);
+    transform_in_place(py, buffer, |src, dst| {
+        parallel::for_each_chunk(src, dst, threads, &reverse_each_byte)
+    })
+}
+
+/// Reverse the bits of every word of a buffer holding consecutive words.
+///
+/// All words are reversed in a single native call, e.g. the contents of an
+/// `array.array('I')` with `bit_width=32`. Since reversing all bits of a word
+/// mirrors its bytes, the result is the same for little- and big-endian data.
+///
+/// # Arguments
+/// * `value` - Any C-contiguous buffer whose length is a multiple of the word size
+/// * `bit_width` - Word size in bits (8, 16, 32 or 64)
+/// * `out` - Optional writable buffer of the same length receiving the result.
+///   It may be `value` itself, which reverses `value` in place.
+/// * `threads` - Number of threads, as for `inverse_bytes`
+///
+/// # Returns
+/// A new PyBytes object with the words in the same layout, or `out` if it was given
+///
+/// # Errors
+/// `ValueError` if `bit_width` is unsupported, if the length is not a multiple of
+/// the word size, or for the same `out` errors as `inverse_bytes`
+#[pyfunction]
+#[pyo3(signature = (value, bit_width, /, out = None, *, threads = None))]
+fn inverse_words<'py>(
+    py: Python<'py>,
+    value: &Bound<'py, PyAny>,
+    bit_width: usize,
+    out: Option<&Bound<'py, PyAny>>,
+    threads: Option<usize>,
+) -> PyResult<Bound<'py, PyAny>> {
+    let source = ByteBuffer::get(value)?;
+    let width = word_size(bit_width, source.len())?;
+    let threads = parallel::resolve_threads(threads);
+    let reverse = |src: Option<&[u8]>, dst: &mut [u8]| kernels::reverse_words(src, dst, width);
+    transform(py, source, out, |src, dst| {
+        parallel::for_each_chunk(src, dst, threads, &reverse)
+    })
+}
+
+/// Reverse all bits of a buffer as if it were a single integer.
+///
+/// The first byte of the result is the last byte of `value` with its bits
+/// reversed, and so on: the whole bit sequence is mirrored, in one pass.
+///
+/// # Arguments
+/// * `value` - Any C-contiguous buffer
+/// * `out` - Optional writable buffer of the same length receiving the result.
+///   It may be `value` itself, which reverses `value` in place.
+///
+/// # Returns
+/// A new PyBytes object with the reversed bit sequence, or `out` if it was given
+///
+/// # Errors
+/// The same `out` errors as `inverse_bytes`
+#[pyfunction]
+#[pyo3(signature = (value, /, out = None))]
+fn inverse_whole<'py>(
+    py: Python<'py>,
+    value: &Bound<'py, PyAny>,
+    out: Option<&Bound<'py, PyAny>>,
+) -> PyResult<Bound<'py, PyAny>> {
+    transform(py, ByteBuffer::get(value)?, out, kernels::reverse_whole)
+}
+
+/// Reverse a sequence of bits whose length need not be a multiple of 8.
+///
+/// `buffer` holds the `nbits` bits in `ceil(nbits / 8)` bytes, such as a serial
+/// capture or a JTAG shift chain. The first bit of the sequence is the most
+/// significant bit of the first byte for `bit_order="msb"`, or its least
+/// significant bit for `"lsb"`; the bits after the sequence in the last byte are
+/// padding. The buffer is mirrored and shifted by the padding word by word, in
+/// one pass.
+///
+/// # Arguments
+/// * `buffer` - Any C-contiguous buffer of `ceil(nbits / 8)` bytes
+/// * `nbits` - Number of bits in the sequence
+/// * `out` - Optional writable buffer of the same length receiving the result.
+///   It may be `buffer` itself, which reverses `buffer` in place.
+/// * `bit_order` - `"msb"` (default) or `"lsb"`
+///
+/// # Returns
+/// A new PyBytes object with the reversed sequence in the same layout and the
+/// padding bits cleared, or `out` if it was given
+///
+/// # Errors
+/// `ValueError` if `bit_order` is unknown or the length of `buffer` does not
+/// match `nbits`, and the same `out` errors as `inverse_bytes`
+#[pyfunction]
+#[pyo3(signature = (buffer, nbits, /, out = None, *, bit_order = "msb"))]
+fn reverse_bitstream<'py>(
+    py: Python<'py>,
+    buffer: &Bound<'py, PyAny>,
+    nbits: usize,
+    out: Option<&Bound<'py, PyAny>>,
+    bit_order: &str,
+) -> PyResult<Bound<'py, PyAny>> {
+    let order = BitOrder::from_name(bit_order).ok_or_else(|| {
+        PyValueError::new_err(format!(
+            "Unknown bit order '{bit_order}'. Supported bit orders are msb, lsb."
+        ))
+    })?;
+    let source = ByteBuffer::get(buffer)?;
+    if source.len() != nbits.div_ceil(8) {
+        return Err(PyValueError::new_err(format!(
+            "Buffer length {} bytes does not match {nbits} bits ({} bytes)",
+            source.len(),
+            nbits.div_ceil(8)
+        )));
+    }
+    transform(py, source, out, |src, dst| {
+        bitstream::reverse_bitstream(src, dst, nbits, order)
+    })
+}
+
+/// Reverse the bits of the data bytes of Intel HEX or Motorola S-record text.
+///
+/// Every line holds one record. Data records (Intel HEX type 00, S-records S1,
+/// S2 and S3) keep their address, while each payload byte is bit-reversed and the
+/// checksum is recomputed; the rewritten records use upper-case hex digits. All
+/// other records, blank lines and line endings are copied unchanged, so the
+/// result has the length of `text`. Split a long text at line ends to process it
+/// in pieces.
+///
+/// # Arguments
+/// * `text` - Any C-contiguous buffer of complete lines
+/// * `record_format` - `"ihex"` or `"srec"`
+/// * `first_line` - Line number of the first line of `text`, used in errors
+///
+/// # Returns
+/// A new PyBytes object with the rewritten records
+///
+/// # Errors
+/// `ValueError` if `record_format` is unknown, or a record is malformed or its
+/// checksum is wrong; the message names the line
+#[pyfunction]
+#[pyo3(signature = (text, record_format, /, *, first_line = 1))]
+fn reverse_record_text<'py>(
+    py: Python<'py>,
+    text: &Bound<'py, PyAny>,
+    record_format: &str,
+    first_line: usize,
+) -> PyResult<Bound<'py, PyBytes>> {
+    let format = RecordFormat::from_name(record_format).ok_or_else(|| {
+        PyValueError::new_err(format!(
+            "Unknown record format '{record_format}'. Supported formats are ihex, srec."
+        ))
+    })?;
+    let source = ByteBuffer::get(text)?;
+    let src = source.as_slice();
+    PyBytes::new_with(py, src.len(), |dst| {
+        dst.copy_from_slice(src);
+        run_detached(py, dst.len(), || records::reverse_records(dst, format)).map_err(|RecordError { line, reason }| {
+            PyValueError::new_err(format!(
+                "Invalid {} in line {}: {reason}",
+                format.description(),
+                first_line + line
+            ))
+        })
+    })
+}
+
+/// Validate `bit_width` for a buffer of `len` bytes and return the word size in bytes.
+fn word_size(bit_width: usize, len: usize) -> PyResult<usize> {
+    if !matches!(bit_width, 8 | 16 | 32 | 64) {
+        return Err(PyValueError::new_err(format!(
+            "Unsupported bit_width {bit_width}. Supported bit widths are 8, 16, 32, 64."
+        )));
+    }
+    let width = bit_width / 8;
+    if len % width != 0 {
+        return Err(PyValueError::new_err(format!(
+            "Value length {len} bytes is not a multiple of bit_width {bit_width} ({width} bytes)"
+        )));
+    }
+    Ok(width)
+}
+
+/// Reverse the bits of every element of an unsigned integer array.
+///
+/// Each element is reversed at its own width (8, 16, 32 or 64 bits). Any object
+/// exporting a strided buffer of unsigned integers is accepted, such as C-contiguous
+/// or strided NumPy `uint8`..`uint64` arrays; nothing is copied.
+///
+/// # Arguments
+/// * `value` - The input array
+/// * `out` - A writable array of the same shape and element size receiving the
+///   result. It may be `value` itself, which reverses `value` in place.
+/// * `threads` - Number of threads for C-contiguous arrays, as for `inverse_bytes`;
+///   strided arrays are walked on one thread
+///
+/// # Errors
+/// `TypeError` if an array does not hold unsigned integers or `out` is read-only,
+/// `ValueError` if the shapes or element sizes differ, or if `out` overlaps `value`
+/// without being the same view of it
+#[pyfunction]
+#[pyo3(signature = (value, out, /, *, threads = None))]
+fn inverse_array(
+    py: Python<'_>,
+    value: &Bound<'_, PyAny>,
+    out: &Bound<'_, PyAny>,
+    threads: Option<usize>,
+) -> PyResult<()> {
+    let source = ArrayBuffer::get(value)?;
+    let target = ArrayBuffer::get(out)?;
+    if target.readonly() {
+        return Err(PyTypeError::new_err("buffer is read-only"));
+    }
+    let shape = source.shape();
+    if target.shape() != shape || target.itemsize() != source.itemsize() {
+        return Err(PyValueError::new_err(format!(
+            "Output array (shape {:?}, {}-byte elements) does not match input array (shape {:?}, {}-byte elements)",
+            target.shape(),
+            target.itemsize(),
+            shape,
+            source.itemsize()
+        )));
+    }
+
+    let itemsize = source.itemsize();
+    let (src_strides, dst_strides) = (source.strides(), target.strides());
+    let (src, dst) = (SendPtr(source.as_ptr()), SendPtr(target.as_ptr()));
+    let len = source.len();
+
+    if is_c_contiguous(&shape, &src_strides, itemsize) && is_c_contiguous(&shape, &dst_strides, itemsize) {
+        if len == 0 {
+            return Ok(());
+        }
+        let threads = parallel::resolve_threads(threads);
+        let reverse = |src: Option<&[u8]>, dst: &mut [u8]| kernels::reverse_words(src, dst, itemsize);
+        if src.0 == dst.0 {
+            // SAFETY: `dst` covers `len` bytes and is the only slice of them.
+            let data = unsafe { slice::from_raw_parts_mut(dst.0, len) };
+            run_detached(py, len, || parallel::for_each_chunk(None, data, threads, &reverse));
+        } else {
+            let (a, b) = (src.0 as usize, dst.0 as usize);
+            if a < b + len && b < a + len {
+                return Err(PyValueError::new_err("Output buffer overlaps the input buffer"));
+            }
+            // SAFETY: both arrays cover `len` contiguous bytes and do not overlap.
+            let (src, dst) = unsafe { (slice::from_raw_parts(src.0, len), slice::from_raw_parts_mut(dst.0, len)) };
+            run_detached(py, len, || parallel::for_each_chunk(Some(src), dst, threads, &reverse));
+        }
+        return Ok(());
+    }
+
+    // The same view is reversed element by element in place, but an element of a
+    // different view of overlapping memory could be read after it was written.
+    if src.0 != dst.0 || src_strides != dst_strides {
+        let source_range = address_range(src.0, &shape, &src_strides, itemsize);
+        let target_range = address_range(dst.0, &shape, &dst_strides, itemsize);
+        if let (Some((a, a_end)), Some((b, b_end))) = (source_range, target_range) {
+            if a < b_end && b < a_end {
+                return Err(PyValueError::new_err("Output buffer overlaps the input buffer"));
+            }
+        }
+    }
+
+    let walk = move || {
+        let (shape, src_strides, dst_strides) = (&shape, &src_strides, &dst_strides);
+        // SAFETY: the strides come from the exporters and address their elements;
+        // each element is read before it is written, so the same view is fine,
+        // and other views do not overlap.
+        unsafe {
+            match itemsize {
+                1 => reverse_strided(src, dst, shape, src_strides, dst_strides, reversed_byte),
+                2 => reverse_strided(src, dst, shape, src_strides, dst_strides, reversed_word),
+                4 => reverse_strided(src, dst, shape, src_strides, dst_strides, reversed_dword),
+                _ => reverse_strided(src, dst, shape, src_strides, dst_strides, reversed_qword),
+            }
+        }
+    };
+    run_detached(py, len, walk);
+    Ok(())
+}
+
+/// Reorder the elements of a buffer into bit-reversed index order, in place.
+///
+/// Element `i` is swapped with element `j` where `j` is `i` with its `log2n`
+/// index bits reversed, as for the input or output of a radix-2 FFT. The bits of
+/// the elements themselves are unchanged. Elements are swapped in cache-sized
+/// tiles, so large buffers are permuted without a full pass per index bit.
+///
+/// # Arguments
+/// * `buffer` - A writable, C-contiguous buffer of `item_size << log2n` bytes
+/// * `item_size` - Size of one element in bytes, e.g. 16 for `complex128`
+/// * `log2n` - Base-2 logarithm of the number of elements
+///
+/// # Errors
+/// `ValueError` if `item_size` is 0 or the buffer length does not match,
+/// `TypeError` if the buffer is read-only, `BufferError` if it is not C-contiguous
+#[pyfunction]
+fn bitrev_permute(py: Python<'_>, buffer: &Bound<'_, PyAny>, item_size: usize, log2n: u32) -> PyResult<()> {
+    if item_size == 0 {
+        return Err(PyValueError::new_err("Item size must be at least 1"));
+    }
+    let mut target = ByteBuffer::get_mut(buffer)?;
+    let expected = 1usize.checked_shl(log2n).and_then(|n| n.checked_mul(item_size));
+    if expected != Some(target.len()) {
+        return Err(PyValueError::new_err(format!(
+            "Buffer length {} bytes does not match 2**{log2n} elements of {item_size} bytes",
+            target.len()
+        )));
+    }
+    // SAFETY: this is the only slice of the buffer's memory held by this call.
+    let data = unsafe { target.as_mut_slice() };
+    run_detached(py, data.len(), || permute::bitrev_permute(data, item_size, log2n));
+    Ok(())
+}
+
+/// Incremental bit reversal of a stream fed in chunks of any size.
+///
+/// Like a `hashlib` object, a `Reverser` receives the input through `update`,
+/// but every call returns the output that is complete so far: chunk boundaries
+/// need not line up with word boundaries, and the bytes of a partial word are
+/// carried to the next call. `finalize` returns what was held back until the
+/// end of the input and resets the object for the next stream. Each call
+/// allocates its output once and the native kernels write into it directly.
+///
+/// The output of all calls together equals `reverse_buffer(data, mode, bit_width)`:
+/// * `"byte"` and `"word"` return every complete word immediately
+/// * `"auto"` holds inputs of up to 8 bytes back, since a 1, 2, 4 or 8 byte
+///   input is reversed as one word; longer inputs are reversed byte by byte
+///   (or word by word with `bit_width`)
+/// * `"whole"` needs the end of the input first: `update` keeps a copy of
+///   every chunk and returns nothing, `finalize` returns the mirrored input
+///
+/// A `Reverser` holds the state of one stream: a call made while another
+/// thread is inside a method of the same object raises `RuntimeError`.
+#[pyclass(module = "revbits._core")]
+struct Reverser {
+    state: incremental::Incremental,
+    mode: &'static str,
+    bit_width: Option<usize>,
+}
+
+#[pymethods]
+impl Reverser {
+    /// # Errors
+    /// `ValueError` for an unknown mode, an unsupported `bit_width`, a missing
+    /// `bit_width` for `"word"` or one given for `"byte"` or `"whole"`
+    #[new]
+    #[pyo3(signature = (mode = "auto", bit_width = None))]
+    fn new(mode: &str, bit_width: Option<usize>) -> PyResult<Self> {
+        let (mode, stream_mode) = match (mode, bit_width) {
+            ("auto", None) => ("auto", StreamMode::Auto),
+            ("byte", None) => ("byte", StreamMode::Byte),
+            ("whole", None) => ("whole", StreamMode::Whole),
+            ("word", None) => return Err(PyValueError::new_err("Mode 'word' requires a bit_width")),
+            ("byte" | "whole", Some(_)) => {
+                return Err(PyValueError::new_err(format!(
+                    "Mode '{mode}' does not take a bit_width"
+                )));
+            }
+            ("auto", Some(bit_width)) => ("auto", StreamMode::Word(word_size(bit_width, 0)?)),
+            ("word", Some(bit_width)) => ("word", StreamMode::Word(word_size(bit_width, 0)?)),
+            _ => {
+                return Err(PyValueError::new_err(format!(
+                    "Unknown mode '{mode}'. Supported modes are auto, byte, word, whole."
+                )));
+            }
+        };
+        Ok(Self {
+            state: incremental::Incremental::new(stream_mode),
+            mode,
+            bit_width,
+        })
+    }
+
+    /// Reverse the next chunk of the stream.
+    ///
+    /// # Arguments
+    /// * `data` - Any C-contiguous buffer
+    ///
+    /// # Returns
+    /// The output completed by this chunk, possibly empty
+    fn update<'py>(&mut self, py: Python<'py>, data: &Bound<'py, PyAny>) -> PyResult<Bound<'py, PyBytes>> {
+        let source = ByteBuffer::get(data)?;
+        let input = source.as_slice();
+        let state = &mut self.state;
+        PyBytes::new_with(py, state.update_len(input.len()), |out| {
+            run_detached(py, input.len(), || state.update(input, out));
+            Ok(())
+        })
+    }
+
+    /// End the stream and reset the object for the next one.
+    ///
+    /// # Returns
+    /// The output held back until the end of the input
+    ///
+    /// # Errors
+    /// `ValueError` if the input ended in the middle of a word
+    fn finalize<'py>(&mut self, py: Python<'py>) -> PyResult<Bound<'py, PyBytes>> {
+        let state = &mut self.state;
+        PyBytes::new_with(py, state.finish_len(), |out| {
+            run_detached(py, out.len(), || state.finish(out)).map_err(|IncompleteWord { total, width }| {
+                PyValueError::new_err(format!(
+                    "Input length {total} bytes is not a multiple of bit_width {} ({width} bytes)",
+                    width * 8
+                ))
+            })
+        })
+    }
+
+    #[getter]
+    fn mode(&self) -> &'static str {
+        self.mode
+    }
+
+    #[getter]
+    fn bit_width(&self) -> Option<usize> {
+        self.bit_width
+    }
+
+    /// Number of input bytes held back until more input or `finalize`.
+    #[getter]
+    fn pending(&self) -> usize {
+        self.state.pending()
+    }
+}
+
+/// A chain of byte-wise operations applied in a single pass over a buffer.
+///
+/// The operations are applied in order, as if one after another:
+/// * `"reverse"`: reverse the bits of every byte, like `inverse_bytes`
+/// * `"swap16"`, `"swap32"`, `"swap64"`: reverse the byte order of every 2, 4 or 8-byte word
+/// * `"xor:HEX"`: XOR with a key of hex digits, repeated over the stream
+/// * `"invert"`: flip every bit
+///
+/// The chain is compiled once into a byte permutation, an optional bit reversal
+/// and a periodic XOR mask, and a buffer is transformed tile by tile: the bulk
+/// kernels move and reverse each tile and the mask is applied while the tile is
+/// in the cache. `"reverse,swap32"` therefore runs the kernel of
+/// `inverse_words(value, 32)` and nothing else.
+#[pyclass(frozen, module = "revbits._core")]
+struct TransformChain {
+    ops: Vec<String>,
+    chain: chain::Chain,
+}
+
+#[pymethods]
+impl TransformChain {
+    /// # Arguments
+    /// * `ops` - A comma-separated string such as `"reverse,swap32,xor:5a"`, or
+    ///   an iterable of operation strings
+    ///
+    /// # Errors
+    /// `ValueError` for an empty chain, an unknown operation, an invalid XOR key
+    /// or XOR keys whose combined period exceeds 1 MiB
+    #[new]
+    fn new(ops: &Bound<'_, PyAny>) -> PyResult<Self> {
+        let texts: Vec<String> = if let Ok(text) = ops.cast::<PyString>() {
+            text.to_str()?.split(',').map(str::to_owned).collect()
+        } else {
+            ops.try_iter()?.map(|op| op?.extract()).collect::<PyResult<_>>()?
+        };
+        let ops = texts
+            .iter()
+            .map(|text| chain::Op::parse(text))
+            .collect::<Result<Vec<_>, _>>()
+            .map_err(PyValueError::new_err)?;
+        if ops.is_empty() {
+            return Err(PyValueError::new_err("A transform chain needs at least one operation"));
+        }
+        let chain = chain::Chain::compile(&ops).map_err(PyValueError::new_err)?;
+        Ok(Self {
+            ops: ops.iter().map(chain::Op::name).collect(),
+            chain,
+        })
+    }
+
+    /// Apply the chain to a buffer.
+    ///
+    /// # Arguments
+    /// * `value` - Any C-contiguous buffer whose length is a multiple of `block_size`
+    /// * `out` - Optional writable buffer of the same length receiving the result.
+    ///   It may be `value` itself, which transforms `value` in place.
+    /// * `offset` - Position of `value` within a longer stream, a multiple of
+    ///   `block_size`; it sets which byte of each XOR key the buffer starts with
+    /// * `threads` - Number of threads, as for `inverse_bytes`
+    ///
+    /// # Returns
+    /// A new PyBytes object with the result, or `out` if it was given
+    ///
+    /// # Errors
+    /// `ValueError` if the length or `offset` is not a multiple of `block_size`,
+    /// and the same `out` errors as `inverse_bytes`
+    #[pyo3(signature = (value, /, out = None, *, offset = 0, threads = None))]
+    fn apply<'py>(
+        &self,
+        py: Python<'py>,
+        value: &Bound<'py, PyAny>,
+        out: Option<&Bound<'py, PyAny>>,
+        offset: usize,
+        threads: Option<usize>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let source = ByteBuffer::get(value)?;
+        let block = self.chain.block_size();
+        if source.len() % block != 0 {
+            return Err(PyValueError::new_err(format!(
+                "Buffer length {} is not a multiple of the block size of the chain ({block} bytes)",
+                source.len()
+            )));
+        }
+        if offset % block != 0 {
+            return Err(PyValueError::new_err(format!(
+                "Offset {offset} is not a multiple of the block size of the chain ({block} bytes)"
+            )));
+        }
+        let threads = parallel::resolve_threads(threads);
+        let chain = &self.chain;
+        transform(py, source, out, |src, dst| {
+            // Chunks start at multiples of 64 bytes; their position sets the mask phase
+            let base = dst.as_ptr() as usize;
+            let apply = |src: Option<&[u8]>, chunk: &mut [u8]| {
+                chain.apply(src, chunk, offset + (chunk.as_ptr() as usize - base));
+            };
+            parallel::for_each_chunk(src, dst, threads, &apply);
+        })
+    }
+
+    /// The operations in canonical form, such as `("reverse", "xor:5a")`.
+    #[getter]
+    fn ops<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyTuple>> {
+        PyTuple::new(py, &self.ops)
+    }
+
+    /// Number of bytes (1, 2, 4 or 8) that lengths and offsets must be a multiple of,
+    /// the largest word size the byte swaps of the chain work on.
+    #[getter]
+    fn block_size(&self) -> usize {
+        self.chain.block_size()
+    }
+
+    fn __repr__(&self) -> String {
+        format!("TransformChain('{}')", self.ops.join(","))
+    }
+}
+
+/// Name of the bulk bit-reversal kernel used for buffers of `nbytes` bytes.
+///
+/// The kernels are selected on first use. Without a cached calibration, small
+/// buffers use the kernel detected from the CPU features, and the first medium
+/// or large buffer runs the calibration of `calibrate_kernels` once per CPU.
+///
+/// # Arguments
+/// * `nbytes` - Buffer size in bytes; the kernel of the largest size class if `None`
+///
+/// # Returns
+/// One of the names returned by `available_kernels`
+#[pyfunction]
+#[pyo3(signature = (nbytes=None))]
+fn active_kernel(py: Python<'_>, nbytes: Option<usize>) -> &'static str {
+    py.detach(|| kernels::active(nbytes.unwrap_or(usize::MAX)).name())
+}
+
+/// Names of the bulk bit-reversal kernels supported by the running CPU.
+///
+/// # Returns
+/// `"lut8"`, `"lut16"` and `"portable"`, followed by `"ssse3"` and `"avx2"`
+/// or `"neon"` where supported
+#[pyfunction]
+fn available_kernels() -> Vec<&'static str> {
+    kernels::available().into_iter().map(Kernel::name).collect()
+}
+
+fn selection_dict(py: Python<'_>, selection: Selection) -> PyResult<Bound<'_, PyDict>> {
+    let dict = PyDict::new(py);
+    for (class, kernel) in SIZE_CLASSES.into_iter().zip(selection) {
+        dict.set_item(class, kernel.name())?;
+    }
+    Ok(dict)
+}
+
+/// The kernel used for each buffer size class.
+///
+/// Like a reversal of a large buffer, this runs a deferred calibration first.
+///
+/// # Returns
+/// A dict mapping `"small"` (below 256 bytes), `"medium"` (below 64 KiB) and
+/// `"large"` to kernel names
+#[pyfunction]
+fn kernel_selection(py: Python<'_>) -> PyResult<Bound<'_, PyDict>> {
+    selection_dict(py, py.detach(kernels::selection))
+}
+
+/// Force a bulk bit-reversal kernel, or go back to the calibrated one.
+///
+/// # Arguments
+/// * `name` - Name of a kernel from `available_kernels`, or `None` to restore
+///   the calibrated selection
+/// * `size_class` - `"small"`, `"medium"` or `"large"` to change only that
+///   class, or `None` for all of them
+///
+/// # Errors
+/// Returns `ValueError` if the kernel or size class is unknown, or if the
+/// running CPU does not support the kernel
+#[pyfunction]
+#[pyo3(signature = (name, size_class=None))]
+fn set_kernel(py: Python<'_>, name: Option<&str>, size_class: Option<&str>) -> PyResult<()> {
+    let class = size_class
+        .map(|size_class| {
+            SIZE_CLASSES
+                .iter()
+                .position(|&class| class == size_class)
+                .ok_or_else(|| {
+                    PyValueError::new_err(format!(
+                        "Unknown size class '{size_class}'. Supported size classes are {}.",
+                        SIZE_CLASSES.join(", ")
+                    ))
+                })
+        })
+        .transpose()?;
+    let Some(name) = name else {
+        py.detach(|| kernels::reset(class));
+        return Ok(());
+    };
+    let kernel = Kernel::from_name(name).ok_or_else(|| {
+        let names: Vec<&str> = Kernel::ALL.iter().map(|kernel| kernel.name()).collect();
+        PyValueError::new_err(format!(
+            "Unknown kernel '{name}'. Known kernels are {}.",
+            names.join(", ")
+        ))
+    })?;
+    if !kernel.is_supported() {
+        return Err(PyValueError::new_err(format!(
+            "Kernel '{name}' is not supported by this CPU"
+        )));
+    }
+    py.detach(|| kernels::select(kernel, class));
+    Ok(())
+}
+
+/// Time every available kernel, use the fastest one for each size class, and
+/// cache the result for later processes.
+///
+/// Overrides made with `set_kernel` are discarded.
+///
+/// # Arguments
+/// * `save` - Whether to write the result to the cache file
+///
+/// # Returns
+/// The new selection, as returned by `kernel_selection`
+///
+/// # Errors
+/// Returns `OSError` if the cache file cannot be written
+#[pyfunction]
+#[pyo3(signature = (*, save=true))]
+fn calibrate_kernels(py: Python<'_>, save: bool) -> PyResult<Bound<'_, PyDict>> {
+    let selection = py.detach(tuning::calibrate);
+    kernels::retune(selection);
+    if save {
+        tuning::save(selection)?;
+    }
+    selection_dict(py, selection)
+}
+
+/// Path of the file caching the kernel calibration of each CPU.
+///
+/// # Returns
+/// The path, or `None` if there is no cache directory (`REVBITS_CACHE_DIR` is
+/// empty, or no home directory is known)
+#[pyfunction]
+fn kernel_cache_path() -> Option<OsString> {
+    tuning::cache_path().map(Into::into)
+}
+
+/// Set the default number of threads used for large buffers.
+///
+/// # Arguments
+/// * `threads` - Number of threads; 0 uses one thread per available CPU (the
+///   initial default) and 1 disables parallel processing. The threads of all
+///   concurrent calls together never outnumber the available CPUs.
+#[pyfunction]
+fn set_num_threads(threads: usize) {
+    parallel::set_default_threads(threads);
+}
+
+/// Get the default number of threads used for large buffers.
+///
+/// # Returns
+/// The number of threads used when no `threads` argument is given
+#[pyfunction]
+fn get_num_threads() -> usize {
+    parallel::resolve_threads(None)
+}
+
+/// Set the smallest buffer size that is split across threads.
+///
+/// # Arguments
+/// * `nbytes` - Size in bytes; smaller buffers are processed on one thread
+#[pyfunction]
+fn set_parallel_threshold(nbytes: usize) {
+    parallel::set_threshold(nbytes);
+}
+
+/// Get the smallest buffer size that is split across threads.
+///
+/// # Returns
+/// The size in bytes (8 MiB unless changed by `set_parallel_threshold`)
+#[pyfunction]
+fn get_parallel_threshold() -> usize {
+    parallel::threshold()
 }
 
 /// A Python module implemented in Rust. The name of this module must match
 /// the `lib.name` setting in the `Cargo.toml`, else Python will not be able to
 /// import the module.
-#[pymodule]
+///
+/// The module does not need the GIL, so free-threaded interpreters keep it
+/// disabled: the kernel selection and thread settings are atomics initialized
+/// once, `TransformChain` is immutable, and PyO3 serializes the `&mut self`
+/// methods of `Reverser` per object.
+#[pymodule(gil_used = false)]
 fn _core(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(inverse_byte, m)?)?;
     m.add_function(wrap_pyfunction!(inverse_word, m)?)?;
     m.add_function(wrap_pyfunction!(inverse_dword, m)?)?;
     m.add_function(wrap_pyfunction!(inverse_qword, m)?)?;
+    m.add_function(wrap_pyfunction!(reverse_byte, m)?)?;
+    m.add_function(wrap_pyfunction!(reverse_bytes, m)?)?;
+    m.add_function(wrap_pyfunction!(inverse_bits, m)?)?;
     m.add_function(wrap_pyfunction!(inverse_bytes, m)?)?;
+    m.add_function(wrap_pyfunction!(inverse_bytes_inplace, m)?)?;
+    m.add_function(wrap_pyfunction!(inverse_words, m)?)?;
+    m.add_function(wrap_pyfunction!(inverse_whole, m)?)?;
+    m.add_function(wrap_pyfunction!(reverse_bitstream, m)?)?;
+    m.add_function(wrap_pyfunction!(reverse_record_text, m)?)?;
+    m.add_function(wrap_pyfunction!(inverse_array, m)?)?;
+    m.add_function(wrap_pyfunction!(bitrev_permute, m)?)?;
+    m.add_class::<Reverser>()?;
+    m.add_class::<TransformChain>()?;
+    m.add_function(wrap_pyfunction!(active_kernel, m)?)?;
+    m.add_function(wrap_pyfunction!(available_kernels, m)?)?;
+    m.add_function(wrap_pyfunction!(kernel_selection, m)?)?;
+    m.add_function(wrap_pyfunction!(set_kernel, m)?)?;
+    m.add_function(wrap_pyfunction!(calibrate_kernels, m)?)?;
+    m.add_function(wrap_pyfunction!(kernel_cache_path, m)?)?;
+    m.add_function(wrap_pyfunction!(set_num_threads, m)?)?;
+    m.add_function(wrap_pyfunction!(get_num_threads, m)?)?;
+    m.add_function(wrap_pyfunction!(set_parallel_threshold, m)?)?;
+    m.add_function(wrap_pyfunction!(get_parallel_threshold, m)?)?;
     Ok(())
 }
@@ -0,0 +1,126 @@
+//! Splitting of large buffers across threads.
+//!
+//! Buffers of at least `threshold()` bytes are cut into one chunk per thread and
+//! the chunks are transformed concurrently with scoped threads. Chunks start at
+//! multiples of `CHUNK_ALIGN`, so no word of any supported width is split and the
+//! result is identical to a serial pass.
+//!
+//! The helper threads of all calls together never outnumber the available CPUs:
+//! a call running while others hold the CPUs gets fewer helpers, down to none,
+//! however many threads were asked for.
+
+use std::num::NonZeroUsize;
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::sync::{Mutex, OnceLock, PoisonError};
+use std::thread;
+
+/// Chunk boundaries are multiples of this many bytes: a multiple of every word
+/// width, and of the cache line size so that threads never write the same line.
+const CHUNK_ALIGN: usize = 64;
+
+/// Default smallest buffer size, in bytes, that is split across threads.
+pub(crate) const DEFAULT_THRESHOLD: usize = 8 << 20;
+
+/// Default number of threads; 0 means one per available CPU.
+static DEFAULT_THREADS: AtomicUsize = AtomicUsize::new(0);
+
+static THRESHOLD: AtomicUsize = AtomicUsize::new(DEFAULT_THRESHOLD);
+
+/// The source and destination chunk of one thread.
+type Job<'a> = (Option<&'a [u8]>, &'a mut [u8]);
+
+/// Number of helper threads running for all calls of `for_each_chunk`.
+static HELPERS: AtomicUsize = AtomicUsize::new(0);
+
+/// Number of CPUs available to this process.
+fn available_threads() -> usize {
+    static AVAILABLE: OnceLock<usize> = OnceLock::new();
+    *AVAILABLE.get_or_init(|| thread::available_parallelism().map_or(1, NonZeroUsize::get))
+}
+
+/// Helper threads counted in `HELPERS` until dropped.
+struct Helpers(usize);
+
+impl Helpers {
+    /// Reserve up to `wanted` helper threads, leaving a CPU for the calling
+    /// thread of every call.
+    fn reserve(wanted: usize) -> Self {
+        let limit = available_threads() - 1;
+        let mut reserved = 0;
+        let _ = HELPERS.fetch_update(Ordering::Relaxed, Ordering::Relaxed, |running| {
+            reserved = wanted.min(limit.saturating_sub(running));
+            Some(running + reserved)
+        });
+        Self(reserved)
+    }
+}
+
+impl Drop for Helpers {
+    fn drop(&mut self) {
+        HELPERS.fetch_sub(self.0, Ordering::Relaxed);
+    }
+}
+
+/// Set the default number of threads; 0 selects one per available CPU.
+pub(crate) fn set_default_threads(threads: usize) {
+    DEFAULT_THREADS.store(threads, Ordering::Relaxed);
+}
+
+/// The number of threads used for `threads`, falling back to the default when `None`.
+pub(crate) fn resolve_threads(threads: Option<usize>) -> usize {
+    match threads.unwrap_or_else(|| DEFAULT_THREADS.load(Ordering::Relaxed)) {
+        0 => available_threads(),
+        n => n,
+    }
+}
+
+pub(crate) fn set_threshold(bytes: usize) {
+    THRESHOLD.store(bytes, Ordering::Relaxed);
+}
+
+pub(crate) fn threshold() -> usize {
+    THRESHOLD.load(Ordering::Relaxed)
+}
+
+/// Apply `apply` to `src` and `dst` (or to `dst` in place when `src` is `None`),
+/// split into up to `threads` chunks processed concurrently.
+///
+/// `apply` has the same contract as the transforms of `transform`; buffers
+/// smaller than `threshold()` are processed on the calling thread. The number
+/// of threads is limited by the CPUs not used by other calls and by the number
+/// of `CHUNK_ALIGN`-byte blocks; a chunk whose thread cannot be started is
+/// processed on the calling thread.
+pub(crate) fn for_each_chunk<F>(src: Option<&[u8]>, dst: &mut [u8], threads: usize, apply: &F)
+where
+    F: Fn(Option<&[u8]>, &mut [u8]) + Sync,
+{
+    let len = dst.len();
+    if threads <= 1 || len < threshold().max(2 * CHUNK_ALIGN) {
+        return apply(src, dst);
+    }
+    let helpers = Helpers::reserve(threads.min(len / CHUNK_ALIGN) - 1);
+    if helpers.0 == 0 {
+        return apply(src, dst);
+    }
+    let chunk = len.div_ceil(helpers.0 + 1).next_multiple_of(CHUNK_ALIGN);
+    let mut src_chunks = src.map(|src| src.chunks(chunk));
+    let jobs: Vec<_> = dst
+        .chunks_mut(chunk)
+        .map(|dst| Mutex::new(Some((src_chunks.as_mut().and_then(Iterator::next), dst))))
+        .collect();
+    // Each job is taken once, by its thread or, if it cannot be started, here
+    let run = |job: &Mutex<Option<Job<'_>>>| {
+        if let Some((src, dst)) = job.lock().unwrap_or_else(PoisonError::into_inner).take() {
+            apply(src, dst);
+        }
+    };
+
+    thread::scope(|scope| {
+        for job in &jobs[1..] {
+            if thread::Builder::new().spawn_scoped(scope, move || run(job)).is_err() {
+                run(job);
+            }
+        }
+        run(&jobs[0]);
+    });
+}
@@ -0,0 +1,101 @@
+//! Cache-blocked bit-reversal permutation.
+//!
+//! Element `i` of an array of `2^k` elements is swapped with element
+//! `reverse(i, k)`. Swapping in index order touches memory with a stride that
+//! defeats the cache for large arrays, so indices are split into
+//! `(a, m, c)`: `b` high bits, `k - 2b` middle bits and `b` low bits. For a
+//! fixed `m`, the `2^b x 2^b` elements `(a, m, c)` map onto the elements
+//! `(reverse(c), reverse(m), reverse(a))`, another tile of `2^b` rows of `2^b`
+//! contiguous elements. Each pair of tiles is small enough to stay in L1 while
+//! it is swapped.
+
+use crate::BIT_REVERSE_TABLE;
+
+/// Target size in bytes of one contiguous row of a tile.
+const ROW_BYTES: usize = 128;
+
+/// Reverse the lowest `bits` bits of `x`.
+fn reverse(x: usize, bits: u32) -> usize {
+    if bits == 0 {
+        0
+    } else {
+        x.reverse_bits() >> (usize::BITS - bits)
+    }
+}
+
+/// Apply the bit-reversal permutation to `data`, which holds `2^log2n`
+/// elements of `item_size` bytes.
+pub(crate) fn bitrev_permute(data: &mut [u8], item_size: usize, log2n: u32) {
+    debug_assert_eq!(data.len(), item_size << log2n);
+    // Rows of about ROW_BYTES bytes; at most 8 bits so BIT_REVERSE_TABLE applies.
+    let block_bits = (ROW_BYTES / item_size).max(1).ilog2().min(8);
+    match item_size {
+        1 => permute_blocked(log2n, block_bits, |i, j| data.swap(i, j)),
+        2 => swap_items::<2>(data, log2n, block_bits),
+        4 => swap_items::<4>(data, log2n, block_bits),
+        8 => swap_items::<8>(data, log2n, block_bits),
+        16 => swap_items::<16>(data, log2n, block_bits),
+        _ => permute_blocked(log2n, block_bits, |i, j| {
+            let (low, high) = data.split_at_mut(j * item_size);
+            low[i * item_size..(i + 1) * item_size].swap_with_slice(&mut high[..item_size]);
+        }),
+    }
+}
+
+fn swap_items<const N: usize>(data: &mut [u8], log2n: u32, block_bits: u32) {
+    let (items, _) = data.as_chunks_mut::<N>();
+    permute_blocked(log2n, block_bits, |i, j| items.swap(i, j));
+}
+
+/// Call `swap(i, j)` with `i < j` once for every pair of distinct indices below
+/// `2^log2n` that are bit reversals of each other, one pair of tiles at a time.
+fn permute_blocked(log2n: u32, block_bits: u32, mut swap: impl FnMut(usize, usize)) {
+    let b = block_bits.min(log2n / 2);
+    let middle_bits = log2n - 2 * b;
+    let high_shift = log2n - b;
+    let block = 1usize << b;
+    let reversed_low: Vec<usize> = (0..block).map(|x| (BIT_REVERSE_TABLE[x] as usize) >> (8 - b)).collect();
+
+    for m in 0..1usize << middle_bits {
+        let m_reversed = reverse(m, middle_bits);
+        if m_reversed < m {
+            // This pair of tiles was swapped when `m_reversed` was visited
+            continue;
+        }
+        for (a, &a_reversed) in reversed_low.iter().enumerate() {
+            let row = (a << high_shift) | (m << b);
+            let column = (m_reversed << b) | a_reversed;
+            for (c, &c_reversed) in reversed_low.iter().enumerate() {
+                let i = row | c;
+                let j = (c_reversed << high_shift) | column;
+                if m < m_reversed || i < j {
+                    swap(i.min(j), i.max(j));
+                }
+            }
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn matches_naive_permutation() {
+        for item_size in [1, 2, 3, 4, 8, 16, 24, 300] {
+            for log2n in 0..=12 {
+                let n = 1usize << log2n;
+                let data: Vec<u8> = (0..n * item_size).map(|i| (i * 7 + i / 251) as u8).collect();
+                let mut expected = data.clone();
+                for i in 0..n {
+                    let j = reverse(i, log2n);
+                    expected[j * item_size..(j + 1) * item_size]
+                        .copy_from_slice(&data[i * item_size..(i + 1) * item_size]);
+                }
+                let mut permuted = data.clone();
+                bitrev_permute(&mut permuted, item_size, log2n);
+                assert_eq!(permuted, expected, "item_size {item_size} log2n {log2n}");
+            }
+        }
+    }
+}
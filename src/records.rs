@@ -0,0 +1,249 @@
+//! Bit reversal of the data bytes of Intel HEX and Motorola S-record text.
+//!
+//! Every line holds one record as hex digits. A data record (Intel HEX type 00,
+//! S-records S1, S2 and S3) keeps its length, type and address, while each of
+//! its payload bytes is replaced by the byte with the bits reversed and the
+//! checksum is recomputed. Since every byte is still written as two hex digits,
+//! the text keeps its length and each record is rewritten where it is. All other
+//! lines are left as they are.
+
+use crate::BIT_REVERSE_TABLE;
+
+#[derive(Clone, Copy, Debug, PartialEq, Eq)]
+pub(crate) enum RecordFormat {
+    /// `:LLAAAATT<data>CC`, with a two's complement checksum.
+    Ihex,
+    /// `S<type><count><address><data><checksum>`, with a ones' complement checksum.
+    Srec,
+}
+
+impl RecordFormat {
+    pub(crate) fn from_name(name: &str) -> Option<Self> {
+        match name {
+            "ihex" => Some(Self::Ihex),
+            "srec" => Some(Self::Srec),
+            _ => None,
+        }
+    }
+
+    pub(crate) fn description(self) -> &'static str {
+        match self {
+            Self::Ihex => "Intel HEX record",
+            Self::Srec => "S-record",
+        }
+    }
+}
+
+/// A malformed record: the index of its line in the text and what is wrong.
+#[derive(Debug, PartialEq, Eq)]
+pub(crate) struct RecordError {
+    pub(crate) line: usize,
+    pub(crate) reason: String,
+}
+
+const UPPER_HEX: &[u8; 16] = b"0123456789ABCDEF";
+
+/// Value of each ASCII hex digit, 0xFF for other characters.
+const HEX_VALUES: [u8; 256] = {
+    let mut table = [0xFF; 256];
+    let mut i = 0;
+    while i < 16 {
+        table[UPPER_HEX[i] as usize] = i as u8;
+        table[UPPER_HEX[i].to_ascii_lowercase() as usize] = i as u8;
+        i += 1;
+    }
+    table
+};
+
+/// The byte written as the hex digits `pair`, None if they are not hex digits.
+#[inline]
+fn decode(pair: &[u8]) -> Option<u8> {
+    let (high, low) = (HEX_VALUES[pair[0] as usize], HEX_VALUES[pair[1] as usize]);
+    (high | low < 0x10).then_some(high << 4 | low)
+}
+
+#[inline]
+fn encode(byte: u8, pair: &mut [u8]) {
+    pair[0] = UPPER_HEX[(byte >> 4) as usize];
+    pair[1] = UPPER_HEX[(byte & 0xF) as usize];
+}
+
+/// Reverse the bits of the payload of every data record of `text` in place.
+///
+/// Lines end with `\n`; a `\r` and other trailing whitespace before it, and
+/// blank lines, are kept. Every record is checked, including its checksum.
+///
+/// # Errors
+/// The first malformed record
+pub(crate) fn reverse_records(text: &mut [u8], format: RecordFormat) -> Result<(), RecordError> {
+    for (index, line) in text.split_mut(|&byte| byte == b'\n').enumerate() {
+        let length = line
+            .iter()
+            .rposition(|byte| !byte.is_ascii_whitespace())
+            .map_or(0, |last| last + 1);
+        if length > 0 {
+            reverse_record(&mut line[..length], format).map_err(|reason| RecordError { line: index, reason })?;
+        }
+    }
+    Ok(())
+}
+
+/// Check one record and reverse its payload if it is a data record.
+fn reverse_record(record: &mut [u8], format: RecordFormat) -> Result<(), String> {
+    // Where the hex digits start, the sum all bytes must have, and for S-records
+    // where the payload starts
+    let (prefix, expected_sum, payload_start) = match format {
+        RecordFormat::Ihex => {
+            if record[0] != b':' {
+                return Err("expected ':'".to_owned());
+            }
+            (1, 0, None)
+        }
+        RecordFormat::Srec => {
+            if record.len() < 2 || !matches!(record[0], b'S' | b's') || !record[1].is_ascii_digit() {
+                return Err("expected 'S' and a record type".to_owned());
+            }
+            // The count is followed by an address of 2, 3 or 4 bytes
+            let start = match record[1] {
+                b'1' => Some(3),
+                b'2' => Some(4),
+                b'3' => Some(5),
+                _ => None,
+            };
+            (2, 0xFF, start)
+        }
+    };
+    let digits = &record[prefix..];
+    if digits.len() % 2 != 0 {
+        return Err("invalid hex digits".to_owned());
+    }
+    let mut sum = 0u8;
+    let mut first = [0u8; 4];
+    for (i, pair) in digits.chunks_exact(2).enumerate() {
+        let byte = decode(pair).ok_or("invalid hex digits")?;
+        sum = sum.wrapping_add(byte);
+        if i < first.len() {
+            first[i] = byte;
+        }
+    }
+    let count = digits.len() / 2;
+    let payload_start = match format {
+        RecordFormat::Ihex => {
+            if count < 5 {
+                return Err("invalid hex digits".to_owned());
+            }
+            if usize::from(first[0]) != count - 5 {
+                return Err(format!("length {} does not match {} data bytes", first[0], count - 5));
+            }
+            (first[3] == 0).then_some(4)
+        }
+        RecordFormat::Srec => {
+            if count < 2 {
+                return Err("invalid hex digits".to_owned());
+            }
+            if usize::from(first[0]) != count - 1 {
+                return Err(format!("count {} does not match {} bytes", first[0], count - 1));
+            }
+            payload_start
+        }
+    };
+    if sum != expected_sum {
+        return Err("checksum mismatch".to_owned());
+    }
+    let Some(start) = payload_start else {
+        return Ok(());
+    };
+    if count <= start {
+        return Err(format!("S{} record too short for its address", char::from(record[1])));
+    }
+
+    let (fields, checksum) = record[prefix..].split_at_mut(2 * (count - 1));
+    let mut total = 0u8;
+    for (i, pair) in fields.chunks_exact_mut(2).enumerate() {
+        let mut byte = decode(pair).expect("checked above");
+        if i >= start {
+            byte = BIT_REVERSE_TABLE[byte as usize];
+        }
+        encode(byte, pair);
+        total = total.wrapping_add(byte);
+    }
+    encode(expected_sum.wrapping_sub(total), checksum);
+    Ok(())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn reversed(text: &str, format: RecordFormat) -> Result<String, RecordError> {
+        let mut bytes = text.as_bytes().to_vec();
+        reverse_records(&mut bytes, format)?;
+        Ok(String::from_utf8(bytes).unwrap())
+    }
+
+    #[test]
+    fn ihex() {
+        let text = ":10010000214601360121470136007EFE09D2190140\r\n:020000040800F2\r\n\n:00000001FF";
+        let expected = ":100100008462806C8084E2806C007E7F904B98805B\r\n:020000040800F2\r\n\n:00000001FF";
+        assert_eq!(reversed(text, RecordFormat::Ihex).unwrap(), expected);
+        assert_eq!(reversed(expected, RecordFormat::Ihex).unwrap(), text);
+        // Lower-case digits are accepted, and rewritten records are in upper case
+        assert_eq!(
+            reversed(":0400000001ab0c0e36", RecordFormat::Ihex).unwrap(),
+            ":0400000080D5307007"
+        );
+    }
+
+    #[test]
+    fn srec() {
+        let text =
+            "S00F000068656C6C6F202020202000003C\nS1130000285F245F2212226A000424290008237C2A\nS5030001FB\nS9030000FC\n";
+        let mut bytes = text.as_bytes().to_vec();
+        reverse_records(&mut bytes, RecordFormat::Srec).unwrap();
+        let lines: Vec<&str> = std::str::from_utf8(&bytes).unwrap().lines().collect();
+        assert_eq!(lines[0], "S00F000068656C6C6F202020202000003C");
+        assert_eq!(&lines[1][..8], "S1130000");
+        assert_eq!(&lines[1][8..12], "14FA");
+        assert_eq!(lines[2..], ["S5030001FB", "S9030000FC"]);
+        // The checksum is valid again
+        let sum = (2..lines[1].len())
+            .step_by(2)
+            .map(|i| u8::from_str_radix(&lines[1][i..i + 2], 16).unwrap())
+            .fold(0u8, u8::wrapping_add);
+        assert_eq!(sum, 0xFF);
+        reverse_records(&mut bytes, RecordFormat::Srec).unwrap();
+        assert_eq!(bytes, text.as_bytes());
+    }
+
+    #[test]
+    fn errors() {
+        let error = |text: &str, format| reversed(text, format).unwrap_err();
+        assert_eq!(
+            error(":00000001FF\n:00000001FE\n", RecordFormat::Ihex),
+            RecordError {
+                line: 1,
+                reason: "checksum mismatch".to_owned()
+            }
+        );
+        assert_eq!(error("00000001FF", RecordFormat::Ihex).reason, "expected ':'");
+        assert_eq!(error(":0000001FF", RecordFormat::Ihex).reason, "invalid hex digits");
+        assert_eq!(error(":0G000001FF", RecordFormat::Ihex).reason, "invalid hex digits");
+        assert_eq!(
+            error(":0200000001FE", RecordFormat::Ihex).reason,
+            "length 2 does not match 1 data bytes"
+        );
+        assert_eq!(
+            error("X1030000FC", RecordFormat::Srec).reason,
+            "expected 'S' and a record type"
+        );
+        assert_eq!(
+            error("S9040000FC", RecordFormat::Srec).reason,
+            "count 4 does not match 3 bytes"
+        );
+        assert_eq!(error("S30400000FB", RecordFormat::Srec).reason, "invalid hex digits");
+        assert_eq!(
+            error("S3030000FC", RecordFormat::Srec).reason,
+            "S3 record too short for its address"
+        );
+    }
+}
@@ -1,24 +1,112 @@
 __version__ = "0.1.3"
 
-from revbits._core import (
-    inverse_byte,
-    inverse_bytes,
-    inverse_dword,
-    inverse_qword,
-    inverse_word,
-)
-from revbits.reverser import (
-    reverse_byte,
-    reverse_bytes,
-)
+# The public names are loaded on first access (PEP 562), so that importing the
+# package, e.g. for the CLI, does not pay for modules it never uses.
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from revbits._core import (
+        Reverser,
+        TransformChain,
+        active_kernel,
+        available_kernels,
+        bitrev_permute,
+        calibrate_kernels,
+        get_num_threads,
+        get_parallel_threshold,
+        inverse_array,
+        inverse_bits,
+        inverse_byte,
+        inverse_bytes,
+        inverse_bytes_inplace,
+        inverse_dword,
+        inverse_qword,
+        inverse_whole,
+        inverse_word,
+        inverse_words,
+        kernel_cache_path,
+        kernel_selection,
+        reverse_bitstream,
+        reverse_record_text,
+        set_kernel,
+        set_num_threads,
+        set_parallel_threshold,
+    )
+    from revbits.aio import areverse_file, areverse_file_in_place, areverse_stream
+    from revbits.instrument import CallEvent, add_hook, remove_hook
+    from revbits.reverser import (
+        reverse_array,
+        reverse_bits,
+        reverse_buffer,
+        reverse_byte,
+        reverse_bytes,
+        reverse_words,
+    )
 
 __all__ = [
+    "CallEvent",
+    "Reverser",
+    "TransformChain",
     "__version__",
+    "active_kernel",
+    "add_hook",
+    "areverse_file",
+    "areverse_file_in_place",
+    "areverse_stream",
+    "available_kernels",
+    "bitrev_permute",
+    "calibrate_kernels",
+    "get_num_threads",
+    "get_parallel_threshold",
+    "inverse_array",
+    "inverse_bits",
     "inverse_byte",
     "inverse_bytes",
+    "inverse_bytes_inplace",
     "inverse_dword",
     "inverse_qword",
+    "inverse_whole",
     "inverse_word",
+    "inverse_words",
+    "kernel_cache_path",
+    "kernel_selection",
+    "remove_hook",
+    "reverse_array",
+    "reverse_bits",
+    "reverse_bitstream",
+    "reverse_buffer",
     "reverse_byte",
     "reverse_bytes",
+    "reverse_record_text",
+    "reverse_words",
+    "set_kernel",
+    "set_num_threads",
+    "set_parallel_threshold",
 ]
+
+_LAZY_MODULES = {
+    "revbits.aio": ("areverse_file", "areverse_file_in_place", "areverse_stream"),
+    "revbits.instrument": ("CallEvent", "add_hook", "remove_hook"),
+    "revbits.reverser": (
+        "reverse_array",
+        "reverse_bits",
+        "reverse_buffer",
+        "reverse_byte",
+        "reverse_bytes",
+        "reverse_words",
+    ),
+}
+_LAZY_NAMES = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+
+
+def __getattr__(name: str) -> object:
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_NAMES.get(name, "revbits._core")), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
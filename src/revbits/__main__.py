@@ -1,11 +1,27 @@
 """Entry point for the revbits command-line interface."""
 
-from revbits.cli import main as cli_main
+import sys
 
 
 def main() -> None:
-    """Run the revbits CLI application."""
-    cli_main()
+    """Run the revbits CLI application.
+
+    ``revbits serve`` starts a server, and ``revbits --server SOCKET ...``
+    forwards the run to one; neither loads the CLI up front.
+    """
+    argv = sys.argv[1:]
+    if argv[:1] == ["serve"]:
+        from revbits.server import serve_main  # noqa: PLC0415
+
+        serve_main(argv[1:])
+    elif any(argument == "--server" or argument.startswith("--server=") for argument in argv):
+        from revbits.server import client_main  # noqa: PLC0415
+
+        client_main(argv)
+    else:
+        from revbits.cli import main as cli_main  # noqa: PLC0415
+
+        cli_main()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,69 @@
+from collections.abc import Buffer, Iterable
+from typing import Literal, final, overload
+
 def inverse_byte(value: int, /) -> int: ...
 def inverse_word(value: int, /) -> int: ...
 def inverse_dword(value: int, /) -> int: ...
 def inverse_qword(value: int, /) -> int: ...
-def inverse_bytes(value: bytes, /) -> bytes: ...
+def reverse_byte(value: int) -> int: ...
+def reverse_bytes(value: Buffer, bit_width: Literal[8, 16, 32, 64] | None = None) -> bytes: ...
+def inverse_bits(value: int, width: int, /) -> int: ...
+@overload
+def inverse_bytes(value: Buffer, /, out: None = None, *, threads: int | None = None) -> bytes: ...
+@overload
+def inverse_bytes[B: Buffer](value: Buffer, /, out: B, *, threads: int | None = None) -> B: ...
+def inverse_bytes_inplace(buffer: Buffer, /, *, threads: int | None = None) -> None: ...
+@overload
+def inverse_words(value: Buffer, bit_width: int, /, out: None = None, *, threads: int | None = None) -> bytes: ...
+@overload
+def inverse_words[B: Buffer](value: Buffer, bit_width: int, /, out: B, *, threads: int | None = None) -> B: ...
+@overload
+def inverse_whole(value: Buffer, /, out: None = None) -> bytes: ...
+@overload
+def inverse_whole[B: Buffer](value: Buffer, /, out: B) -> B: ...
+@overload
+def reverse_bitstream(
+    buffer: Buffer, nbits: int, /, out: None = None, *, bit_order: Literal["msb", "lsb"] = "msb"
+) -> bytes: ...
+@overload
+def reverse_bitstream[B: Buffer](
+    buffer: Buffer, nbits: int, /, out: B, *, bit_order: Literal["msb", "lsb"] = "msb"
+) -> B: ...
+def reverse_record_text(text: Buffer, record_format: Literal["ihex", "srec"], /, *, first_line: int = 1) -> bytes: ...
+def inverse_array(value: Buffer, out: Buffer, /, *, threads: int | None = None) -> None: ...
+def bitrev_permute(buffer: Buffer, item_size: int, log2n: int, /) -> None: ...
+def active_kernel(nbytes: int | None = None) -> str: ...
+def available_kernels() -> list[str]: ...
+def kernel_selection() -> dict[str, str]: ...
+def set_kernel(name: str | None, size_class: Literal["small", "medium", "large"] | None = None) -> None: ...
+def calibrate_kernels(*, save: bool = True) -> dict[str, str]: ...
+def kernel_cache_path() -> str | None: ...
+def set_num_threads(threads: int, /) -> None: ...
+def get_num_threads() -> int: ...
+def set_parallel_threshold(nbytes: int, /) -> None: ...
+def get_parallel_threshold() -> int: ...
+@final
+class Reverser:
+    def __init__(
+        self, mode: Literal["auto", "byte", "word", "whole"] = "auto", bit_width: Literal[8, 16, 32, 64] | None = None
+    ) -> None: ...
+    def update(self, data: Buffer) -> bytes: ...
+    def finalize(self) -> bytes: ...
+    @property
+    def mode(self) -> str: ...
+    @property
+    def bit_width(self) -> int | None: ...
+    @property
+    def pending(self) -> int: ...
+
+@final
+class TransformChain:
+    def __init__(self, ops: str | Iterable[str]) -> None: ...
+    @overload
+    def apply(self, value: Buffer, /, out: None = None, *, offset: int = 0, threads: int | None = None) -> bytes: ...
+    @overload
+    def apply[B: Buffer](self, value: Buffer, /, out: B, *, offset: int = 0, threads: int | None = None) -> B: ...
+    @property
+    def ops(self) -> tuple[str, ...]: ...
+    @property
+    def block_size(self) -> int: ...
@@ -0,0 +1,263 @@
+"""Asyncio API for bit reversal of files and streams.
+
+The native reversal of large chunks and all blocking file I/O run on a shared,
+bounded thread pool, with the GIL released while the native kernels run, so
+the event loop stays responsive while many transfers are in flight. Each stream
+transfer has at most one chunk being reversed while the next one is read, and
+waits for ``StreamWriter.drain()`` after every write, so a slow peer slows the
+transfer down instead of letting buffers grow.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import AsyncGenerator, Callable, Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from revbits import instrument
+from revbits._core import inverse_bytes, inverse_whole, inverse_words
+from revbits.reverser import BitWidth, Mode, check_mode, reverse_bytes
+from revbits.stream import (
+    DEFAULT_CHUNK_SIZE,
+    Range,
+    check_word_multiple,
+    reverse_file_in_place,
+    reverse_stream,
+    validate_chunk_size,
+)
+
+DEFAULT_MAX_WORKERS = min(32, os.cpu_count() or 1)
+"""Number of threads of the shared executor."""
+
+INLINE_LIMIT = 64 * 1024
+"""Chunks smaller than this many bytes are reversed on the event loop thread.
+
+The native call is shorter than the hand-off to a worker thread; the native
+module releases the GIL from the same size on.
+"""
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+type _Job = Callable[[], bytes]
+
+
+def default_executor() -> ThreadPoolExecutor:
+    """The shared executor used when no executor is passed, created on first use."""
+    global _executor  # noqa: PLW0603
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="revbits")
+        return _executor
+
+
+def _submit(job: _Job, nbytes: int, executor: Executor | None) -> "asyncio.Future[bytes]":
+    loop = asyncio.get_running_loop()
+    if nbytes < INLINE_LIMIT:
+        future = loop.create_future()
+        future.set_result(job())
+        return future
+    return loop.run_in_executor(executor or default_executor(), job)
+
+
+async def _read_chunk(reader: asyncio.StreamReader, size: int) -> bytes:
+    # Full chunks unless the stream ends, like BufferedReader.read(size)
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+
+
+async def _auto_jobs(reader: asyncio.StreamReader, chunk_size: int) -> AsyncGenerator[tuple[_Job, int]]:
+    chunk = await _read_chunk(reader, chunk_size)
+    if not chunk:
+        return
+
+    # Look one chunk ahead: if the input ends here it is reversed as a whole.
+    next_chunk = await _read_chunk(reader, chunk_size)
+    if not next_chunk:
+        yield partial(reverse_bytes, chunk), len(chunk)
+        return
+
+    yield partial(inverse_bytes, chunk), len(chunk)
+    chunk = next_chunk
+    while chunk:
+        yield partial(inverse_bytes, chunk), len(chunk)
+        chunk = await _read_chunk(reader, chunk_size)
+
+
+async def _word_jobs(
+    reader: asyncio.StreamReader, chunk_size: int, bit_width: int | None
+) -> AsyncGenerator[tuple[_Job, int]]:
+    size = bit_width // 8 if bit_width else 1
+    chunk_size -= chunk_size % size
+    total = 0
+    while chunk := await _read_chunk(reader, chunk_size):
+        total += len(chunk)
+        # Only the last chunk can be short; reject a partial word before writing it
+        check_word_multiple(total, bit_width)
+        yield (partial(inverse_words, chunk, bit_width) if bit_width else partial(inverse_bytes, chunk)), len(chunk)
+
+
+async def _whole_jobs(reader: asyncio.StreamReader) -> AsyncGenerator[tuple[_Job, int]]:
+    data = await reader.read()
+    if data:
+        yield partial(inverse_whole, data), len(data)
+
+
+async def areverse_stream(  # noqa: PLR0913
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mode: Mode = "auto",
+    bit_width: BitWidth | None = None,
+    *,
+    executor: Executor | None = None,
+) -> int:
+    """Reverse the bits of the data read from ``reader`` into ``writer``.
+
+    The output is the same as that of ``reverse_stream``. Chunks of at least
+    ``INLINE_LIMIT`` bytes are reversed on ``executor`` while the next chunk is
+    read. The ``"whole"`` mode needs the complete input and reads it into memory.
+    ``writer`` is neither closed nor drained beyond the last write.
+
+    Args:
+        reader: Source of the data
+        writer: Destination of the reversed data
+        chunk_size: Number of bytes reversed per job
+        mode: Reversal mode, as for ``reverse_buffer``
+        bit_width: Word size in bits for the ``"word"`` mode
+        executor: Executor running the reversal, the shared ``default_executor()`` if None
+
+    Returns:
+        The number of bytes written to ``writer``
+
+    Raises:
+        ValueError: If chunk_size is smaller than MIN_CHUNK_SIZE, if mode and
+                    bit_width are invalid, or if the input is not a whole number
+                    of words
+    """
+    validate_chunk_size(chunk_size)
+    check_mode(mode, bit_width)
+    if not instrument.hooks:
+        return await _areverse_stream(reader, writer, chunk_size, mode, bit_width, executor=executor)
+
+    start = time.perf_counter()
+    written = await _areverse_stream(reader, writer, chunk_size, mode, bit_width, executor=executor)
+    instrument.emit("areverse_stream", written, start)
+    return written
+
+
+async def _areverse_stream(  # noqa: PLR0913
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    chunk_size: int,
+    mode: Mode,
+    bit_width: BitWidth | None,
+    *,
+    executor: Executor | None,
+) -> int:
+    if mode == "whole":
+        jobs = _whole_jobs(reader)
+    elif mode == "auto" and bit_width is None:
+        jobs = _auto_jobs(reader, chunk_size)
+    else:
+        jobs = _word_jobs(reader, chunk_size, bit_width)
+
+    written = 0
+    pending: asyncio.Future[bytes] | None = None
+    try:
+        async for job, nbytes in jobs:
+            previous, pending = pending, _submit(job, nbytes, executor)
+            if previous is not None:
+                written += await _write(writer, await previous)
+        if pending is not None:
+            written += await _write(writer, await pending)
+    finally:
+        # After an error the last job is not awaited; retrieve or cancel it, so
+        # that its own error is not logged as never retrieved
+        if pending is not None:
+            if not pending.done():
+                pending.cancel()
+            elif not pending.cancelled():
+                pending.exception()
+        await jobs.aclose()
+    return written
+
+
+async def _write(writer: asyncio.StreamWriter, data: bytes) -> int:
+    writer.write(data)
+    await writer.drain()
+    return len(data)
+
+
+def _reverse_file(source: Path, destination: Path, chunk_size: int, mode: Mode, bit_width: BitWidth | None) -> int:
+    with source.open("rb") as input_file, destination.open("wb") as output_file:
+        return reverse_stream(input_file, output_file, chunk_size, mode, bit_width)
+
+
+async def areverse_file(  # noqa: PLR0913
+    source: str | os.PathLike[str],
+    destination: str | os.PathLike[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mode: Mode = "auto",
+    bit_width: BitWidth | None = None,
+    *,
+    executor: Executor | None = None,
+) -> int:
+    """Reverse the bits of the file ``source`` into the file ``destination``.
+
+    The whole transfer, reading and writing included, runs on ``executor`` with
+    ``reverse_stream``, so the event loop is never blocked by disk I/O.
+
+    Args:
+        source: Path of the input file
+        destination: Path of the output file, created or truncated
+        chunk_size: Number of bytes to read per chunk
+        mode: Reversal mode, as for ``reverse_buffer``
+        bit_width: Word size in bits for the ``"word"`` mode
+        executor: Executor running the transfer, the shared ``default_executor()`` if None
+
+    Returns:
+        The number of bytes written
+
+    Raises:
+        ValueError: As for ``reverse_stream``
+    """
+    validate_chunk_size(chunk_size)
+    check_mode(mode, bit_width)
+    job = partial(_reverse_file, Path(source), Path(destination), chunk_size, mode, bit_width)
+    return await asyncio.get_running_loop().run_in_executor(executor or default_executor(), job)
+
+
+async def areverse_file_in_place(  # noqa: PLR0913
+    path: str | os.PathLike[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mode: Mode = "auto",
+    bit_width: BitWidth | None = None,
+    *,
+    ranges: Iterable[Range] | None = None,
+    executor: Executor | None = None,
+) -> int:
+    """Reverse the bits of a file in place with ``reverse_file_in_place`` on ``executor``.
+
+    Args:
+        path: Path of the file to modify
+        chunk_size: Number of bytes transformed and flushed at a time
+        mode: Reversal mode, as for ``reverse_buffer``
+        bit_width: Word size in bits for the ``"word"`` mode
+        ranges: Regions to reverse, as for ``reverse_file_in_place``
+        executor: Executor running the transfer, the shared ``default_executor()`` if None
+
+    Returns:
+        The number of bytes rewritten
+
+    Raises:
+        ValueError: As for ``reverse_file_in_place``
+        FileExistsError: If the marker of an interrupted earlier run exists
+    """
+    job = partial(reverse_file_in_place, Path(path), chunk_size, mode, bit_width, ranges=ranges)
+    return await asyncio.get_running_loop().run_in_executor(executor or default_executor(), job)
@@ -0,0 +1,404 @@
+"""Reproducible benchmark suite for revbits.
+
+Run with ``python -m revbits.benchmark``. The suite measures:
+
+- per-call latency of ``reverse_byte`` and ``reverse_bytes`` at every width,
+  next to the former pure-Python dispatch (``*_py``) to show the native gain
+- throughput of ``inverse_bytes`` from 1 B up to ``--max-size`` (default 1 GiB)
+- end-to-end throughput of the ``revbits`` CLI on a large file
+- scaling of ``inverse_bytes`` calls made concurrently from 1 up to
+  ``--max-workers`` threads of a ``ThreadPoolExecutor``, which shows whether
+  worker threads run in parallel (free-threaded builds, or buffers large
+  enough to release the GIL) or take turns
+- peak memory of every path: traced Python allocations for function calls,
+  maximum resident set size of the process for the CLI
+
+Every benchmark reports the median of several runs. Results can be written as
+JSON with ``--json`` and compared against an earlier run with ``--baseline``;
+the process exits with status 1 if any benchmark is slower than the baseline by
+more than ``--threshold``, so the suite can gate releases.
+"""
+
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from argparse import ArgumentParser
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from revbits import (
+    __version__,
+    active_kernel,
+    inverse_byte,
+    inverse_bytes,
+    inverse_dword,
+    inverse_qword,
+    inverse_word,
+    kernel_selection,
+)
+from revbits.cli import parse_size
+from revbits.reverser import reverse_byte, reverse_bytes
+
+SEED = 0x5EB175
+"""Seed of the pseudo-random benchmark input."""
+
+DEFAULT_MAX_SIZE = 1 << 30
+DEFAULT_CLI_SIZE = 256 << 20
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.10
+
+SCALING_SIZES = (4 << 10, 1 << 20)
+"""Buffer sizes of the scaling benchmark: one below the size at which calls release the GIL, one above."""
+
+SCALING_CALLS = 64
+"""Number of calls each worker thread makes per run of the scaling benchmark."""
+
+MIN_RUN_TIME = 0.2
+"""Short calls are repeated in a loop until one run takes at least this many seconds."""
+
+
+@dataclass
+class Result:
+    """Outcome of a single benchmark."""
+
+    name: str
+    group: str
+    seconds: float
+    """Median duration of one call in seconds."""
+    nbytes: int = 0
+    """Number of bytes processed per call, 0 for latency benchmarks."""
+    peak_bytes: int = 0
+    """Peak memory in bytes (traced allocations, or maximum RSS for the CLI)."""
+
+    @property
+    def throughput(self) -> float:
+        """Bytes processed per second."""
+        return self.nbytes / self.seconds if self.nbytes and self.seconds else 0.0
+
+
+@dataclass
+class Report:
+    """All results of a benchmark run together with the environment."""
+
+    results: list[Result] = field(default_factory=list)
+    environment: dict[str, Any] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"environment": self.environment, "results": [asdict(result) for result in self.results]}, indent=2
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "Report":
+        data = json.loads(text)
+        return cls([Result(**result) for result in data["results"]], data.get("environment", {}))
+
+
+@dataclass
+class BenchmarkArgs:
+    max_size: int = DEFAULT_MAX_SIZE
+    cli_size: int = DEFAULT_CLI_SIZE
+    repeat: int = DEFAULT_REPEAT
+    json: Path | None = None
+    baseline: Path | None = None
+    threshold: float = DEFAULT_THRESHOLD
+    max_workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+
+
+def environment() -> dict[str, Any]:
+    """Describe the machine and versions the benchmarks run on."""
+    return {
+        "revbits": __version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "gil_enabled": sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True,  # noqa: SLF001
+        "kernel": active_kernel(),
+        "kernels": kernel_selection(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def sample_data(size: int) -> bytes:
+    """Deterministic pseudo-random input of ``size`` bytes."""
+    block = random.Random(SEED).randbytes(min(size, 1 << 20))  # noqa: S311
+    repeats, remainder = divmod(size, len(block)) if block else (0, 0)
+    return block * repeats + block[:remainder]
+
+
+def time_call(func: Callable[[], object], repeat: int) -> float:
+    """Median duration of one call of ``func``, looping short calls for accuracy."""
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < MIN_RUN_TIME:
+        number *= 10
+    return statistics.median(timer.repeat(repeat, number)) / number
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    """Peak memory traced by ``tracemalloc`` during one call of ``func``."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(name: str, group: str, func: Callable[[], object], repeat: int, nbytes: int = 0) -> Result:
+    return Result(name, group, time_call(func, repeat), nbytes, peak_memory(func))
+
+
+def _reverse_byte_py(value: int) -> int:
+    # Former Python-level reverse_byte, kept as the microbenchmark reference
+    if not 0 <= value <= 0xFF:
+        raise ValueError(f"Value {value} is out of range for byte (0-255)")
+    return inverse_byte(value)
+
+
+def _reverse_bytes_py(value: bytes) -> bytes:
+    # Former Python-level dispatch of reverse_bytes without bit_width
+    value_len = len(value)
+    if value_len == 1:
+        return bytes([inverse_byte(value[0])])
+    for size, inverse in ((2, inverse_word), (4, inverse_dword), (8, inverse_qword)):
+        if value_len == size:
+            return inverse(int.from_bytes(value, byteorder="little")).to_bytes(size, byteorder="little")
+    return inverse_bytes(value)
+
+
+def bench_latency(repeat: int) -> list[Result]:
+    """Per-call latency of the scalar wrappers at every width, native and pure-Python dispatch."""
+    results = [
+        measure("reverse_byte", "latency", partial(reverse_byte, 0x5A), repeat),
+        measure("reverse_byte_py", "latency", partial(_reverse_byte_py, 0x5A), repeat),
+    ]
+    for width in (8, 16, 32, 64):
+        value = sample_data(width // 8)
+        results.append(measure(f"reverse_bytes[{width}]", "latency", partial(reverse_bytes, value), repeat))
+        results.append(measure(f"reverse_bytes_py[{width}]", "latency", partial(_reverse_bytes_py, value), repeat))
+    return results
+
+
+def throughput_sizes(max_size: int) -> list[int]:
+    """Sizes from 1 B to ``max_size`` in steps of 16x."""
+    sizes = []
+    size = 1
+    while size <= max_size:
+        sizes.append(size)
+        size *= 16
+    if sizes[-1] != max_size:
+        sizes.append(max_size)
+    return sizes
+
+
+def bench_throughput(max_size: int, repeat: int) -> list[Result]:
+    """Throughput of ``inverse_bytes`` for buffers from 1 B to ``max_size``."""
+    results = []
+    for size in throughput_sizes(max_size):
+        data = sample_data(size)
+        results.append(measure(f"inverse_bytes[{size}]", "throughput", partial(inverse_bytes, data), repeat, size))
+        del data
+    return results
+
+
+def run_cli(arguments: list[str]) -> tuple[float, int]:
+    """Run the CLI in a child process and return its wall time and maximum RSS in bytes."""
+    command = [sys.executable, "-m", "revbits", *arguments]
+    start = time.perf_counter()
+    process = subprocess.Popen(command)  # noqa: S603
+    if not hasattr(os, "wait4"):
+        # No per-process resource usage on this platform (Windows)
+        returncode, max_rss = process.wait(), 0
+    else:
+        _, status, usage = os.wait4(process.pid, 0)
+        returncode = process.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        max_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    elapsed = time.perf_counter() - start
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, command)
+    return elapsed, max_rss
+
+
+def bench_cli(size: int, repeat: int) -> list[Result]:
+    """End-to-end CLI throughput, streaming to a new file and in place."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / "input.bin"
+        source.write_bytes(sample_data(size))
+        cases = {
+            "cli[stream]": [str(source), "-o", str(Path(directory) / "output.bin")],
+            "cli[in-place]": [str(source), "-i"],
+        }
+        for name, arguments in cases.items():
+            runs = [run_cli(arguments) for _ in range(repeat)]
+            seconds = statistics.median(elapsed for elapsed, _ in runs)
+            results.append(Result(name, "cli", seconds, size, max(rss for _, rss in runs)))
+    return results
+
+
+def worker_counts(max_workers: int) -> list[int]:
+    """Powers of two from 1 up to ``max_workers``, and ``max_workers`` itself."""
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max(max_workers, 1))
+    return counts
+
+
+def _call_repeatedly(func: Callable[[], object], calls: int) -> None:
+    for _ in range(calls):
+        func()
+
+
+def _run_concurrently(executor: ThreadPoolExecutor, workers: int, func: Callable[[], object]) -> None:
+    """Make ``workers`` threads of ``executor`` call ``func`` ``SCALING_CALLS`` times each."""
+    futures = [executor.submit(_call_repeatedly, func, SCALING_CALLS) for _ in range(workers)]
+    for future in futures:
+        future.result()
+
+
+def bench_scaling(max_workers: int, repeat: int) -> list[Result]:
+    """Throughput of ``inverse_bytes`` called concurrently by 1 to ``max_workers`` threads.
+
+    Every worker makes ``SCALING_CALLS`` single-threaded calls per run, so the
+    throughput grows with the number of workers only as far as the calls run in
+    parallel. The thread pool is created before the timed runs.
+    """
+    results = []
+    for size in SCALING_SIZES:
+        data = sample_data(size)
+        call = partial(inverse_bytes, data, threads=1)
+        for workers in worker_counts(max_workers):
+            with ThreadPoolExecutor(workers, thread_name_prefix="revbits-bench") as executor:
+                seconds = time_call(partial(_run_concurrently, executor, workers, call), repeat)
+            results.append(Result(f"scaling[{size}]x{workers}", "scaling", seconds, workers * SCALING_CALLS * size))
+    return results
+
+
+def run(args: BenchmarkArgs) -> Report:
+    """Run the whole suite."""
+    report = Report(environment=environment())
+    report.results += bench_latency(args.repeat)
+    report.results += bench_throughput(args.max_size, args.repeat)
+    report.results += bench_cli(args.cli_size, args.repeat)
+    report.results += bench_scaling(args.max_workers, args.repeat)
+    return report
+
+
+def compare(current: Report, baseline: Report, threshold: float) -> list[str]:
+    """List the benchmarks that got slower than the baseline by more than ``threshold``.
+
+    Args:
+        current: Results of this run
+        baseline: Results of an earlier run
+        threshold: Allowed relative slowdown, e.g. 0.10 for 10 %
+
+    Returns:
+        One message per regression; empty if there is none
+    """
+    previous = {result.name: result for result in baseline.results}
+    regressions = []
+    for result in current.results:
+        before = previous.get(result.name)
+        if before is None or before.seconds <= 0:
+            continue
+        ratio = result.seconds / before.seconds
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{result.name}: {_format_seconds(result.seconds)} vs {_format_seconds(before.seconds)} "
+                f"({ratio - 1:+.1%}, threshold {threshold:.0%})"
+            )
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def _format_bytes(nbytes: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if nbytes < 1024:
+            return f"{nbytes:.4g} {unit}"
+        nbytes /= 1024
+    return f"{nbytes:.4g} TiB"
+
+
+def format_table(report: Report) -> str:
+    """Human-readable summary of a report."""
+    lines = [f"{'benchmark':<28} {'time':>12} {'throughput':>14} {'peak memory':>12}"]
+    for result in report.results:
+        throughput = f"{_format_bytes(result.throughput)}/s" if result.throughput else "-"
+        lines.append(
+            f"{result.name:<28} {_format_seconds(result.seconds):>12} {throughput:>14} "
+            f"{_format_bytes(result.peak_bytes):>12}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: list[str] | None = None) -> BenchmarkArgs:
+    parser = ArgumentParser(description="Run the revbits benchmark suite")
+    parser.add_argument(
+        "--max-size", type=parse_size, default=DEFAULT_MAX_SIZE, help="Largest inverse_bytes input (default: 1G)"
+    )
+    parser.add_argument(
+        "--cli-size", type=parse_size, default=DEFAULT_CLI_SIZE, help="Size of the CLI input file (default: 256M)"
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per benchmark (default: 5)")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Most threads calling inverse_bytes at once in the scaling benchmark (default: number of CPUs)",
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Write the results as JSON to this path")
+    parser.add_argument("--baseline", type=Path, default=None, help="JSON results of an earlier run to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed relative slowdown against the baseline (default: 0.10)",
+    )
+
+    ret_val = BenchmarkArgs()
+    parser.parse_args(argv, namespace=ret_val)
+    return ret_val
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    report = run(args)
+    print(format_table(report))
+    if args.json is not None:
+        args.json.write_text(report.to_json())
+
+    if args.baseline is not None:
+        regressions = compare(report, Report.from_json(args.baseline.read_text()), args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
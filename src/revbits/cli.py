@@ -1,31 +1,326 @@
+import os
 import sys
-from argparse import ArgumentParser
-from dataclasses import dataclass
+import time
+from argparse import ArgumentParser, ArgumentTypeError
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, ExitStack, contextmanager, nullcontext
+from dataclasses import dataclass, field
 from pathlib import Path
-
-from loguru import logger
+from typing import TYPE_CHECKING, BinaryIO, Literal
 
 from revbits import __version__
-from revbits.reverser import reverse_bytes
+from revbits._core import TransformChain, reverse_bitstream, set_num_threads
+from revbits.instrument import RunStats, StreamTimer, peak_rss
+from revbits.records import FORMATS, RecordFormat, format_for_path, reverse_records
+from revbits.reverser import MODES, BitWidth, Mode, check_mode
+from revbits.stream import (
+    DEFAULT_CHUNK_SIZE,
+    INCOMPLETE_SUFFIX,
+    MIN_CHUNK_SIZE,
+    Range,
+    reverse_file_in_place,
+    reverse_stream,
+    transform_file_in_place,
+    transform_stream,
+)
+
+if TYPE_CHECKING:
+    import loguru
+
+    from revbits.pipeline import Codec
+
+STDIO_PATH = Path("-")
+
+_SIZE_SUFFIXES = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+_GLOB_CHARACTERS = frozenset("*?[")
+
+# The values of revbits.pipeline.CODECS, which is imported only for compressed files
+_CODEC_CHOICES = ("gzip", "bz2", "xz", "none")
+
+
+class _Logger:
+    """Logger of the CLI that imports loguru only for verbose output.
+
+    Until ``enable_verbose`` is called, debug and info messages are dropped and
+    warnings and errors are written to stderr directly, which keeps the startup
+    of short runs free of loguru's import time.
+    """
+
+    def __init__(self) -> None:
+        self._loguru: loguru.Logger | None = None
+
+    def enable_verbose(self) -> None:
+        from loguru import logger  # noqa: PLC0415
+
+        logger.remove()
+        logger.add(sys.stderr, level="DEBUG")
+        self._loguru = logger
+
+    def debug(self, message: str) -> None:
+        if self._loguru is not None:
+            self._loguru.opt(depth=1).debug(message)
+
+    def info(self, message: str) -> None:
+        if self._loguru is not None:
+            self._loguru.opt(depth=1).info(message)
+
+    def warning(self, message: str) -> None:
+        self._log("WARNING", message)
+
+    def error(self, message: str) -> None:
+        self._log("ERROR", message)
+
+    def _log(self, level: str, message: str) -> None:
+        if self._loguru is not None:
+            self._loguru.opt(depth=2).log(level, message)
+        else:
+            print(f"{level}: {message}", file=sys.stderr)
+
+
+console = _Logger()
 
 
 @dataclass
 class CliArgs:
-    file: Path = Path()
+    files: list[Path] = field(default_factory=list)
     output: Path | None = None
     in_place: bool = False
+    recursive: bool = False
+    jobs: int = 1
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    mode: Mode = "auto"
+    bit_width: BitWidth | None = None
+    offset: int | None = None
+    length: int | None = None
+    ranges: list[Range] = field(default_factory=list)
+    bits: int | None = None
+    bit_order: Literal["msb", "lsb"] | None = None
+    chain: TransformChain | None = None
+    record_format: RecordFormat | Literal["binary"] | None = None
+    input_codec: "Codec | Literal['none'] | None" = None
+    output_codec: "Codec | Literal['none'] | None" = None
+    threads: int | None = None
+    stats: Literal["text", "json"] | None = None
+    server: Path | None = None
     verbose: bool = False
+    # Standard input and output of the run, None for those of the process
+    stdin: BinaryIO | None = field(default=None, repr=False)
+    stdout: BinaryIO | None = field(default=None, repr=False)
+
+
+def _parse_bytes(text: str) -> int:
+    """Parse a non-negative byte count such as ``4096``, ``0x200``, ``64K``, ``1M`` or ``2G``."""
+    number = text.strip().upper()
+    try:
+        if number.startswith("0X"):
+            size = int(number, 16)
+        else:
+            number = number.removesuffix("B")
+            suffix = number[-1:] if number[-1:] in _SIZE_SUFFIXES else ""
+            size = int(number.removesuffix(suffix)) * _SIZE_SUFFIXES[suffix]
+    except ValueError:
+        raise ArgumentTypeError(f"invalid size: {text!r}") from None
+    if size < 0:
+        raise ArgumentTypeError(f"size must not be negative: {text!r}")
+    return size
+
+
+def parse_size(text: str) -> int:
+    """Parse a chunk size such as ``4096``, ``64K``, ``1M`` or ``2G``."""
+    size = _parse_bytes(text)
+    if size < MIN_CHUNK_SIZE:
+        raise ArgumentTypeError(f"size must be at least {MIN_CHUNK_SIZE} bytes: {text!r}")
+    return size
+
+
+def parse_range(text: str) -> Range:
+    """Parse a region ``OFFSET:LENGTH``, where an empty length extends to the end of the file."""
+    offset, separator, length = text.partition(":")
+    if not separator:
+        raise ArgumentTypeError(f"invalid range (expected OFFSET:LENGTH): {text!r}")
+    return _parse_bytes(offset), _parse_bytes(length) if length.strip() else None
 
 
-def parse_args() -> CliArgs:
-    parser = ArgumentParser(description="Reverse Bits CLI")
-    parser.add_argument("file", type=Path, help="Input file path to reverse bits")
+def parse_bits(text: str) -> int:
+    """Parse a non-negative bit count."""
+    try:
+        bits = int(text)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid bit count: {text!r}") from None
+    if bits < 0:
+        raise ArgumentTypeError(f"bit count must not be negative: {text!r}")
+    return bits
+
+
+def parse_chain(text: str) -> TransformChain:
+    """Parse a comma-separated chain of operations such as ``reverse,swap32,xor:5a``."""
+    try:
+        return TransformChain(text)
+    except ValueError as e:
+        raise ArgumentTypeError(str(e)) from None
+
+
+def parse_threads(text: str) -> int:
+    """Parse a non-negative thread count."""
+    try:
+        threads = int(text)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid thread count: {text!r}") from None
+    if threads < 0:
+        raise ArgumentTypeError(f"thread count must not be negative: {text!r}")
+    return threads
+
+
+def _build_parser(parser_class: type[ArgumentParser] = ArgumentParser) -> ArgumentParser:
+    parser = parser_class(prog="revbits", description="Reverse Bits CLI")
+    parser.add_argument(
+        "files",
+        nargs="+",
+        type=Path,
+        help="Input files, glob patterns or directories (with --recursive) to reverse bits ('-' for stdin)",
+    )
 
     # Create mutually exclusive group for output options
     output_group = parser.add_mutually_exclusive_group()
-    output_group.add_argument("-o", "--output", type=Path, help="Output file path", default=None)
-    output_group.add_argument("-i", "--in-place", action="store_true", help="Modify the input file in place")
+    output_group.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Output file path ('-' for stdout), or output directory when several files are given",
+        default=None,
+    )
+    output_group.add_argument("-i", "--in-place", action="store_true", help="Modify the input files in place")
 
+    parser.add_argument(
+        "-r", "--recursive", action="store_true", help="Reverse all files below directories given as input"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=parse_threads,
+        default=1,
+        help="Number of files processed concurrently, 0 for one per CPU (default: 1)",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=parse_size,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Number of bytes processed at a time, with optional K/M/G suffix (default: 1M)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="auto",
+        help=(
+            "Reversal mode: 'byte' reverses every byte, 'word' every --bit-width word, 'whole' the entire "
+            "input as one integer; 'auto' treats 1/2/4/8-byte inputs as one word and others per byte "
+            "(default: auto)"
+        ),
+    )
+    parser.add_argument(
+        "--bit-width",
+        type=int,
+        choices=(8, 16, 32, 64),
+        default=None,
+        help="Word size in bits for --mode word",
+    )
+    parser.add_argument(
+        "--offset",
+        type=_parse_bytes,
+        default=None,
+        help="Reverse only the region starting at this byte offset (decimal, 0x hex, or K/M/G suffix)",
+    )
+    parser.add_argument(
+        "--length",
+        type=_parse_bytes,
+        default=None,
+        help="Number of bytes of the region of --offset (default: to the end of the file)",
+    )
+    parser.add_argument(
+        "--range",
+        dest="ranges",
+        type=parse_range,
+        action="append",
+        default=[],
+        metavar="OFFSET:LENGTH",
+        help="Reverse only this region (may be repeated; empty LENGTH extends to the end of the file)",
+    )
+    parser.add_argument(
+        "--bits",
+        type=parse_bits,
+        default=None,
+        metavar="N",
+        help=(
+            "Reverse every input as one sequence of N bits, which need not be a multiple of 8; "
+            "the input must be exactly ceil(N/8) bytes and is read into memory"
+        ),
+    )
+    parser.add_argument(
+        "--bit-order",
+        choices=("msb", "lsb"),
+        default=None,
+        help="Position of the first bit within each byte for --bits: most or least significant (default: msb)",
+    )
+    parser.add_argument(
+        "--chain",
+        type=parse_chain,
+        default=None,
+        metavar="OPS",
+        help=(
+            "Apply comma-separated operations in one pass instead of the bit reversal: reverse (bits of each byte), "
+            "swap16, swap32, swap64 (byte order), xor:HEX (repeating key) and invert, e.g. reverse,swap32,xor:ff00"
+        ),
+    )
+    parser.add_argument(
+        "--format",
+        dest="record_format",
+        choices=("binary", *FORMATS),
+        default=None,
+        help=(
+            "Input format: ihex (Intel HEX) and srec (Motorola S-record) reverse only the data bytes of the "
+            "data records and recompute their checksums (default: ihex for .hex/.ihex/.ihx, srec for "
+            ".srec/.s19/.s28/.s37/.mot, binary otherwise)"
+        ),
+    )
+    parser.add_argument(
+        "--input-codec",
+        choices=_CODEC_CHOICES,
+        default=None,
+        help="Decompress the input (default: from the extension .gz, .bz2 or .xz; none for standard input)",
+    )
+    parser.add_argument(
+        "--output-codec",
+        choices=_CODEC_CHOICES,
+        default=None,
+        help="Compress the output (default: from the extension .gz, .bz2 or .xz; none for standard output)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=parse_threads,
+        default=None,
+        help="Number of threads for chunks of at least 8M, 0 for one per CPU (default: 0)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_const",
+        const="text",
+        help="Print bytes processed, wall and CPU time per phase, throughput and peak RSS to stderr",
+    )
+    parser.add_argument(
+        "--stats-json", dest="stats", action="store_const", const="json", help="Print the --stats report as JSON"
+    )
+    parser.add_argument(
+        "--server",
+        type=Path,
+        default=None,
+        metavar="SOCKET",
+        help=(
+            "Forward the run to a 'revbits serve' server listening on this Unix socket, which saves the startup "
+            "of the interpreter; runs locally if no server is listening"
+        ),
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
     parser.add_argument(
         "--version",
@@ -33,49 +328,417 @@ def parse_args() -> CliArgs:
         version=f"%(prog)s {__version__}",
         help="Show the version number and exit",
     )
+    return parser
+
 
+def parse_args(argv: list[str] | None = None) -> CliArgs:
+    parser = _build_parser()
     ret_val = CliArgs()
-    parser.parse_args(namespace=ret_val)
+    parser.parse_args(argv, namespace=ret_val)
+    try:
+        check_args(ret_val)
+    except ValueError as e:
+        parser.error(str(e))
     return ret_val
 
 
-def main() -> None:
-    args = parse_args()
+def check_args(args: CliArgs) -> None:
+    """Check the combination of the options.
 
-    logger.remove()
-    if args.verbose:
-        logger.add(sys.stderr, level="DEBUG")
-    else:
-        logger.add(sys.stderr, level="WARNING")
+    Raises:
+        ValueError: If options that cannot be combined are given
+    """
+    check_mode(args.mode, args.bit_width)
+    if STDIO_PATH in args.files and len(args.files) > 1:
+        msg = "'-' cannot be combined with other inputs"
+        raise ValueError(msg)
+    if is_batch(args) and args.output == STDIO_PATH:
+        msg = "Cannot write several files to standard output"
+        raise ValueError(msg)
+    if file_ranges(args) is not None and STDIO_PATH in (*args.files, args.output):
+        msg = "--offset, --length and --range require files, not standard input or output"
+        raise ValueError(msg)
+    if args.bits is None and args.bit_order is not None:
+        msg = "--bit-order requires --bits"
+        raise ValueError(msg)
+    if args.bits is not None and (args.mode != "auto" or args.bit_width is not None or file_ranges(args) is not None):
+        msg = "--bits cannot be combined with --mode, --bit-width, --offset, --length or --range"
+        raise ValueError(msg)
+    if args.chain is not None and (
+        args.mode != "auto" or args.bit_width is not None or args.bits is not None or file_ranges(args) is not None
+    ):
+        msg = "--chain cannot be combined with --mode, --bit-width, --bits, --offset, --length or --range"
+        raise ValueError(msg)
+    if args.record_format in FORMATS and _has_binary_options(args):
+        msg = (
+            "--format ihex and srec cannot be combined with --mode, --bit-width, --bits, --chain, --offset, "
+            "--length or --range"
+        )
+        raise ValueError(msg)
 
-    logger.debug(f"Parsed arguments: {args}")
-    logger.info(f"Input file: {args.file}")
 
-    input_file = args.file
-    if not input_file.exists():
-        logger.error(f"Input file {input_file} does not exist.")
-        sys.exit(1)
+def _has_binary_options(args: CliArgs) -> bool:
+    """Whether options that only apply to binary data are given."""
+    return (
+        args.mode != "auto"
+        or args.bit_width is not None
+        or args.bits is not None
+        or args.chain is not None
+        or file_ranges(args) is not None
+    )
+
+
+def file_ranges(args: CliArgs) -> list[Range] | None:
+    """The regions to reverse in every file, or None to reverse whole files."""
+    ranges = list(args.ranges)
+    if args.offset is not None or args.length is not None:
+        ranges.append((args.offset or 0, args.length))
+    return ranges or None
+
+
+def _is_pattern(path: Path) -> bool:
+    return not path.exists() and not _GLOB_CHARACTERS.isdisjoint(str(path))
+
+
+def is_batch(args: CliArgs) -> bool:
+    """Whether the inputs may name several files, so that ``-o`` is an output directory."""
+    return len(args.files) > 1 or args.recursive or any(map(_is_pattern, args.files))
+
+
+def expand_inputs(paths: list[Path], *, recursive: bool) -> tuple[list[tuple[Path, Path]], list[tuple[Path, str]]]:
+    """Expand input arguments into the files to reverse.
+
+    Glob patterns are expanded (``**`` matches any number of directories), and
+    with ``recursive`` directories are replaced by all files below them, except
+    markers of interrupted in-place runs.
+
+    Args:
+        paths: Input arguments as given on the command line
+        recursive: Whether directories are expanded
+
+    Returns:
+        ``(file, name)`` pairs, where ``name`` is the path of the output below an
+        output directory, and ``(argument, message)`` pairs for arguments that
+        do not name any file
+    """
+    files: list[tuple[Path, Path]] = []
+    errors: list[tuple[Path, str]] = []
+    for path in paths:
+        if path == STDIO_PATH:
+            files.append((path, path))
+            continue
+        if _is_pattern(path):
+            import glob  # noqa: PLC0415
+
+            # glob.glob, unlike Path.glob, accepts absolute patterns
+            matches = sorted(Path(match) for match in glob.glob(str(path), recursive=True))  # noqa: PTH207
+            if not matches:
+                errors.append((path, "No files match the pattern"))
+        else:
+            matches = [path]
+        for match in matches:
+            if not match.exists():
+                errors.append((match, "Input file does not exist"))
+            elif not match.is_dir():
+                files.append((match, Path(match.name)))
+            elif recursive:
+                files += [
+                    (child, child.relative_to(match))
+                    for child in sorted(match.rglob("*"))
+                    if child.is_file() and not child.name.endswith(INCOMPLETE_SUFFIX)
+                ]
+            else:
+                errors.append((match, "Input is a directory (use --recursive)"))
+    # A file matched by several arguments is reversed once
+    return list(dict.fromkeys(files)), errors
+
+
+def _open_input(args: CliArgs, path: Path) -> AbstractContextManager[BinaryIO]:
+    if path == STDIO_PATH:
+        return nullcontext(args.stdin or sys.stdin.buffer)
+    return path.open("rb")
+
+
+def _open_output(args: CliArgs, path: Path) -> AbstractContextManager[BinaryIO]:
+    if path == STDIO_PATH:
+        return nullcontext(args.stdout or sys.stdout.buffer)
+    return path.open("wb")
+
+
+def _is_same_file(input_file: Path, output_file: Path) -> bool:
+    return STDIO_PATH not in (input_file, output_file) and output_file.exists() and output_file.samefile(input_file)
+
+
+def _codec(option: "Codec | Literal['none'] | None", path: Path) -> "Codec | None":
+    """The compression format of a file: ``option`` if given, else from the extension."""
+    if option == "none" or (option is None and path == STDIO_PATH):
+        return None
+    if option is not None:
+        return option
+    from revbits.pipeline import codec_for_path  # noqa: PLC0415
+
+    return codec_for_path(path)
+
+
+@contextmanager
+def _reader(args: CliArgs, path: Path, timer: StreamTimer | None) -> Iterator[BinaryIO]:
+    """Open an input, decompressing it on a background thread if it is compressed."""
+    with ExitStack() as stack:
+        source = stack.enter_context(_open_input(args, path))
+        codec = _codec(args.input_codec, path)
+        if codec is not None:
+            from revbits.pipeline import read_ahead  # noqa: PLC0415
+
+            source = stack.enter_context(read_ahead(source, args.chunk_size, codec))
+        yield timer.reader(source) if timer else source
+
+
+@contextmanager
+def _writer(args: CliArgs, path: Path, timer: StreamTimer | None) -> Iterator[BinaryIO]:
+    """Open an output, compressing it on a background thread if it is compressed."""
+    with ExitStack() as stack:
+        destination = stack.enter_context(_open_output(args, path))
+        codec = _codec(args.output_codec, path)
+        if codec is not None:
+            from revbits.pipeline import write_behind  # noqa: PLC0415
+
+            destination = stack.enter_context(write_behind(destination, codec))
+        yield timer.writer(destination) if timer else destination
+
+
+def _record_format(args: CliArgs, path: Path) -> RecordFormat | None:
+    """The record format of an input: ``--format`` if given, else from the extension; None for binary data."""
+    if args.record_format == "binary" or (args.record_format is None and path == STDIO_PATH):
+        return None
+    if args.record_format is not None:
+        return args.record_format
+    return format_for_path(path)
 
+
+def _reverse(args: CliArgs, input_file: Path, output_file: Path, timer: StreamTimer | None) -> int:
+    compressed = _codec(args.input_codec, input_file) is not None or _codec(args.output_codec, output_file) is not None
+    if compressed and _is_same_file(input_file, output_file):
+        msg = "Compressed files cannot be modified in place"
+        raise ValueError(msg)
+    record_format = _record_format(args, input_file)
+    if record_format is not None:
+        return _reverse_records(args, record_format, input_file, output_file, timer)
+    if args.bits is not None:
+        return _reverse_bitstream(args, args.bits, input_file, output_file, timer)
+    if args.chain is not None:
+        return _transform(args, args.chain, input_file, output_file, timer)
+    ranges = file_ranges(args)
+    if _is_same_file(input_file, output_file):
+        # Reverse bits directly in the memory-mapped file
+        return reverse_file_in_place(input_file, args.chunk_size, args.mode, args.bit_width, ranges=ranges)
+    if ranges is not None:
+        if compressed:
+            msg = "--offset, --length and --range cannot be used with compressed files"
+            raise ValueError(msg)
+        return _reverse_copy(args, input_file, output_file, ranges)
+
+    # Stream chunks from input to output; codecs run on threads of their own
+    with _reader(args, input_file, timer) as reader, _writer(args, output_file, timer) as writer:
+        output_length = reverse_stream(reader, writer, args.chunk_size, args.mode, args.bit_width)
+        writer.flush()
+    return output_length
+
+
+def _reverse_records(
+    args: CliArgs, record_format: RecordFormat, input_file: Path, output_file: Path, timer: StreamTimer | None
+) -> int:
+    """Reverse the data bytes of the records of an Intel HEX or S-record file."""
+    if _has_binary_options(args):
+        msg = (
+            "--mode, --bit-width, --bits, --chain, --offset, --length and --range do not apply to "
+            f"{record_format} files; use --format binary to reverse them as binary data"
+        )
+        raise ValueError(msg)
+    if _is_same_file(input_file, output_file):
+        msg = "Intel HEX and S-record files cannot be modified in place"
+        raise ValueError(msg)
+    try:
+        with _reader(args, input_file, timer) as reader, _writer(args, output_file, timer) as writer:
+            output_length = reverse_records(reader, writer, record_format, args.chunk_size)
+            writer.flush()
+    except ValueError:
+        # Do not leave the records before a malformed one behind
+        if output_file != STDIO_PATH:
+            output_file.unlink(missing_ok=True)
+        raise
+    return output_length
+
+
+def _reverse_bitstream(args: CliArgs, bits: int, input_file: Path, output_file: Path, timer: StreamTimer | None) -> int:
+    """Reverse the input as one sequence of ``bits`` bits."""
+    bit_order = args.bit_order or "msb"
+    if _is_same_file(input_file, output_file):
+        import mmap  # noqa: PLC0415
+
+        with input_file.open("r+b") as file:
+            # Empty files cannot be mapped; the length check still applies
+            if os.fstat(file.fileno()).st_size == 0:
+                return len(reverse_bitstream(b"", bits, bit_order=bit_order))
+            with mmap.mmap(file.fileno(), 0) as mapped:
+                reverse_bitstream(mapped, bits, mapped, bit_order=bit_order)
+                return len(mapped)
+
+    # The whole sequence is needed at once; nothing is written if it has the wrong length
+    with _reader(args, input_file, timer) as reader:
+        data = reader.read()
+    result = reverse_bitstream(data, bits, bit_order=bit_order)
+    with _writer(args, output_file, timer) as writer:
+        writer.write(result)
+        writer.flush()
+    return len(result)
+
+
+def _transform(
+    args: CliArgs, chain: TransformChain, input_file: Path, output_file: Path, timer: StreamTimer | None
+) -> int:
+    """Apply the operations of ``--chain`` to the input."""
+    if _is_same_file(input_file, output_file):
+        return transform_file_in_place(input_file, chain, args.chunk_size)
+    with _reader(args, input_file, timer) as reader, _writer(args, output_file, timer) as writer:
+        output_length = transform_stream(reader, writer, chain, args.chunk_size)
+        writer.flush()
+    return output_length
+
+
+def _reverse_copy(args: CliArgs, input_file: Path, output_file: Path, ranges: list[Range]) -> int:
+    """Copy the input and reverse the regions of the copy in place."""
+    import shutil  # noqa: PLC0415
+
+    # copyfile lets the OS copy the data (copy_file_range, sendfile) where possible
+    shutil.copyfile(input_file, output_file)
+    try:
+        return reverse_file_in_place(output_file, args.chunk_size, args.mode, args.bit_width, ranges=ranges)
+    except ValueError:
+        output_file.unlink()
+        raise
+
+
+def _output_path(args: CliArgs, input_file: Path, name: Path, output_dir: Path | None) -> Path:
+    if output_dir is not None:
+        return output_dir / name
     if args.output is not None:
-        output_file = args.output
-    elif args.in_place:
-        output_file = args.file
+        return args.output
+    if args.in_place or input_file == STDIO_PATH:
+        return input_file
+    return input_file.parent / f"{input_file.stem}_reversed{input_file.suffix}"
+
+
+def _reverse_file(args: CliArgs, input_file: Path, output_file: Path, timer: StreamTimer | None) -> str | None:
+    """Reverse one file, timing its phases with ``timer`` if given, and return the error message if it failed."""
+    console.info(f"Input file: {input_file}, output file: {output_file}")
+    if input_file == STDIO_PATH and args.in_place:
+        return "Cannot modify standard input in place."
+    try:
+        if output_file != STDIO_PATH:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+        if timer is None:
+            output_length = _reverse(args, input_file, output_file, None)
+        else:
+            with timer.run() as transform:
+                output_length = transform.nbytes = _reverse(args, input_file, output_file, timer)
+    except (OSError, ValueError) as e:
+        return str(e)
+    console.info(f"Output file: {output_file} ({output_length} bytes written)")
+    return None
+
+
+def _plan(args: CliArgs) -> tuple[list[tuple[Path, Path]], list[tuple[Path, str]]]:
+    """Pair every input file with its output file and collect the inputs that cannot be processed."""
+    files, failures = expand_inputs(args.files, recursive=args.recursive)
+    output_dir = args.output if args.output is not None and (is_batch(args) or args.output.is_dir()) else None
+
+    tasks: list[tuple[Path, Path]] = []
+    owners: dict[Path, Path] = {}
+    for input_file, name in files:
+        output_file = _output_path(args, input_file, name, output_dir)
+        owner = owners.setdefault(output_file, input_file)
+        if owner != input_file and output_file != STDIO_PATH:
+            failures.append((input_file, f"Output file {output_file} is also the output of {owner}"))
+        else:
+            tasks.append((input_file, output_file))
+    return tasks, failures
+
+
+def stats_report(args: CliArgs, stats: RunStats) -> str:
+    """The ``--stats`` report, as text or as JSON for ``--stats-json``."""
+    if args.stats == "json":
+        import json  # noqa: PLC0415
+
+        return json.dumps(stats.to_dict())
+    return stats.format()
+
+
+def failure_report(failures: list[tuple[Path, str]], total: int) -> list[str]:
+    """The lines of the error report of a run with failed inputs."""
+    return [f"Failed to reverse {len(failures)} of {total} input(s):"] + [
+        f"  {path}: {message}" for path, message in failures
+    ]
+
+
+def run(args: CliArgs) -> tuple[list[tuple[Path, str]], int, RunStats | None]:
+    """Reverse all inputs of ``args``, concurrently with ``--jobs``.
+
+    Returns:
+        The inputs that failed with their error messages, the number of inputs,
+        and the statistics of the run if ``--stats`` is given
+    """
+    tasks, failures = _plan(args)
+    total = len(tasks) + len(failures)
+    jobs = args.jobs or os.cpu_count() or 1
+    concurrent = jobs > 1 and len(tasks) > 1
+    # Concurrent files would count each other's CPU time in the process clock
+    cpu_clock = time.thread_time if concurrent else time.process_time
+    timers = [StreamTimer(cpu_clock) if args.stats else None for _ in tasks]
+    wall, cpu = time.perf_counter(), time.process_time()
+    if concurrent:
+        from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="revbits-cli") as executor:
+            errors = list(executor.map(lambda task, timer: _reverse_file(args, task[0], task[1], timer), tasks, timers))
     else:
-        output_file = args.file.parent / f"{args.file.stem}_reversed{args.file.suffix}"
+        errors = [
+            _reverse_file(args, input_file, output_file, timer)
+            for (input_file, output_file), timer in zip(tasks, timers, strict=True)
+        ]
+
+    stats = None
+    if args.stats:
+        stats = RunStats(wall=time.perf_counter() - wall, cpu=time.process_time() - cpu, peak_rss=peak_rss())
+        for timer, error in zip(timers, errors, strict=True):
+            if timer is not None and error is None:
+                stats.add(timer)
+
+    failures += [(input_file, error) for (input_file, _), error in zip(tasks, errors, strict=True) if error]
+    return failures, total, stats
 
-    output_file = Path(output_file)
-    logger.info(f"Output file: {output_file}")
 
-    # Read input file
-    input_buffer = args.file.read_bytes()
-    logger.debug(f"Read {len(input_buffer)} bytes from input file")
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.server is not None:
+        from revbits.server import forward  # noqa: PLC0415
 
-    # Reverse bits
-    output_buffer = reverse_bytes(input_buffer)
+        if forward(args.server, sys.argv[1:] if argv is None else argv):
+            return
 
-    # Write output file
-    output_length = output_file.write_bytes(output_buffer)
-    logger.info(f"Output file: {output_file} ({output_length} bytes written)")
+    if args.verbose:
+        console.enable_verbose()
+
+    console.debug(f"Parsed arguments: {args}")
+    if args.threads is not None:
+        set_num_threads(args.threads)
+
+    failures, total, stats = run(args)
+    if stats is not None:
+        print(stats_report(args, stats), file=sys.stderr)
+    if failures:
+        for line in failure_report(failures, total):
+            console.error(line)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
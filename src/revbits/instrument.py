@@ -0,0 +1,252 @@
+"""Instrumentation of the Python API and phase timings of stream runs.
+
+Hooks registered with ``add_hook`` receive a ``CallEvent`` with the size and
+latency of every successful call of ``reverse_buffer``, ``reverse_stream``,
+``reverse_file_in_place``, ``transform_stream``, ``transform_file_in_place``,
+``reverse_records`` and ``areverse_stream``. While no hook is registered, these
+functions only test whether ``hooks`` is empty and do not read any clock.
+
+``StreamTimer`` splits one run into the time spent reading, transforming and
+writing; the ``--stats`` option of the CLI reports the sum over all files as
+``RunStats``.
+"""
+
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, NamedTuple, cast
+
+__all__ = [
+    "PHASES",
+    "CallEvent",
+    "Hook",
+    "Phase",
+    "RunStats",
+    "StreamTimer",
+    "add_hook",
+    "peak_rss",
+    "remove_hook",
+]
+
+
+class CallEvent(NamedTuple):
+    """Size and latency of one call of an instrumented function."""
+
+    function: str
+    """Name of the function, e.g. ``"reverse_stream"``."""
+    nbytes: int
+    """Number of bytes written by the call."""
+    seconds: float
+    """Wall time of the call."""
+
+
+Hook = Callable[[CallEvent], None]
+
+hooks: tuple[Hook, ...] = ()
+"""Registered hooks. Replaced as a whole on every change, so it can be iterated without a lock."""
+
+# Serializes the changes of hooks, which could otherwise lose a concurrent change
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook: Hook) -> None:
+    """Call ``hook`` with a ``CallEvent`` after every instrumented call.
+
+    Hooks run synchronously in the thread of the call (an executor thread for
+    the asyncio API) and should therefore return quickly. An exception raised
+    by a hook propagates to the caller of the instrumented function.
+    """
+    global hooks  # noqa: PLW0603
+    with _hooks_lock:
+        hooks = (*hooks, hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Remove a hook registered with ``add_hook``.
+
+    Raises:
+        ValueError: If the hook is not registered
+    """
+    global hooks  # noqa: PLW0603
+    with _hooks_lock:
+        try:
+            index = hooks.index(hook)
+        except ValueError:
+            msg = "Hook is not registered"
+            raise ValueError(msg) from None
+        hooks = hooks[:index] + hooks[index + 1 :]
+
+
+def emit(function: str, nbytes: int, start: float) -> None:
+    """Pass a call that started at ``time.perf_counter()`` value ``start`` to every hook."""
+    event = CallEvent(function, nbytes, time.perf_counter() - start)
+    for hook in hooks:
+        hook(event)
+
+
+PHASES = ("read", "transform", "write")
+"""Phases of a stream run, in the order they are reported."""
+
+
+@dataclass
+class Phase:
+    """Time spent in one phase of a run."""
+
+    nbytes: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+
+    def add(self, other: "Phase") -> None:
+        self.nbytes += other.nbytes
+        self.wall += other.wall
+        self.cpu += other.cpu
+
+
+class _TimedStream:
+    """Binary stream proxy that adds the time of every read or write to a phase."""
+
+    def __init__(self, stream: BinaryIO, phase: Phase, cpu_clock: Callable[[], float]) -> None:
+        self._stream = stream
+        self._phase = phase
+        self._cpu_clock = cpu_clock
+
+    def read(self, size: int = -1) -> bytes:
+        wall, cpu = time.perf_counter(), self._cpu_clock()
+        data = self._stream.read(size)
+        self._record(wall, cpu, len(data))
+        return data
+
+    def write(self, data: bytes) -> int:
+        wall, cpu = time.perf_counter(), self._cpu_clock()
+        written = self._stream.write(data)
+        self._record(wall, cpu, written)
+        return written
+
+    def flush(self) -> None:
+        wall, cpu = time.perf_counter(), self._cpu_clock()
+        self._stream.flush()
+        self._record(wall, cpu, 0)
+
+    def _record(self, wall: float, cpu: float, nbytes: int) -> None:
+        self._phase.wall += time.perf_counter() - wall
+        self._phase.cpu += self._cpu_clock() - cpu
+        self._phase.nbytes += nbytes
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+class StreamTimer:
+    """Wall and CPU time of reading, transforming and writing in one run.
+
+    The streams returned by ``reader`` and ``writer`` time their reads and
+    writes; the rest of the time spent inside ``run`` counts as transform.
+
+    Args:
+        cpu_clock: Clock of the CPU time, ``time.process_time`` by default.
+                   Use ``time.thread_time`` when several runs share the process
+                   at once; it misses the CPU time of native worker threads.
+    """
+
+    def __init__(self, cpu_clock: Callable[[], float] = time.process_time) -> None:
+        self.phases = {name: Phase() for name in PHASES}
+        self._cpu_clock = cpu_clock
+
+    def reader(self, source: BinaryIO) -> BinaryIO:
+        return cast("BinaryIO", _TimedStream(source, self.phases["read"], self._cpu_clock))
+
+    def writer(self, destination: BinaryIO) -> BinaryIO:
+        return cast("BinaryIO", _TimedStream(destination, self.phases["write"], self._cpu_clock))
+
+    @contextmanager
+    def run(self) -> Iterator[Phase]:
+        """Time a run; the caller sets ``nbytes`` of the yielded transform phase."""
+        transform = self.phases["transform"]
+        wall, cpu = time.perf_counter(), self._cpu_clock()
+        try:
+            yield transform
+        finally:
+            read, write = self.phases["read"], self.phases["write"]
+            transform.wall += time.perf_counter() - wall - read.wall - write.wall
+            transform.cpu += self._cpu_clock() - cpu - read.cpu - write.cpu
+
+
+def peak_rss() -> int | None:
+    """Maximum resident set size of the process in bytes, or None where it is unknown (Windows)."""
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        return None
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def _rate(nbytes: int, seconds: float) -> float | None:
+    return nbytes / seconds / 1e6 if seconds > 0 else None
+
+
+@dataclass
+class RunStats:
+    """Totals of a run over several files.
+
+    The phase times are summed over all files, so with files processed
+    concurrently they may add up to more than the wall time of the run.
+    """
+
+    files: int = 0
+    nbytes: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak_rss: int | None = None
+    phases: dict[str, Phase] = field(default_factory=lambda: {name: Phase() for name in PHASES})
+
+    def add(self, timer: StreamTimer) -> None:
+        """Add the phases of one file."""
+        self.files += 1
+        self.nbytes += timer.phases["transform"].nbytes
+        for name, phase in timer.phases.items():
+            self.phases[name].add(phase)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Statistics as a JSON-serializable dict; throughputs are in MB/s (10**6 bytes)."""
+        return {
+            "files": self.files,
+            "bytes": self.nbytes,
+            "wall_seconds": self.wall,
+            "cpu_seconds": self.cpu,
+            "throughput_mb_s": _rate(self.nbytes, self.wall),
+            "peak_rss_bytes": self.peak_rss,
+            "phases": {
+                name: {
+                    "bytes": phase.nbytes,
+                    "wall_seconds": phase.wall,
+                    "cpu_seconds": phase.cpu,
+                    "throughput_mb_s": _rate(phase.nbytes, phase.wall),
+                }
+                for name, phase in self.phases.items()
+            },
+        }
+
+    def format(self) -> str:
+        """Statistics as a human-readable table."""
+
+        def rate(nbytes: int, seconds: float) -> str:
+            value = _rate(nbytes, seconds)
+            return "-" if value is None else f"{value:.1f}"
+
+        rss = "-" if self.peak_rss is None else f"{self.peak_rss / 1e6:.1f} MB"
+        lines = [
+            (
+                f"{self.files} file(s), {self.nbytes} bytes in {self.wall:.3f} s "
+                f"({rate(self.nbytes, self.wall)} MB/s), CPU {self.cpu:.3f} s, peak RSS {rss}"
+            ),
+            f"{'phase':<10} {'bytes':>14} {'wall s':>10} {'cpu s':>10} {'MB/s':>10}",
+        ]
+        lines += [
+            f"{name:<10} {phase.nbytes:>14} {phase.wall:>10.3f} {phase.cpu:>10.3f} {rate(phase.nbytes, phase.wall):>10}"
+            for name, phase in self.phases.items()
+        ]
+        return "\n".join(lines)
@@ -0,0 +1,250 @@
+"""Pipelined reading and writing of compressed streams.
+
+``read_ahead`` and ``write_behind`` move the I/O of a stream, including the
+decompression and compression of gzip, bz2 and xz data, onto their own threads.
+They hand chunks over through bounded queues, so a transform such as
+``reverse_stream`` overlaps with both codecs:
+
+    decompress -> queue -> reverse -> queue -> compress
+
+zlib, bz2 and lzma release the GIL while they work, so the stages run in
+parallel. Memory use is bounded by ``depth`` chunks per queue, and nothing
+is written to temporary files.
+"""
+
+import queue
+import threading
+from collections.abc import Buffer, Iterator
+from contextlib import ExitStack, contextmanager, suppress
+from pathlib import Path
+from typing import BinaryIO, Literal, cast
+
+__all__ = [
+    "CODECS",
+    "DEFAULT_DEPTH",
+    "Codec",
+    "codec_for_path",
+    "open_codec",
+    "read_ahead",
+    "write_behind",
+]
+
+Codec = Literal["gzip", "bz2", "xz"]
+
+CODECS: tuple[Codec, ...] = ("gzip", "bz2", "xz")
+"""Supported compression formats."""
+
+_EXTENSIONS: dict[str, Codec] = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+DEFAULT_DEPTH = 4
+"""Default number of chunks each queue holds."""
+
+GZIP_LEVEL = 6
+"""Compression level of gzip output, the default of the gzip command (gzip.open uses 9)."""
+
+
+def codec_for_path(path: Path) -> Codec | None:
+    """The compression format of a file, from its extension (``.gz``, ``.bz2`` or ``.xz``)."""
+    return _EXTENSIONS.get(path.suffix.lower())
+
+
+def open_codec(stream: BinaryIO, codec: Codec, mode: Literal["rb", "wb"]) -> BinaryIO:
+    """Wrap a binary stream to decompress what is read from it or compress what is written to it.
+
+    Closing the returned stream finishes the compressed data but leaves ``stream`` open.
+    """
+    if codec == "gzip":
+        import gzip  # noqa: PLC0415
+
+        # An empty file name keeps names such as "<stdout>" out of the header
+        return cast("BinaryIO", gzip.GzipFile(filename="", mode=mode, fileobj=stream, compresslevel=GZIP_LEVEL))
+    if codec == "bz2":
+        import bz2  # noqa: PLC0415
+
+        return cast("BinaryIO", bz2.BZ2File(stream, mode))
+    if codec == "xz":
+        import lzma  # noqa: PLC0415
+
+        return cast("BinaryIO", lzma.LZMAFile(stream, mode))
+    raise ValueError(f"Unknown codec {codec!r}. Supported codecs are {', '.join(CODECS)}.")
+
+
+class _ReadAhead:
+    """Binary stream that returns the chunks read from ``source`` by a background thread."""
+
+    def __init__(self, source: BinaryIO, chunk_size: int, depth: int, *, compressed: bool) -> None:
+        self._source = source
+        self._compressed = compressed
+        self._chunk_size = chunk_size
+        # Chunks, then an exception or None at the end
+        self._queue: queue.Queue[bytes | Exception | None] = queue.Queue(depth)
+        self._stop = threading.Event()
+        self._buffer = b""
+        self._done = False
+        self._thread = threading.Thread(target=self._produce, name="revbits-read", daemon=True)
+        self._thread.start()
+
+    def _produce(self) -> None:
+        try:
+            while not self._stop.is_set():
+                chunk = self._source.read(self._chunk_size)
+                if not chunk:
+                    break
+                self._queue.put(chunk)
+        except (OSError, ValueError) as e:
+            self._queue.put(e)
+        except Exception as e:  # noqa: BLE001
+            if not self._compressed:
+                self._queue.put(e)
+                return
+            # zlib.error, lzma.LZMAError or EOFError (truncated data) of the codec
+            error = ValueError(f"Invalid compressed input: {e or type(e).__name__}")
+            error.__cause__ = e
+            self._queue.put(error)
+        else:
+            self._queue.put(None)
+
+    def _next_chunk(self) -> bytes:
+        item = self._queue.get()
+        if isinstance(item, Exception):
+            self._done = True
+            raise item
+        if item is None:
+            self._done = True
+            return b""
+        return item
+
+    def read(self, size: int | None = -1) -> bytes:
+        """Read ``size`` bytes, fewer only at the end of the stream, or everything if negative."""
+        limit = -1 if size is None else size
+        parts: list[bytes] = []
+        remaining = limit
+        while remaining != 0:
+            if not self._buffer:
+                if self._done:
+                    break
+                self._buffer = self._next_chunk()
+                continue
+            part = self._buffer if remaining < 0 else self._buffer[:remaining]
+            self._buffer = self._buffer[len(part) :]
+            parts.append(part)
+            if remaining > 0:
+                remaining -= len(part)
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        """Stop the background thread, discarding the chunks it has read."""
+        self._stop.set()
+        while self._thread.is_alive():
+            # Unblock a pending put; the thread checks _stop after each one
+            with suppress(queue.Empty):
+                self._queue.get(timeout=0.01)
+        self._thread.join()
+
+
+class _WriteBehind:
+    """Binary stream whose writes are passed to ``destination`` by a background thread."""
+
+    def __init__(self, destination: BinaryIO, depth: int) -> None:
+        self._destination = destination
+        self._queue: queue.Queue[bytes | None] = queue.Queue(depth)
+        self._error: Exception | None = None
+        self._thread = threading.Thread(target=self._consume, name="revbits-write", daemon=True)
+        self._thread.start()
+
+    def _consume(self) -> None:
+        while (chunk := self._queue.get()) is not None:
+            # After an error, chunks are discarded so that write() never blocks
+            if self._error is None:
+                try:
+                    self._destination.write(chunk)
+                except Exception as e:  # noqa: BLE001
+                    self._error = e
+            self._queue.task_done()
+        self._queue.task_done()
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def write(self, data: Buffer) -> int:
+        """Queue ``data``, waiting while the queue is full; errors of earlier writes are raised here."""
+        self._check()
+        chunk = bytes(data)
+        self._queue.put(chunk)
+        return len(chunk)
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def flush(self) -> None:
+        """Wait until every queued chunk is written, then flush ``destination``."""
+        self._queue.join()
+        self._check()
+        self._destination.flush()
+
+    def close(self) -> None:
+        """Write the queued chunks and stop the background thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+@contextmanager
+def read_ahead(
+    source: BinaryIO, chunk_size: int, codec: Codec | None = None, depth: int = DEFAULT_DEPTH
+) -> Iterator[BinaryIO]:
+    """Read ``source`` on a background thread, decompressing it with ``codec`` if given.
+
+    Args:
+        source: A readable binary stream, which is left open
+        chunk_size: Number of bytes the background thread reads at a time
+        codec: Compression format of ``source``, or None for uncompressed data
+        depth: Number of chunks read ahead of the consumer
+
+    Yields:
+        A non-seekable binary stream of the (decompressed) data. Exceptions of the
+        background thread are raised by its ``read`` method; corrupt or truncated
+        compressed data raises ValueError.
+    """
+    with ExitStack() as stack:
+        if codec is not None:
+            source = stack.enter_context(open_codec(source, codec, "rb"))
+        reader = _ReadAhead(source, chunk_size, depth, compressed=codec is not None)
+        stack.callback(reader.close)
+        yield cast("BinaryIO", reader)
+
+
+@contextmanager
+def write_behind(destination: BinaryIO, codec: Codec | None = None, depth: int = DEFAULT_DEPTH) -> Iterator[BinaryIO]:
+    """Write to ``destination`` on a background thread, compressing with ``codec`` if given.
+
+    The data is complete in ``destination`` when the context exits without an
+    exception; a write error of the background thread is raised by a later
+    ``write``, by ``flush`` or on exit.
+
+    Args:
+        destination: A writable binary stream, which is left open
+        codec: Compression format of the output, or None for uncompressed data
+        depth: Number of chunks queued before ``write`` waits
+
+    Yields:
+        A non-seekable binary stream
+    """
+    with ExitStack() as stack:
+        if codec is not None:
+            destination = stack.enter_context(open_codec(destination, codec, "wb"))
+        writer = _WriteBehind(destination, depth)
+        try:
+            yield cast("BinaryIO", writer)
+        finally:
+            writer.close()
+        writer.flush()
@@ -0,0 +1,129 @@
+"""Bit reversal of the data records of Intel HEX and Motorola S-record files.
+
+Only the payloads of data records (Intel HEX type 00, S-records S1, S2 and S3)
+are reversed. Addresses, all other records and the line endings are kept, and
+the checksum of every rewritten record is recomputed. The input is read in
+chunks that are cut after their last complete line; each piece is parsed and
+rewritten by a single ``reverse_record_text`` call. A line is never longer than
+``MAX_LINE_LENGTH`` bytes, so memory use is bounded by about one chunk whatever
+the size of the file, and a binary file given by mistake fails early instead of
+being buffered whole.
+"""
+
+import time
+from pathlib import Path
+from typing import BinaryIO, Literal
+
+from revbits import instrument
+from revbits._core import reverse_record_text
+from revbits.stream import DEFAULT_CHUNK_SIZE, validate_chunk_size
+
+__all__ = [
+    "FORMATS",
+    "MAX_LINE_LENGTH",
+    "RecordFormat",
+    "format_for_path",
+    "reverse_records",
+]
+
+RecordFormat = Literal["ihex", "srec"]
+
+FORMATS: tuple[RecordFormat, ...] = ("ihex", "srec")
+"""Supported record formats: Intel HEX and Motorola S-record."""
+
+MAX_LINE_LENGTH = 4096
+"""Longest accepted line in bytes, line ending included.
+
+The longest records, with 255 data bytes, have 521 characters; the rest of the
+limit leaves room for trailing whitespace.
+"""
+
+_EXTENSIONS: dict[str, RecordFormat] = {
+    ".hex": "ihex",
+    ".ihex": "ihex",
+    ".ihx": "ihex",
+    ".srec": "srec",
+    ".s19": "srec",
+    ".s28": "srec",
+    ".s37": "srec",
+    ".mot": "srec",
+}
+
+_COMPRESSED_EXTENSIONS = frozenset((".gz", ".bz2", ".xz"))
+
+
+def format_for_path(path: Path) -> RecordFormat | None:
+    """The record format of a file from its extension, None for binary files.
+
+    A compression extension is skipped, so ``image.hex.gz`` is an Intel HEX file.
+    """
+    suffixes = [suffix.lower() for suffix in path.suffixes]
+    if suffixes and suffixes[-1] in _COMPRESSED_EXTENSIONS:
+        suffixes.pop()
+    return _EXTENSIONS.get(suffixes[-1]) if suffixes else None
+
+
+def reverse_records(
+    source: BinaryIO,
+    destination: BinaryIO,
+    record_format: RecordFormat,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Reverse the bits of every data byte of an Intel HEX or S-record stream.
+
+    Every data record is written back with the same address, its payload bytes
+    bit-reversed, upper-case hex digits and a recomputed checksum. All other
+    lines, including the line endings, are copied unchanged, so the output has
+    the length of the input.
+
+    Args:
+        source: A readable binary stream of the records
+        destination: A writable binary stream
+        record_format: ``"ihex"`` or ``"srec"``
+        chunk_size: Number of bytes to read per chunk
+
+    Returns:
+        The number of bytes written to ``destination``
+
+    Raises:
+        ValueError: If chunk_size is smaller than MIN_CHUNK_SIZE, if the format
+                    is unknown, or if a record is malformed, has a wrong
+                    checksum or is longer than MAX_LINE_LENGTH; the message
+                    names the line. The lines before it may have been written
+                    already.
+    """
+    validate_chunk_size(chunk_size)
+    if record_format not in FORMATS:
+        raise ValueError(f"Unknown record format '{record_format}'. Supported formats are {', '.join(FORMATS)}.")
+    if not instrument.hooks:
+        return _reverse_records(source, destination, record_format, chunk_size)
+
+    start = time.perf_counter()
+    written = _reverse_records(source, destination, record_format, chunk_size)
+    instrument.emit("reverse_records", written, start)
+    return written
+
+
+def _reverse_records(source: BinaryIO, destination: BinaryIO, record_format: RecordFormat, chunk_size: int) -> int:
+    written = 0
+    line = 1
+    # The start of a line that continues in the next chunk
+    partial = bytearray()
+    while chunk := source.read(chunk_size):
+        end = chunk.rfind(b"\n") + 1
+        if end:
+            if partial:
+                partial += memoryview(chunk)[:end]
+                text = reverse_record_text(partial, record_format, first_line=line)
+            else:
+                text = reverse_record_text(memoryview(chunk)[:end], record_format, first_line=line)
+            written += destination.write(text)
+            line += chunk.count(b"\n", 0, end)
+            partial = bytearray(memoryview(chunk)[end:])
+        else:
+            partial += chunk
+        if len(partial) > MAX_LINE_LENGTH:
+            raise ValueError(f"Record in line {line} is too long (more than {MAX_LINE_LENGTH} bytes)")
+    if partial:
+        written += destination.write(reverse_record_text(partial, record_format, first_line=line))
+    return written
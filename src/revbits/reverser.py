@@ -3,110 +3,218 @@
 This module provides high-level Python functions that wrap the low-level
 Rust implementations, adding automatic type detection, validation, and
 convenient byte order handling.
+
+``reverse_byte`` and ``reverse_bytes`` are implemented natively in full
+(validation included), so each call crosses into Rust exactly once.
 """
 
-from typing import Literal
+import time
+from collections.abc import Buffer
+from typing import TYPE_CHECKING, Any, Literal
 
+from revbits import instrument
 from revbits._core import (
-    inverse_byte,
+    inverse_array,
+    inverse_bits,
     inverse_bytes,
-    inverse_dword,
-    inverse_qword,
-    inverse_word,
+    inverse_whole,
+    inverse_words,
+    reverse_byte,
+    reverse_bytes,
 )
 
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import NDArray
+
+__all__ = [
+    "MODES",
+    "BitWidth",
+    "Mode",
+    "check_mode",
+    "reverse_array",
+    "reverse_bits",
+    "reverse_buffer",
+    "reverse_byte",
+    "reverse_bytes",
+    "reverse_words",
+]
+
 BitWidth = Literal[8, 16, 32, 64]
+Mode = Literal["auto", "byte", "word", "whole"]
+
+MODES: tuple[Mode, ...] = ("auto", "byte", "word", "whole")
+"""Supported reversal modes of reverse_buffer."""
+
+
+def reverse_buffer(value: Buffer, mode: Mode, bit_width: BitWidth | None = None) -> bytes:
+    """Reverse the bits of a buffer in an explicitly chosen mode.
 
+    Unlike reverse_bytes without bit_width, the result never depends on the
+    length of the input, and every mode runs as a single native pass over
+    buffers of any length:
 
-def reverse_byte(value: int) -> int:
-    """Reverse the bits of a single byte (8 bits).
+    - ``"auto"``: the length-based selection of reverse_bytes
+    - ``"byte"``: the bits of every byte are reversed in place
+    - ``"word"``: the bits of every ``bit_width``-bit word are reversed; the
+      result is the same for little- and big-endian words
+    - ``"whole"``: the buffer is reversed as a single integer, i.e. the whole
+      bit sequence is mirrored
 
     Args:
-        value: An unsigned 8-bit integer (0-255)
+        value: Any C-contiguous buffer
+        mode: One of ``"auto"``, ``"byte"``, ``"word"`` or ``"whole"``
+        bit_width: Word size in bits (8, 16, 32, or 64); required for the
+                   ``"word"`` mode and passed to reverse_bytes for ``"auto"``
 
     Returns:
-        The bit-reversed value as an 8-bit integer
+        A new bytes object with the bits reversed
+
+    Raises:
+        ValueError: If mode is unknown, if bit_width is missing for ``"word"``
+                    or given for ``"byte"``/``"whole"``, or if the length is not
+                    a multiple of the word size
+
+    Examples:
+        >>> reverse_buffer(b'\\x01\\x02\\x03\\x04', "byte")
+        b'\\x80@\\xc0 '
+        >>> reverse_buffer(b'\\x01\\x02\\x03\\x04', "word", bit_width=16)
+        b'@\\x80 \\xc0'
+        >>> reverse_buffer(b'\\x01\\x02\\x03', "whole")
+        b'\\xc0@\\x80'
+    """
+    check_mode(mode, bit_width)
+    if not instrument.hooks:
+        return _reverse_buffer(value, mode, bit_width)
+
+    start = time.perf_counter()
+    result = _reverse_buffer(value, mode, bit_width)
+    instrument.emit("reverse_buffer", len(result), start)
+    return result
+
+
+def _reverse_buffer(value: Buffer, mode: Mode, bit_width: BitWidth | None) -> bytes:
+    if mode == "byte":
+        return inverse_bytes(value)
+    if mode == "whole":
+        return inverse_whole(value)
+    if mode == "word" and bit_width is not None:
+        return inverse_words(value, bit_width)
+    return reverse_bytes(value, bit_width)
+
+
+def check_mode(mode: str, bit_width: int | None) -> None:
+    """Validate a reversal mode and its bit_width.
 
     Raises:
-        ValueError: If value is not in the range 0-255
+        ValueError: If mode is unknown, or if bit_width is missing for ``"word"``
+                    or given for ``"byte"`` or ``"whole"``
     """
-    if not 0 <= value <= 0xFF:
-        raise ValueError(f"Value {value} is out of range for byte (0-255)")
-    return inverse_byte(value)
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}. Supported modes are {', '.join(MODES)}.")
+    if mode == "word" and bit_width is None:
+        msg = "Mode 'word' requires a bit_width"
+        raise ValueError(msg)
+    if mode in ("byte", "whole") and bit_width is not None:
+        raise ValueError(f"Mode {mode!r} does not take a bit_width")
 
 
-def reverse_bytes(value: bytes, bit_width: BitWidth | None = None) -> bytes:
-    """Reverse the bits of a bytes object.
+def reverse_bits(value: int, width: int) -> int:
+    """Reverse the lowest ``width`` bits of a non-negative integer.
 
-    This function automatically selects the appropriate reversal method based on
-    the length of the input bytes:
-    - 1 byte: uses inverse_byte (8-bit)
-    - 2 bytes: uses inverse_word (16-bit)
-    - 4 bytes: uses inverse_dword (32-bit)
-    - 8 bytes: uses inverse_qword (64-bit)
-    - Other lengths: uses inverse_bytes (per-byte reversal)
+    Any width is supported, from a few bits (reflected CRC polynomials, packed
+    protocol fields) to thousands of bits, so Python big ints can be reversed
+    as a whole. The reversal is done natively without a per-bit loop.
 
     Args:
-        value: A bytes object to reverse
-        bit_width: Optional bit width (8, 16, 32, or 64) to force a specific
-                   reversal method. If specified, the value length must match.
+        value: A non-negative integer below ``2**width``
+        width: Number of bits to reverse (at least 1)
 
     Returns:
-        A new bytes object with bits reversed
+        The bit-reversed value
 
     Raises:
-        ValueError: If the value length doesn't match the specified bit_width,
-                    or if bit_width is specified but not supported for the value length
+        ValueError: If width is 0, or if value is negative or does not fit in
+                    width bits
 
     Examples:
-        >>> reverse_bytes(b'\\x01')  # 1 byte -> uses inverse_byte
-        b'\\x80'
-        >>> reverse_bytes(b'\\x00\\x01')  # 2 bytes -> uses inverse_word
-        b'\\x80\\x00'
-        >>> reverse_bytes(b'\\x01', bit_width=8)  # Force 8-bit
-        b'\\x80'
+        >>> reverse_bits(0b00110, 5)
+        12
+        >>> reverse_bits(0x04C11DB7, 32) == 0xEDB88320
+        True
     """
-    value_len = len(value)
-
-    # If bit_width is specified, validate it matches the value length
-    if bit_width is not None:
-        expected_len = bit_width // 8
-        if value_len != expected_len:
-            raise ValueError(
-                f"Value length {value_len} bytes does not match specified "
-                f"bit_width {bit_width} (expected {expected_len} bytes)"
-            )
-
-    # Determine which function to use based on bit_width or value length
-    if bit_width == 8 or (bit_width is None and value_len == 1):
-        # 8-bit: single byte
-        return bytes([inverse_byte(value[0])])
-
-    if bit_width == 16 or (bit_width is None and value_len == 2):
-        # 16-bit: word
-        int_value = int.from_bytes(value, byteorder="little")
-        result = inverse_word(int_value)
-        return result.to_bytes(2, byteorder="little")
-
-    if bit_width == 32 or (bit_width is None and value_len == 4):
-        # 32-bit: dword
-        int_value = int.from_bytes(value, byteorder="little")
-        result = inverse_dword(int_value)
-        return result.to_bytes(4, byteorder="little")
-
-    if bit_width == 64 or (bit_width is None and value_len == 8):
-        # 64-bit: qword
-        int_value = int.from_bytes(value, byteorder="little")
-        result = inverse_qword(int_value)
-        return result.to_bytes(8, byteorder="little")
-
-    if bit_width is None:
-        # For any other length without bit_width specified: use inverse_bytes
-        # This reverses each byte individually
-        return inverse_bytes(value)
+    return inverse_bits(value, width)
+
+
+def reverse_words(value: Buffer, bit_width: BitWidth, *, threads: int | None = None) -> bytes:
+    """Reverse the bits of every word in a buffer of consecutive words.
+
+    All words are reversed in a single native call, which is much faster than
+    calling reverse_bytes once per word. Any buffer is accepted, e.g. raw sample
+    data in ``bytes`` or an ``array.array('I')``; the result keeps the same
+    layout. Because reversing all bits of a word also mirrors its bytes, the
+    result is the same whether the words are stored little- or big-endian.
 
-    # bit_width is specified but value length doesn't match any supported size
-    raise ValueError(
-        f"Unsupported combination: value length {value_len} bytes with "
-        f"bit_width {bit_width}. Supported bit widths are 8, 16, 32, 64."
-    )
+    Args:
+        value: A buffer holding consecutive words
+        bit_width: Word size in bits (8, 16, 32, or 64)
+        threads: Number of threads for buffers above the parallel threshold
+                 (0 for one per CPU, None for the default of set_num_threads)
+
+    Returns:
+        A new bytes object with the bits of every word reversed
+
+    Raises:
+        ValueError: If bit_width is not supported, or if the length of value is
+                    not a multiple of the word size
+
+    Examples:
+        >>> reverse_words(b'\\x01\\x00\\x02\\x00', bit_width=16)
+        b'\\x00\\x80\\x00@'
+    """
+    return inverse_words(value, bit_width, threads=threads)
+
+
+def reverse_array(
+    array: "NDArray[np.unsignedinteger[Any]]",
+    out: "NDArray[np.unsignedinteger[Any]] | None" = None,
+    *,
+    threads: int | None = None,
+) -> "NDArray[np.unsignedinteger[Any]]":
+    """Reverse the bits of every element of a NumPy unsigned integer array.
+
+    Each element is reversed at its native width: ``uint8``, ``uint16``,
+    ``uint32`` or ``uint64``. C-contiguous and strided arrays are processed in
+    place in memory, without converting them to bytes. NumPy is an optional
+    dependency (``pip install revbits[numpy]``).
+
+    Args:
+        array: An array of unsigned integers
+        out: Optional array of the same shape and dtype receiving the result.
+             Pass ``array`` itself to reverse it in place.
+        threads: Number of threads for large C-contiguous arrays, as for
+                 reverse_words
+
+    Returns:
+        The array holding the result (``out`` if it was given)
+
+    Raises:
+        ImportError: If out is not given and NumPy is not installed
+        TypeError: If the arrays do not hold unsigned integers
+        ValueError: If out does not match the shape and dtype of array, or if it
+                    overlaps array without being array itself
+
+    Examples:
+        >>> import numpy as np
+        >>> reverse_array(np.array([1, 2], dtype=np.uint16))
+        array([32768, 16384], dtype=uint16)
+    """
+    if out is None:
+        try:
+            import numpy as np  # noqa: PLC0415
+        except ImportError as e:
+            msg = "reverse_array requires NumPy: pip install revbits[numpy]"
+            raise ImportError(msg) from e
+        out = np.empty_like(array)
+    inverse_array(array, out, threads=threads)
+    return out
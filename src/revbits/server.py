@@ -0,0 +1,515 @@
+"""A local server that runs revbits jobs without starting an interpreter each time.
+
+``revbits serve`` listens on a Unix domain socket with the native module loaded
+and runs every connection as one job on a thread of its own. A job is the
+command line of a ``revbits`` run: ``revbits --server SOCKET ...`` sends its
+arguments and working directory instead of running them itself, and prints
+the error output and exit status of the server's run. Inputs and
+outputs named by path are read and written by the server; standard input and
+output (``-``) are sent over the socket as inline payloads and are held in
+memory. The client does not import the native module or the CLI, and runs
+the job locally if no server is listening.
+
+Since jobs read and write files with the permissions of the server, the socket
+is created with access for its user only, and connections of processes of
+other users are refused where the platform reports the peer of a socket.
+
+Every message is a JSON header line, followed by ``size`` bytes of payload:
+
+- client: ``{"version": 1, "argv": [...], "cwd": "..."}``
+- server, if the job reads standard input: ``{"stdin": true}``, answered by the
+  client with ``{"size": n}`` and the data
+- server: ``{"exit_code": 0, "stderr": "...", "size": n}`` and the output
+  written to standard output
+
+The server stops once no job has run for ``idle_timeout`` seconds.
+"""
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser, ArgumentTypeError
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple, NoReturn
+
+__all__ = [
+    "DEFAULT_IDLE_TIMEOUT",
+    "PROTOCOL_VERSION",
+    "JobServer",
+    "ProtocolError",
+    "Response",
+    "client_main",
+    "create_server",
+    "default_socket_path",
+    "forward",
+    "request",
+    "serve_main",
+]
+
+PROTOCOL_VERSION = 1
+"""Version of the messages; a server only runs jobs of clients of the same version."""
+
+DEFAULT_IDLE_TIMEOUT = 600.0
+"""Default number of seconds without jobs after which the server stops."""
+
+MAX_HEADER_SIZE = 1 << 20
+"""Largest accepted header line in bytes."""
+
+MAX_PAYLOAD_SIZE = 1 << 32
+"""Largest accepted payload in bytes; the standard input and output of a job are held in memory."""
+
+# Payloads are read in pieces of this size, so memory grows with the data received
+_READ_SIZE = 1 << 20
+
+# Options that the client handles itself instead of forwarding them
+_LOCAL_OPTIONS = frozenset(("-h", "--help", "--version"))
+
+
+class Response(NamedTuple):
+    """The result of a job run by the server."""
+
+    exit_code: int
+    """Exit status of the run: 0 on success, 1 if inputs failed, 2 for invalid arguments."""
+    stderr: str
+    """Error output of the run."""
+    stdout: bytes
+    """Data written to standard output."""
+
+
+class ProtocolError(Exception):
+    """A message that does not follow the protocol of the server."""
+
+
+def default_socket_path() -> Path:
+    """Socket path used by ``revbits serve`` without ``--socket``.
+
+    The path lies in ``$XDG_RUNTIME_DIR`` if set, else in a directory of the
+    user id in the temporary directory, which ``revbits serve`` creates with
+    access for the user only.
+    """
+    uid = os.getuid() if hasattr(os, "getuid") else None
+    if runtime_directory := os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(runtime_directory) / (f"revbits-{uid}.sock" if uid is not None else "revbits.sock")
+    return Path(tempfile.gettempdir()) / (f"revbits-{uid}" if uid is not None else "revbits") / "revbits.sock"
+
+
+def _make_private_directory(directory: Path) -> None:
+    """Create ``directory`` with access for the user only, or check that an existing one is private.
+
+    Raises:
+        PermissionError: If the directory belongs to another user, is a symbolic
+                         link, or other users may access it
+    """
+    directory.mkdir(mode=0o700, exist_ok=True)
+    status = directory.lstat()
+    owner = os.getuid() if hasattr(os, "getuid") else status.st_uid
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != owner or status.st_mode & 0o077:
+        msg = f"{directory} is not a directory that only the user can access"
+        raise PermissionError(msg)
+
+
+def _peer_uid(connection: socket.socket) -> int | None:
+    """The user id of the process at the other end of a Unix socket, None where the platform does not tell."""
+    if hasattr(socket, "SO_PEERCRED"):
+        # struct ucred: pid, uid, gid
+        credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("i2I"))
+        return int(struct.unpack("i2I", credentials)[1])
+    if hasattr(socket, "LOCAL_PEERCRED"):
+        # struct xucred of SOL_LOCAL (0): version, uid, group count and up to 16 groups
+        credentials = connection.getsockopt(0, socket.LOCAL_PEERCRED, struct.calcsize("2Ih16I"))
+        return int(struct.unpack_from("2I", credentials)[1])
+    return None
+
+
+def _send(file: io.BufferedIOBase, header: dict[str, Any], payload: bytes = b"") -> None:
+    file.write(json.dumps({**header, "size": len(payload)}).encode() + b"\n")
+    # The peer may close the connection as soon as it has the header of an empty payload
+    if payload:
+        file.write(payload)
+    file.flush()
+
+
+def _receive(file: io.BufferedIOBase) -> tuple[dict[str, Any], bytes]:
+    line = file.readline(MAX_HEADER_SIZE + 1)
+    if not line.endswith(b"\n"):
+        msg = "Connection closed or header too long"
+        raise ProtocolError(msg)
+    try:
+        header = json.loads(line)
+    except ValueError:
+        msg = "Header is not valid JSON"
+        raise ProtocolError(msg) from None
+    if not isinstance(header, dict):
+        msg = "Header is not a JSON object"
+        raise ProtocolError(msg)
+    size = header.get("size", 0)
+    if not isinstance(size, int) or isinstance(size, bool) or not 0 <= size <= MAX_PAYLOAD_SIZE:
+        msg = f"Payload size {size!r} is not a number of bytes up to {MAX_PAYLOAD_SIZE}"
+        raise ProtocolError(msg)
+    payload = file.read(size) if size <= _READ_SIZE else _read_payload(file, size)
+    if len(payload) != size:
+        msg = f"Connection closed after {len(payload)} of {size} payload bytes"
+        raise ProtocolError(msg)
+    return header, payload
+
+
+def _read_payload(file: io.BufferedIOBase, size: int) -> bytes:
+    pieces = []
+    remaining = size
+    while remaining and (piece := file.read(min(remaining, _READ_SIZE))):
+        pieces.append(piece)
+        remaining -= len(piece)
+    return b"".join(pieces)
+
+
+def _exchange(connection: socket.socket, argv: list[str], cwd: Path, read_stdin: Callable[[], bytes]) -> Response:
+    try:
+        with connection.makefile("rwb") as file:
+            _send(file, {"version": PROTOCOL_VERSION, "argv": argv, "cwd": str(cwd)})
+            header, payload = _receive(file)
+            if header.get("stdin"):
+                _send(file, {}, read_stdin())
+                header, payload = _receive(file)
+    except (BrokenPipeError, ConnectionResetError):
+        msg = "Connection closed by the server"
+        raise ProtocolError(msg) from None
+    return Response(header["exit_code"], header["stderr"], payload)
+
+
+def _connect(socket_path: Path) -> socket.socket:
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(str(socket_path))
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+
+def request(socket_path: Path, argv: list[str], *, cwd: Path | None = None, stdin: bytes = b"") -> Response:
+    """Run a job on the server listening on ``socket_path``.
+
+    Args:
+        socket_path: Socket of the server
+        argv: Arguments of the run, as for the ``revbits`` command
+        cwd: Directory relative paths of ``argv`` refer to (default: the current directory)
+        stdin: Data read by the job from standard input (``-``)
+
+    Returns:
+        The exit status, error output and standard output of the run
+
+    Raises:
+        OSError: If no server is listening on ``socket_path``
+        ProtocolError: If the connection is closed before the job finished
+    """
+    with _connect(socket_path) as connection:
+        return _exchange(connection, argv, cwd or Path.cwd(), lambda: stdin)
+
+
+def forward(socket_path: Path, argv: list[str]) -> bool:
+    """Run a command line on the server with the standard streams of this process.
+
+    The error output and standard output of the job are written to those of
+    this process, and it exits with the status of the job if that is not 0.
+
+    A connection closed before the job finished, e.g. by a server that refuses
+    the user, is reported on the error output and exits with status 1.
+
+    Returns:
+        False if no server is listening on ``socket_path``, True once the job succeeded
+    """
+    try:
+        connection = _connect(socket_path)
+    except OSError:
+        return False
+    with connection:
+        try:
+            response = _exchange(connection, argv, Path.cwd(), sys.stdin.buffer.read)
+        except ProtocolError as e:
+            sys.stderr.write(f"revbits: error: {e}\n")
+            sys.exit(1)
+    sys.stderr.write(response.stderr)
+    sys.stdout.buffer.write(response.stdout)
+    sys.stdout.buffer.flush()
+    if response.exit_code:
+        sys.exit(response.exit_code)
+    return True
+
+
+def _server_option(argv: list[str]) -> Path | None:
+    """The value of ``--server`` in a command line, found without parsing it."""
+    for i, argument in enumerate(argv):
+        if argument == "--":
+            break
+        if argument == "--server" and i + 1 < len(argv):
+            return Path(argv[i + 1])
+        if argument.startswith("--server="):
+            return Path(argument.removeprefix("--server="))
+    return None
+
+
+def client_main(argv: list[str]) -> None:
+    """Run ``revbits --server SOCKET ...`` without loading the CLI if the server runs the job.
+
+    Help, the version and jobs for which no server is listening run locally.
+    """
+    server = _server_option(argv)
+    if server is not None and _LOCAL_OPTIONS.isdisjoint(argv) and forward(server, argv):
+        return
+    from revbits.cli import main  # noqa: PLC0415
+
+    main(argv)
+
+
+class _JobArgumentParser(ArgumentParser):
+    """Parser of the arguments of a job, whose errors are returned to the client instead of exiting."""
+
+    def error(self, message: str) -> NoReturn:
+        raise ValueError(message)
+
+    def exit(self, status: int = 0, message: str | None = None) -> NoReturn:  # noqa: ARG002
+        # --help and --version, which the client runs itself
+        raise ValueError(message or "--help and --version are not run by the server")
+
+
+def _job(header: dict[str, Any]) -> tuple[list[str], Path]:
+    """The arguments and the working directory of a job."""
+    argv, cwd = header.get("argv"), header.get("cwd")
+    if not isinstance(argv, list) or not all(isinstance(argument, str) for argument in argv):
+        msg = "The arguments of the job are not a list of strings"
+        raise ProtocolError(msg)
+    if not isinstance(cwd, str):
+        msg = "The working directory of the job is not a string"
+        raise ProtocolError(msg)
+    return argv, Path(cwd)
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    server: "JobServer"
+
+    def handle(self) -> None:
+        from revbits.cli import console  # noqa: PLC0415
+
+        try:
+            try:
+                header, _ = _receive(self.rfile)
+                argv, cwd = _job(header)
+                exit_code, stderr, stdout = self._run(header.get("version"), argv, cwd)
+            except ProtocolError:
+                raise
+            except Exception as e:  # noqa: BLE001
+                # Whatever fails, the client gets an exit status instead of a closed connection
+                console.error(f"Job failed: {e!r}")
+                exit_code, stderr, stdout = 1, f"ERROR: The server failed to run the job: {e!r}\n", b""
+            _send(self.wfile, {"exit_code": exit_code, "stderr": stderr}, stdout)
+        except (OSError, ProtocolError) as e:
+            console.warning(f"Job dropped: {e}")
+
+    def _run(self, version: object, argv: list[str], cwd: Path) -> tuple[int, str, bytes]:
+        """Run a job and return its exit status, error output and standard output.
+
+        The options ``--threads`` and ``-v`` of the job are ignored; those of the
+        server apply.
+        """
+        from revbits.cli import (  # noqa: PLC0415
+            STDIO_PATH,
+            CliArgs,
+            _build_parser,
+            check_args,
+            failure_report,
+            run,
+            stats_report,
+        )
+
+        parser = _build_parser(_JobArgumentParser)
+        if version != PROTOCOL_VERSION:
+            msg = f"The server runs version {PROTOCOL_VERSION} of the protocol, the client version {version}"
+            return 2, f"{parser.prog}: error: {msg}\n", b""
+        try:
+            args = parser.parse_args(argv, namespace=CliArgs())
+            # Relative paths refer to the working directory of the client
+            args.files = [path if path == STDIO_PATH else cwd / path for path in args.files]
+            if args.output is not None and args.output != STDIO_PATH:
+                args.output = cwd / args.output
+            check_args(args)
+        except ValueError as e:
+            return 2, f"{parser.format_usage()}{parser.prog}: error: {e}\n", b""
+
+        if STDIO_PATH in args.files:
+            _send(self.wfile, {"stdin": True})
+            _, data = _receive(self.rfile)
+            args.stdin = io.BytesIO(data)
+        args.stdout = io.BytesIO()
+        failures, total, stats = run(args)
+        stderr = f"{stats_report(args, stats)}\n" if stats is not None else ""
+        if failures:
+            stderr += "".join(f"ERROR: {line}\n" for line in failure_report(failures, total))
+        return int(bool(failures)), stderr, args.stdout.getvalue()
+
+
+class JobServer(socketserver.ThreadingUnixStreamServer):
+    """Server running every connection as a job on a thread of its own.
+
+    ``serve_until_idle`` handles connections until no job has been running for
+    ``idle_timeout`` seconds (never if None).
+    """
+
+    daemon_threads = False
+
+    def __init__(self, socket_path: Path, idle_timeout: float | None = DEFAULT_IDLE_TIMEOUT) -> None:
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._active = 0
+        self._last_job = time.monotonic()
+        self._bound = False
+        super().__init__(str(socket_path), _JobHandler)
+
+    def server_bind(self) -> None:
+        # Jobs read and write files with the permissions of the server, so the
+        # socket is created with access for the user only instead of changed
+        # after; the umask is shared by all threads, but no job runs yet
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        self._bound = True
+
+    def server_close(self) -> None:
+        super().server_close()
+        # A socket that could not be bound may belong to another server
+        if self._bound:
+            self.socket_path.unlink(missing_ok=True)
+
+    def verify_request(self, request: Any, client_address: Any) -> bool:  # noqa: ARG002
+        # Counted here, since every connection is passed to shutdown_request, refused or not
+        with self._lock:
+            self._active += 1
+        uid = _peer_uid(request)
+        if uid is None or not hasattr(os, "getuid") or uid == os.getuid():
+            return True
+        from revbits.cli import console  # noqa: PLC0415
+
+        console.warning(f"Connection of user {uid} refused")
+        return False
+
+    def shutdown_request(self, request: Any) -> None:
+        super().shutdown_request(request)
+        with self._lock:
+            self._active -= 1
+            self._last_job = time.monotonic()
+
+    def serve_until_idle(self, poll_interval: float = 0.5) -> None:
+        """Handle connections until ``shutdown`` is called or no job has run for ``idle_timeout`` seconds."""
+        done = threading.Event()
+        if self.idle_timeout is not None:
+            watchdog = threading.Thread(
+                target=self._shut_down_when_idle, args=(self.idle_timeout, done), name="revbits-idle", daemon=True
+            )
+            watchdog.start()
+        try:
+            self.serve_forever(poll_interval)
+        finally:
+            done.set()
+
+    def _shut_down_when_idle(self, idle_timeout: float, done: threading.Event) -> None:
+        while True:
+            with self._lock:
+                remaining = None if self._active else idle_timeout - (time.monotonic() - self._last_job)
+            if remaining is not None and remaining <= 0:
+                self.shutdown()
+                return
+            # While jobs run, check again after a full timeout at the latest
+            if done.wait(idle_timeout if remaining is None else remaining):
+                return
+
+
+def create_server(socket_path: Path, idle_timeout: float | None = DEFAULT_IDLE_TIMEOUT) -> JobServer:
+    """Create a server listening on ``socket_path`` and load the native module.
+
+    A socket file left behind by a server that no longer runs is replaced.
+
+    Raises:
+        FileExistsError: If a server is listening on ``socket_path`` already, or
+                         the path exists and is not a socket
+    """
+    # Load the CLI and the native module before the first job
+    from revbits import cli  # noqa: F401, PLC0415
+
+    if socket_path.exists() or socket_path.is_symlink():
+        if not stat.S_ISSOCK(socket_path.lstat().st_mode):
+            msg = f"{socket_path} exists and is not a socket"
+            raise FileExistsError(msg)
+        try:
+            _connect(socket_path).close()
+        except ConnectionRefusedError:
+            socket_path.unlink()
+        else:
+            msg = f"A server is listening on {socket_path} already"
+            raise FileExistsError(msg)
+    return JobServer(socket_path, idle_timeout)
+
+
+def _parse_timeout(text: str) -> float | None:
+    try:
+        seconds = float(text)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid number of seconds: {text!r}") from None
+    return seconds if seconds > 0 else None
+
+
+def serve_main(argv: list[str]) -> None:
+    """Run ``revbits serve``."""
+    from revbits._core import set_num_threads  # noqa: PLC0415
+    from revbits.cli import console, parse_threads  # noqa: PLC0415
+
+    parser = ArgumentParser(prog="revbits serve", description="Run revbits jobs sent by 'revbits --server SOCKET'")
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=default_socket_path(),
+        help=f"Path of the Unix socket to listen on (default: {default_socket_path()})",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=_parse_timeout,
+        default=DEFAULT_IDLE_TIMEOUT,
+        metavar="SECONDS",
+        help=(
+            f"Stop after this many seconds without jobs, 0 to run until interrupted (default: {DEFAULT_IDLE_TIMEOUT:g})"
+        ),
+    )
+    parser.add_argument(
+        "--threads",
+        type=parse_threads,
+        default=None,
+        help="Number of threads for chunks of at least 8M in every job, 0 for one per CPU (default: 0)",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every job to stderr")
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        console.enable_verbose()
+    if args.threads is not None:
+        set_num_threads(args.threads)
+    try:
+        if args.socket == default_socket_path():
+            _make_private_directory(args.socket.parent)
+        server = create_server(args.socket, args.idle_timeout)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+    console.info(f"Listening on {args.socket}")
+    with server, contextlib.suppress(KeyboardInterrupt):
+        server.serve_until_idle()
+    console.info("Server stopped")
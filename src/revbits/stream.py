@@ -0,0 +1,423 @@
+"""Chunked streaming bit reversal for binary file objects.
+
+This module processes input in fixed-size chunks so that memory usage stays
+bounded regardless of the input size, which makes it suitable for very large
+files and for shell pipelines (stdin/stdout). Files modified in place are
+memory-mapped and transformed without intermediate copies. The same applies
+to the transform chains of ``TransformChain``.
+"""
+
+import itertools
+import mmap
+import os
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO
+
+from revbits import instrument
+from revbits._core import Reverser, TransformChain, inverse_bytes, inverse_bytes_inplace, inverse_whole, inverse_words
+from revbits.reverser import BitWidth, Mode, check_mode, reverse_bytes
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+"""Default number of bytes read per chunk (1 MiB)."""
+
+MIN_CHUNK_SIZE = 8
+"""Smallest accepted chunk size.
+
+Inputs of exactly 2, 4 or 8 bytes are reversed as a single word by
+``reverse_bytes``; a chunk must be able to hold such an input whole.
+"""
+
+INCOMPLETE_SUFFIX = ".revbits-incomplete"
+"""Suffix of the marker file that exists while a file is reversed in place."""
+
+Range = tuple[int, int | None]
+"""A region of a file as ``(offset, length)``; a length of None extends to the end of the file."""
+
+
+def validate_chunk_size(chunk_size: int) -> None:
+    """Validate the chunk size of a streaming function.
+
+    Raises:
+        ValueError: If chunk_size is smaller than MIN_CHUNK_SIZE
+    """
+    if chunk_size < MIN_CHUNK_SIZE:
+        raise ValueError(f"Chunk size {chunk_size} is too small (minimum {MIN_CHUNK_SIZE} bytes)")
+
+
+def check_word_multiple(length: int, bit_width: int | None) -> None:
+    """Validate that an input of ``length`` bytes holds whole words of ``bit_width`` bits.
+
+    Raises:
+        ValueError: If length is not a multiple of the word size
+    """
+    size = bit_width // 8 if bit_width else 1
+    if length % size:
+        raise ValueError(f"Input length {length} bytes is not a multiple of bit_width {bit_width} ({size} bytes)")
+
+
+def reverse_stream(
+    source: BinaryIO,
+    destination: BinaryIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mode: Mode = "auto",
+    bit_width: BitWidth | None = None,
+) -> int:
+    """Reverse the bits of the data read from ``source`` into ``destination``.
+
+    The result is identical to
+    ``destination.write(reverse_buffer(source.read(), mode, bit_width))``, but at
+    most two chunks are held in memory at any time:
+
+    - ``"auto"`` without bit_width: inputs that fit in a single chunk go through
+      ``reverse_bytes`` so that 2, 4 and 8 byte inputs keep their whole-word
+      reversal; larger inputs are reversed byte by byte
+    - ``"byte"``, ``"word"`` (or ``"auto"`` with bit_width): every chunk is
+      reversed byte by byte or word by word, independent of the input length
+    - ``"whole"``: seekable sources are read backwards one chunk at a time; other
+      sources are read into memory completely
+
+    Args:
+        source: A readable binary stream
+        destination: A writable binary stream
+        chunk_size: Number of bytes to read per chunk
+        mode: Reversal mode, as for ``reverse_buffer``
+        bit_width: Word size in bits for the ``"word"`` mode
+
+    Returns:
+        The number of bytes written to ``destination``
+
+    Raises:
+        ValueError: If chunk_size is smaller than MIN_CHUNK_SIZE, if mode and
+                    bit_width are invalid, or if the input is not a whole number
+                    of words
+    """
+    validate_chunk_size(chunk_size)
+    check_mode(mode, bit_width)
+    if not instrument.hooks:
+        return _reverse_stream(source, destination, chunk_size, mode, bit_width)
+
+    start = time.perf_counter()
+    written = _reverse_stream(source, destination, chunk_size, mode, bit_width)
+    instrument.emit("reverse_stream", written, start)
+    return written
+
+
+def _reverse_stream(
+    source: BinaryIO, destination: BinaryIO, chunk_size: int, mode: Mode, bit_width: BitWidth | None
+) -> int:
+    if mode == "whole":
+        return _reverse_stream_whole(source, destination, chunk_size)
+    if mode == "auto" and bit_width is None:
+        return _reverse_stream_auto(source, destination, chunk_size)
+    return _reverse_stream_words(source, destination, chunk_size, bit_width)
+
+
+def _reverse_stream_auto(source: BinaryIO, destination: BinaryIO, chunk_size: int) -> int:
+    chunk = source.read(chunk_size)
+    if not chunk:
+        return 0
+
+    # Look one chunk ahead: if the input ends here it is reversed as a whole.
+    next_chunk = source.read(chunk_size)
+    if not next_chunk:
+        return destination.write(reverse_bytes(chunk))
+
+    written = destination.write(inverse_bytes(chunk))
+    chunk = next_chunk
+    while chunk:
+        written += destination.write(inverse_bytes(chunk))
+        chunk = source.read(chunk_size)
+    return written
+
+
+def _reverse_stream_words(source: BinaryIO, destination: BinaryIO, chunk_size: int, bit_width: BitWidth | None) -> int:
+    # Short reads may end in the middle of a word; the Reverser carries it to the next chunk
+    reverser = Reverser("word", bit_width) if bit_width else Reverser("byte")
+    written = 0
+    while chunk := source.read(chunk_size):
+        written += destination.write(reverser.update(chunk))
+    return written + destination.write(reverser.finalize())
+
+
+def _reverse_stream_whole(source: BinaryIO, destination: BinaryIO, chunk_size: int) -> int:
+    if not source.seekable():
+        return destination.write(inverse_whole(source.read()))
+
+    start = source.tell()
+    position = source.seek(0, os.SEEK_END)
+    written = 0
+    while position > start:
+        length = min(chunk_size, position - start)
+        position -= length
+        source.seek(position)
+        written += destination.write(inverse_whole(source.read(length)))
+    return written
+
+
+def _incomplete_marker(path: Path) -> Path:
+    return path.with_name(path.name + INCOMPLETE_SUFFIX)
+
+
+def reverse_file_in_place(
+    path: Path,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mode: Mode = "auto",
+    bit_width: BitWidth | None = None,
+    *,
+    ranges: Iterable[Range] | None = None,
+) -> int:
+    """Reverse the bits of a file, or of regions of it, in place through a memory map.
+
+    The mapped pages are transformed directly by the native kernel, one window
+    of ``chunk_size`` bytes (rounded up to whole pages) at a time, and each
+    window is flushed to disk once it has been reversed. In the ``"whole"`` mode
+    windows from both ends of the file are swapped and the file is flushed once
+    at the end. A marker file named ``<file>.revbits-incomplete`` exists for the
+    duration of the operation, so a run interrupted by a crash leaves visible
+    evidence that the file is only partially reversed.
+
+    With ``ranges`` only the pages of the given regions are mapped, so the rest
+    of the file is neither read nor written. Each region is transformed as if
+    it were a file of its own: ``"whole"`` mirrors the region, and ``"auto"``
+    reverses regions of 2, 4 or 8 bytes as one word.
+
+    Args:
+        path: Path of the file to modify
+        chunk_size: Number of bytes transformed and flushed at a time
+        mode: Reversal mode, as for ``reverse_buffer``
+        bit_width: Word size in bits for the ``"word"`` mode
+        ranges: ``(offset, length)`` pairs of the regions to reverse, where a
+                length of None extends to the end of the file; the whole file
+                if None
+
+    Returns:
+        The number of bytes rewritten
+
+    Raises:
+        ValueError: If chunk_size is smaller than MIN_CHUNK_SIZE, if mode and
+                    bit_width are invalid, if the file or a region is not a
+                    whole number of words, or if regions overlap or extend
+                    beyond the end of the file
+        FileExistsError: If the marker of an interrupted earlier run exists
+    """
+    validate_chunk_size(chunk_size)
+    check_mode(mode, bit_width)
+    if not instrument.hooks:
+        return _reverse_file_in_place(path, chunk_size, mode, bit_width, ranges)
+
+    start = time.perf_counter()
+    size = _reverse_file_in_place(path, chunk_size, mode, bit_width, ranges)
+    instrument.emit("reverse_file_in_place", size, start)
+    return size
+
+
+def format_range(offset: int, length: int | None) -> str:
+    """Format a region in the ``OFFSET:LENGTH`` syntax of the ``--range`` option."""
+    return f"{offset}:{'' if length is None else length}"
+
+
+def _resolve_ranges(ranges: Iterable[Range], size: int) -> list[tuple[int, int]]:
+    """Resolve ``ranges`` against a file of ``size`` bytes into sorted ``(offset, length)`` pairs."""
+    resolved: list[tuple[int, int]] = []
+    for offset, length in ranges:
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError(f"Invalid range {format_range(offset, length)}: offset and length must not be negative")
+        stop = size if length is None else offset + length
+        if max(offset, stop) > size:
+            raise ValueError(f"Range {format_range(offset, length)} exceeds the file size of {size} bytes")
+        resolved.append((offset, stop - offset))
+    resolved.sort()
+    for first, second in itertools.pairwise(resolved):
+        if sum(first) > second[0]:
+            raise ValueError(f"Ranges {format_range(*first)} and {format_range(*second)} overlap")
+    return [(offset, length) for offset, length in resolved if length]
+
+
+def _reverse_file_in_place(
+    path: Path, chunk_size: int, mode: Mode, bit_width: BitWidth | None, ranges: Iterable[Range] | None
+) -> int:
+    with path.open("r+b") as file:
+        size = os.fstat(file.fileno()).st_size
+        regions = _resolve_ranges([(0, None)] if ranges is None else ranges, size)
+        if not regions:
+            return 0
+        for _, length in regions:
+            check_word_multiple(length, bit_width)
+
+        with _marked_incomplete(path):
+            window = _window_size(chunk_size)
+            for offset, length in regions:
+                _reverse_region(file.fileno(), offset, length, window, mode, bit_width)
+            os.fsync(file.fileno())
+    return sum(length for _, length in regions)
+
+
+@contextmanager
+def _marked_incomplete(path: Path) -> Iterator[None]:
+    """Keep the marker of an in-place operation on ``path`` while the context runs.
+
+    The marker is left behind if the context raises.
+    """
+    marker = _incomplete_marker(path)
+    try:
+        marker.touch(exist_ok=False)
+    except FileExistsError:
+        raise FileExistsError(
+            f"{marker} exists: a previous in-place reversal of {path} was interrupted "
+            "and the file may be partially reversed"
+        ) from None
+    yield
+    marker.unlink()
+
+
+def _window_size(chunk_size: int) -> int:
+    """``chunk_size`` rounded up to whole pages."""
+    return -(-chunk_size // mmap.PAGESIZE) * mmap.PAGESIZE
+
+
+def _reverse_region(  # noqa: PLR0913, PLR0917
+    fileno: int, offset: int, length: int, window: int, mode: Mode, bit_width: BitWidth | None
+) -> None:
+    # Maps must start at a multiple of the allocation granularity
+    start = offset - offset % mmap.ALLOCATIONGRANULARITY
+    first, end = offset - start, offset + length - start
+    with mmap.mmap(fileno, end, offset=start) as mapped:
+        if mode == "auto" and bit_width is None and length <= MIN_CHUNK_SIZE:
+            # Small inputs keep the whole-word reversal of reverse_bytes
+            mapped[first:end] = reverse_bytes(mapped[first:end])
+        elif mode == "whole":
+            with memoryview(mapped) as view, view[first:end] as region:
+                _reverse_whole_in_place(region, window)
+        else:
+            with memoryview(mapped) as view:
+                for position in range(first, end, window):
+                    stop = min(position + window, end)
+                    with view[position:stop] as data:
+                        if bit_width:
+                            inverse_words(data, bit_width, out=data)
+                        else:
+                            inverse_bytes_inplace(data)
+                    # flush() takes whole pages
+                    page = position - position % mmap.PAGESIZE
+                    mapped.flush(page, stop - page)
+        mapped.flush()
+
+
+def _reverse_whole_in_place(view: memoryview, window: int) -> None:
+    # Swap reversed windows from both ends, then reverse what is left in the middle
+    size = len(view)
+    offset = 0
+    while 2 * (offset + window) <= size:
+        with view[offset : offset + window] as front, view[size - offset - window : size - offset] as back:
+            reversed_front = inverse_whole(front)
+            inverse_whole(back, out=front)
+            back[:] = reversed_front
+        offset += window
+    with view[offset : size - offset] as middle:
+        inverse_whole(middle, out=middle)
+
+
+def _check_block_multiple(length: int, chain: TransformChain) -> None:
+    if length % chain.block_size:
+        raise ValueError(
+            f"Input length {length} bytes is not a multiple of the block size of the chain ({chain.block_size} bytes)"
+        )
+
+
+def transform_stream(
+    source: BinaryIO, destination: BinaryIO, chain: TransformChain, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """Apply a transform chain to the data read from ``source`` into ``destination``.
+
+    The result is identical to ``destination.write(chain.apply(source.read()))``,
+    with one chunk in memory at a time. Each chunk is transformed in a single
+    native pass; the XOR keys of the chain continue where the previous chunk
+    stopped, and short reads that end in the middle of a block are carried over.
+
+    Args:
+        source: A readable binary stream
+        destination: A writable binary stream
+        chain: The operations to apply
+        chunk_size: Number of bytes to read per chunk
+
+    Returns:
+        The number of bytes written to ``destination``
+
+    Raises:
+        ValueError: If chunk_size is smaller than MIN_CHUNK_SIZE or if the input
+                    is not a whole number of blocks of the chain
+    """
+    validate_chunk_size(chunk_size)
+    if not instrument.hooks:
+        return _transform_stream(source, destination, chain, chunk_size)
+
+    start = time.perf_counter()
+    written = _transform_stream(source, destination, chain, chunk_size)
+    instrument.emit("transform_stream", written, start)
+    return written
+
+
+def _transform_stream(source: BinaryIO, destination: BinaryIO, chain: TransformChain, chunk_size: int) -> int:
+    offset = 0
+    partial = b""
+    while chunk := source.read(chunk_size):
+        data = partial + chunk if partial else chunk
+        complete = len(data) - len(data) % chain.block_size
+        partial = data[complete:]
+        if complete:
+            with memoryview(data) as view, view[:complete] as blocks:
+                destination.write(chain.apply(blocks, offset=offset))
+            offset += complete
+    _check_block_multiple(offset + len(partial), chain)
+    return offset
+
+
+def transform_file_in_place(path: Path, chain: TransformChain, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Apply a transform chain to a file in place through a memory map.
+
+    Like ``reverse_file_in_place``, the mapped pages are transformed one window
+    of ``chunk_size`` bytes at a time, each window is flushed once it is done,
+    and a ``<file>.revbits-incomplete`` marker exists during the operation.
+
+    Args:
+        path: Path of the file to modify
+        chain: The operations to apply
+        chunk_size: Number of bytes transformed and flushed at a time
+
+    Returns:
+        The number of bytes rewritten
+
+    Raises:
+        ValueError: If chunk_size is smaller than MIN_CHUNK_SIZE or if the file is
+                    not a whole number of blocks of the chain
+        FileExistsError: If the marker of an interrupted earlier run exists
+    """
+    validate_chunk_size(chunk_size)
+    if not instrument.hooks:
+        return _transform_file_in_place(path, chain, chunk_size)
+
+    start = time.perf_counter()
+    size = _transform_file_in_place(path, chain, chunk_size)
+    instrument.emit("transform_file_in_place", size, start)
+    return size
+
+
+def _transform_file_in_place(path: Path, chain: TransformChain, chunk_size: int) -> int:
+    with path.open("r+b") as file:
+        size = os.fstat(file.fileno()).st_size
+        _check_block_multiple(size, chain)
+        if size == 0:
+            return 0
+        window = _window_size(chunk_size)
+        with _marked_incomplete(path), mmap.mmap(file.fileno(), size) as mapped, memoryview(mapped) as view:
+            for position in range(0, size, window):
+                stop = min(position + window, size)
+                with view[position:stop] as data:
+                    chain.apply(data, out=data, offset=position)
+                mapped.flush(position, stop - position)
+            mapped.flush()
+            os.fsync(file.fileno())
+    return size
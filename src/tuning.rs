@@ -0,0 +1,248 @@
+//! Selection of the kernel of each size class, calibrated once per CPU.
+//!
+//! The first reversal of a process picks the kernels from, in order:
+//!
+//! 1. `REVBITS_KERNEL`: the name of a kernel used for every size
+//! 2. `REVBITS_AUTOTUNE=0`: the kernel detected from the CPU features
+//! 3. The calibration cached for this CPU and version in `cache_path()`
+//! 4. The kernel detected from the CPU features, until the first reversal of
+//!    a medium or large buffer runs a new calibration and adds it to the cache
+//!
+//! A calibration times every available kernel at one buffer size per class and
+//! takes well under a second. Deferring it keeps short runs that only reverse
+//! small buffers from paying for it, or from writing the cache. The cache is a
+//! text file with one line per CPU, so a home directory shared by different
+//! hosts holds one entry for each.
+
+use std::env;
+use std::fs;
+use std::hint::black_box;
+use std::io;
+use std::path::PathBuf;
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::time::Instant;
+
+use crate::kernels::{self, Kernel, SIZE_CLASSES, Selection};
+
+/// Buffer size timed for each size class.
+const CALIBRATION_SIZES: [usize; SIZE_CLASSES.len()] = [64, 8 << 10, 1 << 20];
+
+/// Number of bytes reversed per timed round; small buffers are reversed repeatedly.
+const CALIBRATION_BYTES: usize = 256 << 10;
+
+/// Number of timed rounds per kernel, size and width; the fastest one counts.
+const CALIBRATION_ROUNDS: usize = 3;
+
+const CACHE_FILE: &str = "kernels.tsv";
+
+const CACHE_HEADER: &str = "# revbits kernel calibration: cpu\tsmall\tmedium\tlarge";
+
+/// The selection to start a process with, and whether it is still to be calibrated.
+pub(crate) fn initial_selection() -> (Selection, bool) {
+    if let Some(kernel) = env::var("REVBITS_KERNEL")
+        .ok()
+        .and_then(|name| Kernel::from_name(&name))
+        .filter(|kernel| kernel.is_supported())
+    {
+        return ([kernel; SIZE_CLASSES.len()], false);
+    }
+    if env::var_os("REVBITS_AUTOTUNE").is_some_and(|value| value == "0") {
+        return ([Kernel::detect(); SIZE_CLASSES.len()], false);
+    }
+    match load() {
+        Some(selection) => (selection, false),
+        None => ([Kernel::detect(); SIZE_CLASSES.len()], true),
+    }
+}
+
+/// Calibrate the kernels and add the result to the cache.
+pub(crate) fn calibrate_and_save() -> Selection {
+    let selection = calibrate();
+    // Without a writable cache every process calibrates, which is slower but correct
+    let _ = save(selection);
+    selection
+}
+
+/// Time every available kernel and return the fastest one for each size class.
+pub(crate) fn calibrate() -> Selection {
+    let kernels = kernels::available();
+    let largest = CALIBRATION_SIZES[SIZE_CLASSES.len() - 1];
+    let src: Vec<u8> = (0..largest as u32)
+        .map(|i| (i.wrapping_mul(2_654_435_761) >> 13) as u8)
+        .collect();
+    let mut dst = vec![0u8; largest];
+    CALIBRATION_SIZES.map(|size| {
+        kernels
+            .iter()
+            .map(|&kernel| (seconds(kernel, &src[..size], &mut dst[..size]), kernel))
+            .min_by(|a, b| a.0.total_cmp(&b.0))
+            .map_or(Kernel::Portable, |(_, kernel)| kernel)
+    })
+}
+
+/// Time `kernel` on `src`, summed over all word widths.
+fn seconds(kernel: Kernel, src: &[u8], dst: &mut [u8]) -> f64 {
+    let function = kernel.function();
+    let repeat = (CALIBRATION_BYTES / src.len()).max(1);
+    [1, 2, 4, 8]
+        .into_iter()
+        .map(|width| {
+            (0..CALIBRATION_ROUNDS)
+                .map(|_| {
+                    let start = Instant::now();
+                    for _ in 0..repeat {
+                        // SAFETY: `src` and `dst` are separate slices of the same
+                        // length, which is a multiple of every width.
+                        unsafe { function(black_box(src.as_ptr()), black_box(dst.as_mut_ptr()), src.len(), width) }
+                    }
+                    start.elapsed().as_secs_f64()
+                })
+                .fold(f64::INFINITY, f64::min)
+        })
+        .sum()
+}
+
+/// The identity of the running CPU and build that a calibration is valid for.
+fn cpu_key() -> String {
+    let names: Vec<&str> = kernels::available().iter().map(|kernel| kernel.name()).collect();
+    let key = format!(
+        "{} {} {} {}",
+        option_env!("CARGO_PKG_VERSION").unwrap_or("dev"),
+        env::consts::ARCH,
+        names.join(","),
+        cpu_brand()
+    );
+    key.replace('\t', " ").trim().to_owned()
+}
+
+/// The processor brand string, such as "AMD EPYC 7R13 Processor".
+#[cfg(target_arch = "x86_64")]
+fn cpu_brand() -> String {
+    use std::arch::x86_64::__cpuid;
+
+    #[allow(unused_unsafe)]
+    // SAFETY: `cpuid` is available on every x86_64 CPU; leaves above the maximum
+    // extended leaf are not queried.
+    let bytes: Vec<u8> = unsafe {
+        if __cpuid(0x8000_0000).eax < 0x8000_0004 {
+            return String::new();
+        }
+        (0x8000_0002..=0x8000_0004)
+            .flat_map(|leaf| {
+                let r = __cpuid(leaf);
+                [r.eax, r.ebx, r.ecx, r.edx].map(u32::to_le_bytes)
+            })
+            .flatten()
+            .collect()
+    };
+    String::from_utf8_lossy(&bytes).trim_matches(['\0', ' ']).to_owned()
+}
+
+#[cfg(not(target_arch = "x86_64"))]
+fn cpu_brand() -> String {
+    String::new()
+}
+
+/// The cache file: in `REVBITS_CACHE_DIR` if set (no cache if empty), else in the
+/// user cache directory of the platform.
+pub(crate) fn cache_path() -> Option<PathBuf> {
+    let dir = match env::var_os("REVBITS_CACHE_DIR") {
+        Some(dir) if dir.is_empty() => return None,
+        Some(dir) => PathBuf::from(dir),
+        None => user_cache_dir()?.join("revbits"),
+    };
+    Some(dir.join(CACHE_FILE))
+}
+
+fn user_cache_dir() -> Option<PathBuf> {
+    let home = || env::var_os("HOME").filter(|home| !home.is_empty()).map(PathBuf::from);
+    if cfg!(windows) {
+        env::var_os("LOCALAPPDATA").map(PathBuf::from)
+    } else if cfg!(target_os = "macos") {
+        Some(home()?.join("Library").join("Caches"))
+    } else {
+        env::var_os("XDG_CACHE_HOME")
+            .filter(|dir| !dir.is_empty())
+            .map(PathBuf::from)
+            .or_else(|| Some(home()?.join(".cache")))
+    }
+}
+
+fn parse_line(line: &str) -> Option<(&str, Selection)> {
+    let mut fields = line.split('\t');
+    let key = fields.next()?;
+    let mut selection = [Kernel::Portable; SIZE_CLASSES.len()];
+    for slot in &mut selection {
+        *slot = Kernel::from_name(fields.next()?).filter(|kernel| kernel.is_supported())?;
+    }
+    fields.next().is_none().then_some((key, selection))
+}
+
+/// The cached calibration of the running CPU, if any.
+fn load() -> Option<Selection> {
+    let text = fs::read_to_string(cache_path()?).ok()?;
+    let key = cpu_key();
+    text.lines()
+        .filter_map(parse_line)
+        .find_map(|(line_key, selection)| (line_key == key).then_some(selection))
+}
+
+/// Store `selection` as the calibration of the running CPU, keeping the entries of other CPUs.
+pub(crate) fn save(selection: Selection) -> io::Result<()> {
+    let path = cache_path().ok_or_else(|| io::Error::new(io::ErrorKind::NotFound, "no cache directory"))?;
+    let key = cpu_key();
+    let existing = fs::read_to_string(&path).unwrap_or_default();
+    let mut lines = vec![CACHE_HEADER.to_owned()];
+    lines.extend(
+        existing
+            .lines()
+            .filter(|line| parse_line(line).is_some_and(|(line_key, _)| line_key != key))
+            .map(str::to_owned),
+    );
+    let names: Vec<&str> = selection.iter().map(|kernel| kernel.name()).collect();
+    lines.push(format!("{key}\t{}", names.join("\t")));
+
+    if let Some(dir) = path.parent() {
+        fs::create_dir_all(dir)?;
+    }
+    // Replace the file atomically, so concurrent processes never read half of it;
+    // the name is unique per call, as threads of one process may save at once
+    static SAVES: AtomicUsize = AtomicUsize::new(0);
+    let temporary = path.with_extension(format!(
+        "{}.{}.tmp",
+        std::process::id(),
+        SAVES.fetch_add(1, Ordering::Relaxed)
+    ));
+    fs::write(&temporary, lines.join("\n") + "\n")?;
+    fs::rename(&temporary, &path).inspect_err(|_| {
+        let _ = fs::remove_file(&temporary);
+    })
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn calibration_picks_available_kernels() {
+        let available = kernels::available();
+        for kernel in calibrate() {
+            assert!(available.contains(&kernel), "{kernel:?}");
+        }
+    }
+
+    #[test]
+    fn cache_lines() {
+        let key = cpu_key();
+        assert!(!key.contains('\t'));
+        let line = format!("{key}\tlut8\tportable\tlut16");
+        assert_eq!(
+            parse_line(&line),
+            Some((key.as_str(), [Kernel::Lut8, Kernel::Portable, Kernel::Lut16]))
+        );
+        assert_eq!(parse_line(CACHE_HEADER), None);
+        assert_eq!(parse_line(&format!("{key}\tlut8\tportable")), None);
+        assert_eq!(parse_line(&format!("{key}\tlut8\tportable\tunknown")), None);
+        assert_eq!(parse_line(&format!("{key}\tlut8\tportable\tlut16\tlut8")), None);
+    }
+}
@@ -0,0 +1,25 @@
+"""Test configuration shared by all test modules."""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_CACHE_DIR = pytest.StashKey[str]()
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Keep the kernel calibration cache of the tests out of the home directory of the user.
+
+    The variable is set before the tests are collected, so neither the native
+    module nor the interpreters started by the tests write the cache of the user.
+    """
+    config.stash[_CACHE_DIR] = tempfile.mkdtemp(prefix="revbits-tests-")
+    os.environ["REVBITS_CACHE_DIR"] = config.stash[_CACHE_DIR]
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    """Remove the calibration cache of the tests."""
+    if _CACHE_DIR in config.stash:
+        shutil.rmtree(config.stash[_CACHE_DIR], ignore_errors=True)
@@ -0,0 +1,161 @@
+"""Tests for the asyncio API."""
+
+import asyncio
+import gc
+import socket
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from revbits.aio import INLINE_LIMIT, areverse_file, areverse_file_in_place, areverse_stream, default_executor
+from revbits.reverser import BitWidth, Mode, reverse_buffer
+
+
+async def _transfer(data: bytes, **kwargs: object) -> tuple[int, bytes]:
+    """Feed ``data`` through ``areverse_stream`` into a socket and read the other end."""
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+
+    left, right = socket.socketpair()
+    peer_reader, peer_writer = await asyncio.open_connection(sock=left)
+    _, writer = await asyncio.open_connection(sock=right)
+    received = asyncio.create_task(peer_reader.read())
+    try:
+        written = await areverse_stream(reader, writer, **kwargs)  # type: ignore[arg-type]
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    data = await received
+    peer_writer.close()
+    await peer_writer.wait_closed()
+    return written, data
+
+
+class TestAreverseStream:
+    """Tests for the asyncio stream transformer."""
+
+    @pytest.mark.parametrize(
+        ("mode", "bit_width"), [("auto", None), ("auto", 32), ("byte", None), ("word", 16), ("whole", None)]
+    )
+    @pytest.mark.parametrize("size", [0, 4, 8, 100, INLINE_LIMIT * 3 + 8])
+    def test_matches_reverse_buffer(self, mode: Mode, bit_width: BitWidth | None, size: int) -> None:
+        """Test every mode with inputs reversed inline and on the executor."""
+        data = bytes(i * 37 % 256 for i in range(size))
+        written, received = asyncio.run(_transfer(data, chunk_size=INLINE_LIMIT, mode=mode, bit_width=bit_width))
+        assert received == reverse_buffer(data, mode, bit_width)
+        assert written == size
+
+    def test_custom_executor(self) -> None:
+        """Test that a caller-provided executor is used for large chunks."""
+        data = bytes(INLINE_LIMIT * 2)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="custom") as executor:
+            _, received = asyncio.run(_transfer(data, chunk_size=INLINE_LIMIT, executor=executor))
+        assert received == reverse_buffer(data, "byte")
+
+    def test_partial_word(self) -> None:
+        """Test error when the input ends in the middle of a word."""
+        with pytest.raises(ValueError, match="not a multiple of bit_width"):
+            asyncio.run(_transfer(b"\x01\x02\x03", mode="word", bit_width=16))
+
+    def test_partial_word_after_failed_job(self) -> None:
+        """Test that a job still pending when the input ends in a partial word is not left unretrieved."""
+
+        def fail() -> bytes:
+            msg = "job failed"
+            raise RuntimeError(msg)
+
+        class FailingExecutor(ThreadPoolExecutor):
+            def submit(self, _fn: object, /, *_args: object, **_kwargs: object) -> "Future[bytes]":
+                return super().submit(fail)
+
+        async def scenario() -> list[str]:
+            errors: list[str] = []
+            asyncio.get_running_loop().set_exception_handler(lambda _, context: errors.append(context["message"]))
+            with FailingExecutor(max_workers=1) as executor, pytest.raises(ValueError, match="not a multiple"):
+                await _transfer(
+                    bytes(INLINE_LIMIT + 1), chunk_size=INLINE_LIMIT, mode="word", bit_width=16, executor=executor
+                )
+            gc.collect()
+            return errors
+
+        assert "Future exception was never retrieved" not in asyncio.run(scenario())
+
+    def test_invalid_chunk_size(self) -> None:
+        """Test error for a too small chunk size."""
+        with pytest.raises(ValueError, match="too small"):
+            asyncio.run(_transfer(b"\x01", chunk_size=1))
+
+    def test_loop_stays_responsive(self) -> None:
+        """Test that other tasks run while large chunks are reversed."""
+
+        async def scenario() -> int:
+            ticks = 0
+
+            async def ticker() -> None:
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+
+            task = asyncio.create_task(ticker())
+            await _transfer(bytes(INLINE_LIMIT * 16), chunk_size=INLINE_LIMIT)
+            task.cancel()
+            return ticks
+
+        assert asyncio.run(scenario()) > 1
+
+
+class TestAreverseFile:
+    """Tests for the asyncio file functions."""
+
+    def test_file(self, tmp_path: Path) -> None:
+        """Test reversing a file into a new file."""
+        source = tmp_path / "input.bin"
+        destination = tmp_path / "output.bin"
+        source.write_bytes(bytes(range(256)) * 10)
+
+        assert asyncio.run(areverse_file(source, destination, chunk_size=1024)) == 2560
+        assert destination.read_bytes() == reverse_buffer(source.read_bytes(), "byte")
+
+    def test_file_whole(self, tmp_path: Path) -> None:
+        """Test the whole mode."""
+        source = tmp_path / "input.bin"
+        destination = tmp_path / "output.bin"
+        source.write_bytes(bytes(range(100)))
+
+        asyncio.run(areverse_file(str(source), str(destination), chunk_size=16, mode="whole"))
+        assert destination.read_bytes() == reverse_buffer(bytes(range(100)), "whole")
+
+    def test_in_place(self, tmp_path: Path) -> None:
+        """Test reversing a file in place."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(bytes(range(256)))
+
+        assert asyncio.run(areverse_file_in_place(path)) == 256
+        assert path.read_bytes() == reverse_buffer(bytes(range(256)), "byte")
+
+    def test_invalid_mode(self, tmp_path: Path) -> None:
+        """Test that arguments are checked before anything is submitted."""
+        with pytest.raises(ValueError, match="requires a bit_width"):
+            asyncio.run(areverse_file(tmp_path / "missing", tmp_path / "output.bin", mode="word"))
+        assert not (tmp_path / "output.bin").exists()
+
+    def test_concurrent(self, tmp_path: Path) -> None:
+        """Test many transfers running at the same time on the shared executor."""
+        sources = []
+        for index in range(8):
+            source = tmp_path / f"input{index}.bin"
+            source.write_bytes(bytes([index]) * 4096)
+            sources.append(source)
+
+        async def scenario() -> list[int]:
+            return await asyncio.gather(
+                *(areverse_file(source, source.with_suffix(".out"), chunk_size=1024) for source in sources)
+            )
+
+        assert asyncio.run(scenario()) == [4096] * 8
+        for source in sources:
+            assert source.with_suffix(".out").read_bytes() == reverse_buffer(source.read_bytes(), "byte")
+        assert default_executor() is default_executor()
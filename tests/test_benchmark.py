@@ -0,0 +1,133 @@
+"""Tests for the benchmark suite."""
+
+from pathlib import Path
+
+import pytest
+
+from revbits.benchmark import (
+    Report,
+    Result,
+    _reverse_byte_py,
+    _reverse_bytes_py,
+    bench_cli,
+    bench_latency,
+    bench_scaling,
+    bench_throughput,
+    compare,
+    format_table,
+    main,
+    sample_data,
+    throughput_sizes,
+    worker_counts,
+)
+from revbits.reverser import reverse_byte, reverse_bytes
+
+
+def _report(**seconds: float) -> Report:
+    return Report([Result(name, "test", value) for name, value in seconds.items()])
+
+
+class TestBenchmarks:
+    """Tests for the individual benchmarks."""
+
+    @pytest.fixture(autouse=True)
+    def _short_runs(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr("revbits.benchmark.MIN_RUN_TIME", 0.001)
+
+    def test_sample_data_reproducible(self) -> None:
+        """Test that the input is deterministic and has the requested size."""
+        assert sample_data(3 << 20) == sample_data(3 << 20)
+        assert len(sample_data((1 << 20) + 5)) == (1 << 20) + 5
+        assert sample_data(0) == b""
+
+    def test_throughput_sizes(self) -> None:
+        """Test sizes from 1 byte up to and including the maximum."""
+        assert throughput_sizes(4096) == [1, 16, 256, 4096]
+        assert throughput_sizes(1000) == [1, 16, 256, 1000]
+
+    def test_latency(self) -> None:
+        """Test that every width is measured."""
+        names = [result.name for result in bench_latency(repeat=1)]
+        assert names[:2] == ["reverse_byte", "reverse_byte_py"]
+        assert names[2:] == [f"reverse_bytes{suffix}[{width}]" for width in (8, 16, 32, 64) for suffix in ("", "_py")]
+
+    @pytest.mark.parametrize("value", [b"\x01", b"\x01\x02", b"\x01\x02\x03", b"\x01\x02\x03\x04", bytes(range(8))])
+    def test_python_reference_matches(self, value: bytes) -> None:
+        """Test that the pure-Python reference computes the same result as the native dispatch."""
+        assert _reverse_bytes_py(value) == reverse_bytes(value)
+        assert _reverse_byte_py(value[0]) == reverse_byte(value[0])
+
+    def test_throughput(self) -> None:
+        """Test throughput and peak memory of inverse_bytes."""
+        results = bench_throughput(4096, repeat=1)
+        assert [result.nbytes for result in results] == [1, 16, 256, 4096]
+        assert all(result.seconds > 0 and result.throughput > 0 for result in results)
+        assert results[-1].peak_bytes >= 4096
+
+    def test_cli(self) -> None:
+        """Test the end-to-end CLI benchmark."""
+        results = bench_cli(4096, repeat=1)
+        assert [result.name for result in results] == ["cli[stream]", "cli[in-place]"]
+        assert all(result.seconds > 0 for result in results)
+
+    def test_worker_counts(self) -> None:
+        """Test powers of two up to and including the maximum."""
+        assert worker_counts(1) == [1]
+        assert worker_counts(8) == [1, 2, 4, 8]
+        assert worker_counts(6) == [1, 2, 4, 6]
+
+    def test_scaling(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that every size is measured with every number of workers."""
+        monkeypatch.setattr("revbits.benchmark.SCALING_SIZES", (64, 4096))
+        monkeypatch.setattr("revbits.benchmark.SCALING_CALLS", 2)
+        results = bench_scaling(2, repeat=1)
+        assert [result.name for result in results] == [
+            "scaling[64]x1",
+            "scaling[64]x2",
+            "scaling[4096]x1",
+            "scaling[4096]x2",
+        ]
+        assert [result.nbytes for result in results] == [128, 256, 8192, 16384]
+        assert all(result.seconds > 0 for result in results)
+
+
+class TestCompare:
+    """Tests for the regression check."""
+
+    def test_json_round_trip(self) -> None:
+        """Test that a report survives serialization."""
+        report = _report(a=1.0, b=2.0)
+        report.environment = {"python": "3.12"}
+        assert Report.from_json(report.to_json()) == report
+
+    def test_no_regression(self) -> None:
+        """Test that slowdowns within the threshold pass."""
+        assert compare(_report(a=1.05, b=0.5), _report(a=1.0, b=1.0), threshold=0.10) == []
+
+    def test_regression(self) -> None:
+        """Test that slowdowns beyond the threshold are reported."""
+        regressions = compare(_report(a=1.2, b=1.0), _report(a=1.0, b=1.0), threshold=0.10)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("a:")
+
+    def test_new_benchmark_ignored(self) -> None:
+        """Test that benchmarks missing from the baseline are not regressions."""
+        assert compare(_report(new=5.0), _report(old=1.0), threshold=0.10) == []
+
+    def test_format_table(self) -> None:
+        """Test the human-readable summary."""
+        table = format_table(Report([Result("inverse_bytes[1024]", "throughput", 1e-6, 1024, 2048)]))
+        assert "inverse_bytes[1024]" in table
+        assert "MiB/s" in table
+
+    def test_main_exits_on_regression(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that main exits with status 1 when the baseline is faster."""
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(_report(a=1.0).to_json())
+        monkeypatch.setattr("revbits.benchmark.run", lambda _args: _report(a=2.0))
+
+        with pytest.raises(SystemExit) as excinfo:
+            main(["--baseline", str(baseline), "--json", str(tmp_path / "current.json")])
+
+        assert excinfo.value.code == 1
+        assert Report.from_json((tmp_path / "current.json").read_text()) == _report(a=2.0)
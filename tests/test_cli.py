@@ -1,10 +1,23 @@
 """Tests for CLI functionality."""
 
+import bz2
+import gzip
+import io
+import json
+import lzma
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
-from revbits.cli import main, parse_args
+from revbits._core import TransformChain, inverse_bytes, inverse_whole, inverse_words
+from revbits.cli import console, file_ranges, main, parse_args
+
+
+@pytest.fixture(autouse=True)
+def _quiet_console(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Undo the verbose output enabled by earlier tests, whose captured stderr is closed."""
+    monkeypatch.setattr(console, "_loguru", None)
 
 
 class TestCLI:
@@ -14,7 +27,7 @@ class TestCLI:
         """Test basic argument parsing."""
         monkeypatch.setattr("sys.argv", ["revbits", "input.bin"])
         args = parse_args()
-        assert args.file == Path("input.bin")
+        assert args.files == [Path("input.bin")]
         assert args.output is None
         assert not args.in_place
         assert not args.verbose
@@ -23,7 +36,7 @@ class TestCLI:
         """Test with output file specified."""
         monkeypatch.setattr("sys.argv", ["revbits", "input.bin", "-o", "output.bin"])
         args = parse_args()
-        assert args.file == Path("input.bin")
+        assert args.files == [Path("input.bin")]
         assert args.output == Path("output.bin")
         assert not args.in_place
 
@@ -31,7 +44,7 @@ class TestCLI:
         """Test in-place modification flag."""
         monkeypatch.setattr("sys.argv", ["revbits", "input.bin", "-i"])
         args = parse_args()
-        assert args.file == Path("input.bin")
+        assert args.files == [Path("input.bin")]
         assert args.output is None
         assert args.in_place
 
@@ -60,6 +73,74 @@ class TestCLI:
         args = parse_args()
         assert args.in_place
 
+    @pytest.mark.parametrize(
+        ("size", "expected"),
+        [("4096", 4096), ("64K", 65536), ("64k", 65536), ("1M", 1 << 20), ("2G", 2 << 30), ("16KB", 16384)],
+    )
+    def test_parse_args_chunk_size(self, monkeypatch: pytest.MonkeyPatch, size: str, expected: int) -> None:
+        """Test chunk size option with and without suffixes."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", "--chunk-size", size])
+        args = parse_args()
+        assert args.chunk_size == expected
+
+    @pytest.mark.parametrize("size", ["", "abc", "1X", "4"])
+    def test_parse_args_chunk_size_invalid(self, monkeypatch: pytest.MonkeyPatch, size: str) -> None:
+        """Test that malformed or too small chunk sizes are rejected."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", "--chunk-size", size])
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    def test_parse_args_threads(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test thread count option."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", "--threads", "4"])
+        args = parse_args()
+        assert args.threads == 4
+
+    @pytest.mark.parametrize("threads", ["-1", "two"])
+    def test_parse_args_threads_invalid(self, monkeypatch: pytest.MonkeyPatch, threads: str) -> None:
+        """Test that negative or malformed thread counts are rejected."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", "--threads", threads])
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    def test_parse_args_mode(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test mode and bit width options."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", "--mode", "word", "--bit-width", "32"])
+        args = parse_args()
+        assert args.mode == "word"
+        assert args.bit_width == 32
+
+    @pytest.mark.parametrize(
+        "options", [["--mode", "word"], ["--mode", "whole", "--bit-width", "16"], ["--bit-width", "24"]]
+    )
+    def test_parse_args_mode_invalid(self, monkeypatch: pytest.MonkeyPatch, options: list[str]) -> None:
+        """Test that inconsistent mode and bit width options are rejected."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", *options])
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    def test_parse_args_stdin(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test '-' as the input path."""
+        monkeypatch.setattr("sys.argv", ["revbits", "-", "-o", "-"])
+        args = parse_args()
+        assert args.files == [Path("-")]
+        assert args.output == Path("-")
+
+    def test_parse_args_batch(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test several inputs with recursion and a worker pool."""
+        monkeypatch.setattr("sys.argv", ["revbits", "a.bin", "dir", "-r", "-j", "4", "-o", "out"])
+        args = parse_args()
+        assert args.files == [Path("a.bin"), Path("dir")]
+        assert args.recursive
+        assert args.jobs == 4
+
+    @pytest.mark.parametrize("argv", [["a.bin", "-"], ["a.bin", "b.bin", "-o", "-"], ["a.bin", "-j", "-1"]])
+    def test_parse_args_batch_invalid(self, monkeypatch: pytest.MonkeyPatch, argv: list[str]) -> None:
+        """Test that stdin and stdout cannot be used with several files."""
+        monkeypatch.setattr("sys.argv", ["revbits", *argv])
+        with pytest.raises(SystemExit):
+            parse_args()
+
 
 class TestCLIMain:
     """Tests for main function."""
@@ -135,3 +216,667 @@ class TestCLIMain:
 
         with pytest.raises(SystemExit):
             main()
+
+    def test_main_chunked(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test main function with input spanning several chunks."""
+        input_file = tmp_path / "input.bin"
+        output_file = tmp_path / "output.bin"
+        input_file.write_bytes(b"\x01\x02\x03" * 100)
+
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-o", str(output_file), "--chunk-size", "64"])
+
+        main()
+
+        assert output_file.read_bytes() == b"\x80\x40\xc0" * 100
+
+    def test_main_in_place_chunked(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test in-place modification with input spanning several chunks."""
+        input_file = tmp_path / "data.bin"
+        input_file.write_bytes(b"\x0f" * 100)
+
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-i", "--chunk-size", "16"])
+
+        main()
+
+        assert input_file.read_bytes() == b"\xf0" * 100
+
+    def test_main_threads(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that --threads sets the default thread count."""
+        input_file = tmp_path / "input.bin"
+        output_file = tmp_path / "output.bin"
+        input_file.write_bytes(b"\x01\x02\x03")
+        calls: list[int] = []
+        monkeypatch.setattr("revbits.cli.set_num_threads", calls.append)
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-o", str(output_file), "--threads", "2"])
+
+        main()
+
+        assert calls == [2]
+        assert output_file.read_bytes() == b"\x80\x40\xc0"
+
+    @pytest.mark.parametrize(
+        ("options", "expected"),
+        [
+            (["--mode", "byte"], b"\x80\x00\x00\x00"),
+            (["--mode", "auto"], b"\x00\x00\x00\x80"),
+            (["--mode", "word", "--bit-width", "16"], b"\x00\x80\x00\x00"),
+            (["--mode", "whole"], b"\x00\x00\x00\x80"),
+        ],
+    )
+    def test_main_mode(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, options: list[str], expected: bytes
+    ) -> None:
+        """Test that the mode option selects the transformation."""
+        input_file = tmp_path / "input.bin"
+        output_file = tmp_path / "output.bin"
+        input_file.write_bytes(b"\x01\x00\x00\x00")
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-o", str(output_file), *options])
+
+        main()
+
+        assert output_file.read_bytes() == expected
+
+    def test_main_mode_partial_word(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an input with a partial word exits with an error."""
+        input_file = tmp_path / "data.bin"
+        input_file.write_bytes(b"\x01\x02\x03")
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-i", "--mode", "word", "--bit-width", "16"])
+
+        with pytest.raises(SystemExit):
+            main()
+
+        assert input_file.read_bytes() == b"\x01\x02\x03"
+
+    def test_main_output_same_as_input(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that naming the input file as output behaves like in-place."""
+        input_file = tmp_path / "data.bin"
+        input_file.write_bytes(b"\x01\x02\x03")
+
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-o", str(input_file)])
+
+        main()
+
+        assert input_file.read_bytes() == b"\x80\x40\xc0"
+
+    def test_main_stdin_stdout(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        capsysbinary: pytest.CaptureFixture[bytes],
+    ) -> None:
+        """Test reading from stdin and writing to stdout."""
+        monkeypatch.setattr("sys.stdin", SimpleNamespace(buffer=io.BytesIO(b"\x01\x02\x03")))
+        monkeypatch.setattr("sys.argv", ["revbits", "-"])
+
+        main()
+
+        assert capsysbinary.readouterr().out == b"\x80\x40\xc0"
+
+    def test_main_stdin_to_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test reading from stdin and writing to a file."""
+        output_file = tmp_path / "output.bin"
+        monkeypatch.setattr("sys.stdin", SimpleNamespace(buffer=io.BytesIO(b"\x01\x00")))
+        monkeypatch.setattr("sys.argv", ["revbits", "-", "-o", str(output_file)])
+
+        main()
+
+        assert output_file.read_bytes() == b"\x00\x80"
+
+    def test_main_stdin_in_place(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that stdin cannot be modified in place."""
+        monkeypatch.setattr("sys.argv", ["revbits", "-", "-i"])
+
+        with pytest.raises(SystemExit):
+            main()
+
+
+class TestCLIRanges:
+    """Tests for reversing regions of files."""
+
+    DATA = bytes(range(256)) * 64
+
+    @pytest.mark.parametrize(
+        ("options", "expected"),
+        [
+            ([], None),
+            (["--offset", "0x200"], [(512, None)]),
+            (["--length", "1K"], [(0, 1024)]),
+            (["--offset", "16", "--length", "32"], [(16, 32)]),
+            (["--range", "16:32", "--range", "1K:"], [(16, 32), (1024, None)]),
+        ],
+    )
+    def test_parse_args(
+        self, monkeypatch: pytest.MonkeyPatch, options: list[str], expected: list[tuple[int, int | None]] | None
+    ) -> None:
+        """Test the region options."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", *options])
+        assert file_ranges(parse_args()) == expected
+
+    @pytest.mark.parametrize(
+        "options",
+        [["--range", "16"], ["--range", "x:4"], ["--offset", "-1"], ["--offset", "4", "-o", "-"]],
+    )
+    def test_parse_args_invalid(self, monkeypatch: pytest.MonkeyPatch, options: list[str]) -> None:
+        """Test malformed regions and regions of standard output."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", *options])
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    def test_stdin(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that regions of standard input are rejected."""
+        monkeypatch.setattr("sys.argv", ["revbits", "-", "--range", "0:4"])
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    def test_in_place(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that only the regions of the file change."""
+        input_file = tmp_path / "image.bin"
+        input_file.write_bytes(self.DATA)
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-i", "--range", "0x10:8", "--range", "1000:"])
+
+        main()
+
+        expected = (
+            # The auto mode reverses an 8-byte region as one word
+            self.DATA[:16]
+            + inverse_whole(self.DATA[16:24])
+            + self.DATA[24:1000]
+            + inverse_bytes(self.DATA[1000:])
+        )
+        assert input_file.read_bytes() == expected
+
+    def test_output_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the output is a copy of the input with the region reversed."""
+        input_file = tmp_path / "image.bin"
+        input_file.write_bytes(self.DATA)
+        monkeypatch.setattr(
+            "sys.argv", ["revbits", str(input_file), "--offset", "512", "--length", "1024", "--mode", "whole"]
+        )
+
+        main()
+
+        output = (tmp_path / "image_reversed.bin").read_bytes()
+        assert output == self.DATA[:512] + inverse_whole(self.DATA[512:1536]) + self.DATA[1536:]
+        assert input_file.read_bytes() == self.DATA
+
+    def test_out_of_bounds(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a region beyond the end of the file fails without leaving an output."""
+        input_file = tmp_path / "image.bin"
+        input_file.write_bytes(self.DATA)
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "--range", f"{len(self.DATA)}:1"])
+
+        with pytest.raises(SystemExit):
+            main()
+
+        assert list(tmp_path.iterdir()) == [input_file]
+
+
+class TestCLIBits:
+    """Tests for reversing inputs as sequences of bits."""
+
+    def test_parse_args(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the bit sequence options."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", "--bits", "13", "--bit-order", "lsb"])
+        args = parse_args()
+        assert (args.bits, args.bit_order) == (13, "lsb")
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            ["--bits", "-1"],
+            ["--bits", "x"],
+            ["--bit-order", "lsb"],
+            ["--bits", "8", "--mode", "byte"],
+            ["--bits", "8", "--range", "0:1"],
+        ],
+    )
+    def test_parse_args_invalid(self, monkeypatch: pytest.MonkeyPatch, options: list[str]) -> None:
+        """Test invalid bit counts and options that cannot be combined with --bits."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", *options])
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    def test_output_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a sequence that ends within a byte."""
+        input_file = tmp_path / "capture.bin"
+        input_file.write_bytes(b"\xca\x80")
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "--bits", "9"])
+
+        main()
+
+        assert (tmp_path / "capture_reversed.bin").read_bytes() == b"\xa9\x80"
+
+    def test_in_place(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test reversing a file in place in the LSB-first order."""
+        input_file = tmp_path / "chain.bin"
+        input_file.write_bytes(b"\x01\x00")
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-i", "--bits", "10", "--bit-order", "lsb"])
+
+        main()
+
+        assert input_file.read_bytes() == b"\x00\x02"
+
+    def test_stdin_stdout(self, monkeypatch: pytest.MonkeyPatch, capsysbinary: pytest.CaptureFixture[bytes]) -> None:
+        """Test reading the sequence from stdin."""
+        monkeypatch.setattr("sys.stdin", SimpleNamespace(buffer=io.BytesIO(b"\xff\xff")))
+        monkeypatch.setattr("sys.argv", ["revbits", "-", "--bits", "12"])
+
+        main()
+
+        assert capsysbinary.readouterr().out == b"\xff\xf0"
+
+    def test_length_mismatch(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an input of the wrong length fails without changes or output."""
+        input_file = tmp_path / "capture.bin"
+        input_file.write_bytes(b"\x01\x02\x03")
+        for options in (["--bits", "9"], ["--bits", "9", "-i"]):
+            monkeypatch.setattr("sys.argv", ["revbits", str(input_file), *options])
+            with pytest.raises(SystemExit):
+                main()
+        assert list(tmp_path.iterdir()) == [input_file]
+        assert input_file.read_bytes() == b"\x01\x02\x03"
+
+
+class TestCLIChain:
+    """Tests for the --chain option."""
+
+    DATA = bytes(range(256)) * 4
+
+    def test_parse_args(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the chain is compiled while parsing."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", "--chain", "reverse,swap16"])
+        args = parse_args()
+        assert args.chain is not None
+        assert args.chain.ops == ("reverse", "swap16")
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            ["--chain", "rotate"],
+            ["--chain", "xor:1"],
+            ["--chain", "reverse", "--mode", "whole"],
+            ["--chain", "reverse", "--bits", "8"],
+            ["--chain", "reverse", "--offset", "4"],
+        ],
+    )
+    def test_parse_args_invalid(self, monkeypatch: pytest.MonkeyPatch, options: list[str]) -> None:
+        """Test invalid chains and options that cannot be combined with --chain."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.bin", *options])
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    def test_output_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a chain streamed in chunks smaller than the input."""
+        input_file = tmp_path / "dump.bin"
+        input_file.write_bytes(self.DATA)
+        chain = "reverse,swap32,xor:a5a5a5,invert"
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "--chain", chain, "--chunk-size", "100"])
+
+        main()
+
+        expected = TransformChain(chain).apply(self.DATA)
+        assert (tmp_path / "dump_reversed.bin").read_bytes() == expected
+
+    def test_in_place(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a chain applied to a file in place."""
+        input_file = tmp_path / "dump.bin"
+        input_file.write_bytes(self.DATA)
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-i", "--chain", "reverse,swap32"])
+
+        main()
+
+        assert input_file.read_bytes() == inverse_words(self.DATA, 32)
+
+    def test_compressed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a chain between compressed files."""
+        input_file = tmp_path / "dump.bin.gz"
+        input_file.write_bytes(gzip.compress(self.DATA))
+        output_file = tmp_path / "out.bin.xz"
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-o", str(output_file), "--chain", "invert"])
+
+        main()
+
+        assert lzma.decompress(output_file.read_bytes()) == bytes(byte ^ 0xFF for byte in self.DATA)
+
+    def test_partial_block(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an input that is not a whole number of words fails."""
+        input_file = tmp_path / "dump.bin"
+        input_file.write_bytes(b"\x01\x02\x03")
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-i", "--chain", "swap16"])
+        with pytest.raises(SystemExit):
+            main()
+        assert input_file.read_bytes() == b"\x01\x02\x03"
+
+
+class TestCLICompressed:
+    """Tests for compressed inputs and outputs."""
+
+    DATA = bytes(range(256)) * 64
+
+    def test_extension(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that .gz input is decompressed and the .gz output name compressed again."""
+        input_file = tmp_path / "capture.bin.gz"
+        input_file.write_bytes(gzip.compress(self.DATA))
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file)])
+
+        main()
+
+        assert gzip.decompress((tmp_path / "capture.bin_reversed.gz").read_bytes()) == inverse_bytes(self.DATA)
+
+    def test_convert(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test an xz input written to an uncompressed output."""
+        input_file = tmp_path / "capture.xz"
+        output_file = tmp_path / "capture.bin"
+        input_file.write_bytes(lzma.compress(self.DATA))
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-o", str(output_file), "--mode", "whole"])
+
+        main()
+
+        assert output_file.read_bytes() == inverse_whole(self.DATA)
+
+    def test_stdio_options(self, monkeypatch: pytest.MonkeyPatch, capsysbinary: pytest.CaptureFixture[bytes]) -> None:
+        """Test the codec options for standard input and output."""
+        monkeypatch.setattr("sys.stdin", SimpleNamespace(buffer=io.BytesIO(bz2.compress(self.DATA))))
+        monkeypatch.setattr("sys.argv", ["revbits", "-", "--input-codec", "bz2", "--output-codec", "gzip"])
+
+        main()
+
+        assert gzip.decompress(capsysbinary.readouterr().out) == inverse_bytes(self.DATA)
+
+    def test_codec_none(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that --input-codec none overrides the extension."""
+        input_file = tmp_path / "raw.gz"
+        input_file.write_bytes(b"\x01\x02\x03")
+        output_file = tmp_path / "out.bin"
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-o", str(output_file), "--input-codec", "none"])
+
+        main()
+
+        assert output_file.read_bytes() == b"\x80\x40\xc0"
+
+    def test_bits(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a compressed bit sequence."""
+        input_file = tmp_path / "capture.gz"
+        input_file.write_bytes(gzip.compress(b"\xca\x80"))
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "--bits", "9", "-o", str(tmp_path / "out.bin")])
+
+        main()
+
+        assert (tmp_path / "out.bin").read_bytes() == b"\xa9\x80"
+
+    @pytest.mark.parametrize("options", [["-i"], ["--range", "0:4", "-o", "out.bin"]])
+    def test_unsupported(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, options: list[str]) -> None:
+        """Test that compressed files are neither modified in place nor reversed in regions."""
+        input_file = tmp_path / "capture.gz"
+        compressed = gzip.compress(self.DATA)
+        input_file.write_bytes(compressed)
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), *options])
+
+        with pytest.raises(SystemExit):
+            main()
+
+        assert input_file.read_bytes() == compressed
+
+    def test_corrupt_input(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that corrupt compressed data is reported as an error of the file."""
+        input_file = tmp_path / "capture.xz"
+        input_file.write_bytes(b"not xz data")
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-o", str(tmp_path / "out.bin")])
+
+        with pytest.raises(SystemExit):
+            main()
+
+
+class TestCLIRecords:
+    """Tests for Intel HEX and S-record inputs."""
+
+    HEX = b":020000040001F9\r\n:0400000001020304F2\r\n:040004001020304058\r\n:00000001FF\r\n"
+    REVERSED_HEX = b":020000040001F9\r\n:040000008040C0205C\r\n:0400040008040C02DE\r\n:00000001FF\r\n"
+    SREC = b"S00600004844521B\nS107000001020304EE\nS9030000FC\n"
+    REVERSED_SREC = b"S10700008040C02058\n"
+
+    def test_extension(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that .hex files are detected and only the data bytes are reversed."""
+        input_file = tmp_path / "firmware.hex"
+        input_file.write_bytes(self.HEX)
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "--chunk-size", "8"])
+
+        main()
+
+        assert (tmp_path / "firmware_reversed.hex").read_bytes() == self.REVERSED_HEX
+
+    def test_format_option(self, monkeypatch: pytest.MonkeyPatch, capsysbinary: pytest.CaptureFixture[bytes]) -> None:
+        """Test --format srec on standard input, which is binary by default."""
+        monkeypatch.setattr("sys.stdin", SimpleNamespace(buffer=io.BytesIO(self.SREC)))
+        monkeypatch.setattr("sys.argv", ["revbits", "-", "--format", "srec"])
+
+        main()
+
+        assert capsysbinary.readouterr().out.splitlines(keepends=True)[1] == self.REVERSED_SREC
+
+    def test_binary(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that --format binary reverses every byte of a .hex file."""
+        input_file = tmp_path / "firmware.hex"
+        input_file.write_bytes(self.HEX)
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "--format", "binary"])
+
+        main()
+
+        assert (tmp_path / "firmware_reversed.hex").read_bytes() == inverse_bytes(self.HEX)
+
+    def test_compressed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the format of a compressed file is taken from the extension before .gz."""
+        input_file = tmp_path / "firmware.hex.gz"
+        input_file.write_bytes(gzip.compress(self.HEX))
+        output_file = tmp_path / "out.hex"
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-o", str(output_file)])
+
+        main()
+
+        assert output_file.read_bytes() == self.REVERSED_HEX
+
+    @pytest.mark.parametrize(
+        "options",
+        [["--format", "ihex", "--mode", "word", "--bit-width", "16"], ["--format", "srec", "--chain", "reverse"]],
+    )
+    def test_parse_args_invalid(self, monkeypatch: pytest.MonkeyPatch, options: list[str]) -> None:
+        """Test options for binary data combined with a record format."""
+        monkeypatch.setattr("sys.argv", ["revbits", "input.hex", *options])
+        with pytest.raises(SystemExit):
+            parse_args()
+
+    @pytest.mark.parametrize("options", [["-i"], ["--offset", "4"]])
+    def test_unsupported(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, options: list[str]) -> None:
+        """Test that detected record files cannot be modified in place or by region."""
+        input_file = tmp_path / "firmware.hex"
+        input_file.write_bytes(self.HEX)
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), *options])
+        with pytest.raises(SystemExit):
+            main()
+        assert input_file.read_bytes() == self.HEX
+        assert not (tmp_path / "firmware_reversed.hex").exists()
+
+    def test_malformed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a malformed record fails and leaves no partial output behind."""
+        input_file = tmp_path / "firmware.hex"
+        input_file.write_bytes(self.HEX.replace(b"F2", b"F3"))
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "--chunk-size", "8"])
+        with pytest.raises(SystemExit):
+            main()
+        assert not (tmp_path / "firmware_reversed.hex").exists()
+
+
+class TestCLIStats:
+    """Tests for the --stats report."""
+
+    def test_parse_args_stats(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the report formats."""
+        for options, expected in [([], None), (["--stats"], "text"), (["--stats-json"], "json")]:
+            monkeypatch.setattr("sys.argv", ["revbits", "input.bin", *options])
+            assert parse_args().stats == expected
+
+    def test_text(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test the human-readable report on stderr."""
+        input_file = tmp_path / "input.bin"
+        input_file.write_bytes(bytes(100))
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "--stats"])
+
+        main()
+
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        lines = captured.err.splitlines()
+        assert lines[0].startswith("1 file(s), 100 bytes in ")
+        assert "peak RSS" in lines[0]
+        assert [line.split()[:2] for line in lines[2:]] == [["read", "100"], ["transform", "100"], ["write", "100"]]
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_json(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str], jobs: str
+    ) -> None:
+        """Test the JSON report over several files, one of which fails."""
+        for name, size in [("a.bin", 10), ("b.bin", 30), ("c.bin", 3)]:
+            (tmp_path / name).write_bytes(bytes(size))
+        monkeypatch.setattr(
+            "sys.argv",
+            [
+                "revbits",
+                str(tmp_path / "*.bin"),
+                *("-o", str(tmp_path / "out"), "--mode", "word", "--bit-width", "16"),
+                *("-j", jobs, "--stats-json"),
+            ],
+        )
+
+        with pytest.raises(SystemExit):
+            main()
+
+        report = json.loads(capsys.readouterr().err.splitlines()[0])
+        assert report["files"] == 2
+        assert report["bytes"] == 40
+        assert report["phases"]["write"]["bytes"] == 40
+        assert report["wall_seconds"] > 0
+
+    def test_in_place(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that an in-place run is reported as transform only."""
+        input_file = tmp_path / "input.bin"
+        input_file.write_bytes(bytes(100))
+        monkeypatch.setattr("sys.argv", ["revbits", str(input_file), "-i", "--stats-json"])
+
+        main()
+
+        phases = json.loads(capsys.readouterr().err)["phases"]
+        assert [phases[name]["bytes"] for name in ("read", "transform", "write")] == [0, 100, 0]
+
+
+class TestCLIBatch:
+    """Tests for processing several files in one run."""
+
+    @pytest.fixture
+    def tree(self, tmp_path: Path) -> Path:
+        """A directory with files at two levels."""
+        root = tmp_path / "firmware"
+        (root / "sub").mkdir(parents=True)
+        (root / "a.bin").write_bytes(b"\x01\x02\x03")
+        (root / "b.bin").write_bytes(b"\x0f\x0f\x0f")
+        (root / "sub" / "c.bin").write_bytes(b"\x80\x80\x80")
+        return root
+
+    def test_multiple_files(self, tree: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the _reversed naming rule applied to every file."""
+        monkeypatch.setattr("sys.argv", ["revbits", str(tree / "a.bin"), str(tree / "b.bin")])
+
+        main()
+
+        assert (tree / "a_reversed.bin").read_bytes() == b"\x80\x40\xc0"
+        assert (tree / "b_reversed.bin").read_bytes() == b"\xf0\xf0\xf0"
+
+    def test_glob(self, tree: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that quoted glob patterns are expanded, including '**'."""
+        monkeypatch.setattr("sys.argv", ["revbits", str(tree / "**" / "*.bin"), "-i", "--jobs", "2"])
+
+        main()
+
+        assert (tree / "a.bin").read_bytes() == b"\x80\x40\xc0"
+        assert (tree / "sub" / "c.bin").read_bytes() == b"\x01\x01\x01"
+
+    def test_recursive_output_directory(self, tree: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the directory structure is kept below the output directory."""
+        output = tmp_path / "out"
+        monkeypatch.setattr("sys.argv", ["revbits", str(tree), "-r", "-o", str(output), "-j", "0"])
+
+        main()
+
+        assert sorted(path.relative_to(output).as_posix() for path in output.rglob("*.bin")) == [
+            "a.bin",
+            "b.bin",
+            "sub/c.bin",
+        ]
+        assert (output / "sub" / "c.bin").read_bytes() == b"\x01\x01\x01"
+        assert (tree / "a.bin").read_bytes() == b"\x01\x02\x03"
+
+    def test_single_file_into_directory(self, tree: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an existing directory as -o receives the file under its own name."""
+        output = tmp_path / "out"
+        output.mkdir()
+        monkeypatch.setattr("sys.argv", ["revbits", str(tree / "a.bin"), "-o", str(output)])
+
+        main()
+
+        assert (output / "a.bin").read_bytes() == b"\x80\x40\xc0"
+
+    def test_error_report(
+        self, tree: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that failures are reported per file after the other files were processed."""
+        missing = tree / "missing.bin"
+        monkeypatch.setattr(
+            "sys.argv",
+            ["revbits", str(tree / "a.bin"), str(missing), str(tree / "sub"), str(tree / "b.bin"), "-i"],
+        )
+
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+
+        assert excinfo.value.code == 1
+        assert (tree / "a.bin").read_bytes() == b"\x80\x40\xc0"
+        assert (tree / "b.bin").read_bytes() == b"\xf0\xf0\xf0"
+        err = capsys.readouterr().err
+        assert "Failed to reverse 2 of 4 input(s)" in err
+        assert f"{missing}: Input file does not exist" in err
+        assert "use --recursive" in err
+
+    def test_word_error_per_file(self, tree: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a file with a partial word fails alone."""
+        (tree / "even.bin").write_bytes(b"\x01\x00")
+        monkeypatch.setattr(
+            "sys.argv",
+            ["revbits", str(tree / "a.bin"), str(tree / "even.bin"), "-i", "--mode", "word", "--bit-width", "16"],
+        )
+
+        with pytest.raises(SystemExit):
+            main()
+
+        assert (tree / "a.bin").read_bytes() == b"\x01\x02\x03"
+        assert (tree / "even.bin").read_bytes() == b"\x00\x80"
+
+    def test_conflicting_outputs(self, tree: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that two inputs with the same name do not overwrite each other's output."""
+        (tree / "sub" / "a.bin").write_bytes(b"\xff")
+        output = tmp_path / "out"
+        monkeypatch.setattr(
+            "sys.argv", ["revbits", str(tree / "a.bin"), str(tree / "sub" / "a.bin"), "-o", str(output)]
+        )
+
+        with pytest.raises(SystemExit):
+            main()
+
+        assert (output / "a.bin").read_bytes() == b"\x80\x40\xc0"
+
+    def test_no_match(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a pattern without matches is a failure."""
+        monkeypatch.setattr("sys.argv", ["revbits", str(tmp_path / "*.bin")])
+
+        with pytest.raises(SystemExit):
+            main()
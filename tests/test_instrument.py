@@ -0,0 +1,156 @@
+"""Tests for the instrumentation hooks and the phase timings."""
+
+import asyncio
+import io
+import json
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from revbits import instrument
+from revbits.instrument import PHASES, CallEvent, RunStats, StreamTimer, add_hook, peak_rss, remove_hook
+from revbits.reverser import reverse_buffer
+from revbits.stream import reverse_file_in_place, reverse_stream
+
+
+@pytest.fixture
+def events() -> Iterator[list[CallEvent]]:
+    """Events received by a hook registered for the duration of the test."""
+    received: list[CallEvent] = []
+    add_hook(received.append)
+    yield received
+    remove_hook(received.append)
+
+
+class TestHooks:
+    """Tests for add_hook and remove_hook."""
+
+    def test_no_hooks_by_default(self) -> None:
+        """Test that the instrumented functions run without hooks."""
+        assert instrument.hooks == ()
+        assert reverse_buffer(b"\x01", "byte") == b"\x80"
+
+    def test_reverse_buffer(self, events: list[CallEvent]) -> None:
+        """Test the event of reverse_buffer."""
+        reverse_buffer(b"\x01\x02\x03", "whole")
+        assert len(events) == 1
+        assert events[0].function == "reverse_buffer"
+        assert events[0].nbytes == 3
+        assert events[0].seconds >= 0
+
+    def test_reverse_stream(self, events: list[CallEvent]) -> None:
+        """Test that one stream gives one event with its total size."""
+        reverse_stream(io.BytesIO(bytes(100)), io.BytesIO(), chunk_size=16)
+        assert [(event.function, event.nbytes) for event in events] == [("reverse_stream", 100)]
+
+    def test_reverse_file_in_place(self, events: list[CallEvent], tmp_path: Path) -> None:
+        """Test the event of reverse_file_in_place."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(bytes(20))
+        reverse_file_in_place(path)
+        assert [(event.function, event.nbytes) for event in events] == [("reverse_file_in_place", 20)]
+
+    def test_areverse_stream(self, events: list[CallEvent]) -> None:
+        """Test the event of areverse_stream."""
+        from revbits.aio import areverse_stream  # noqa: PLC0415
+
+        async def run() -> None:
+            reader = asyncio.StreamReader()
+            reader.feed_data(bytes(10))
+            reader.feed_eof()
+
+            class Writer:
+                def write(self, data: bytes) -> None:
+                    pass
+
+                async def drain(self) -> None:
+                    pass
+
+            await areverse_stream(reader, Writer(), mode="byte")  # type: ignore[arg-type]
+
+        asyncio.run(run())
+        assert [(event.function, event.nbytes) for event in events] == [("areverse_stream", 10)]
+
+    def test_failed_call(self, events: list[CallEvent]) -> None:
+        """Test that failed calls are not reported."""
+        with pytest.raises(ValueError, match="not a multiple"):
+            reverse_stream(io.BytesIO(b"\x01"), io.BytesIO(), mode="word", bit_width=16)
+        assert events == []
+
+    def test_several_hooks(self, events: list[CallEvent]) -> None:
+        """Test that every hook receives the event, and removed hooks no longer do."""
+        others: list[CallEvent] = []
+        add_hook(others.append)
+        reverse_buffer(b"\x01", "byte")
+        remove_hook(others.append)
+        reverse_buffer(b"\x01", "byte")
+        assert len(events) == 2
+        assert len(others) == 1
+
+    def test_remove_unknown(self) -> None:
+        """Test that removing a hook that is not registered raises."""
+        with pytest.raises(ValueError, match="not registered"):
+            remove_hook(print)
+
+
+class _SlowStream(io.BytesIO):
+    """Stream whose reads and writes take at least ``DELAY`` seconds."""
+
+    DELAY = 0.01
+
+    def read(self, size: int | None = -1) -> bytes:
+        time.sleep(self.DELAY)
+        return super().read(size)
+
+    def write(self, data: "bytes | bytearray | memoryview") -> int:  # type: ignore[override]
+        time.sleep(self.DELAY)
+        return super().write(data)
+
+
+class TestStreamTimer:
+    """Tests for the phase timings of one run."""
+
+    def test_phases(self) -> None:
+        """Test that reads and writes are attributed to their phases."""
+        timer = StreamTimer()
+        destination = io.BytesIO()
+        with timer.run() as transform:
+            transform.nbytes = reverse_stream(
+                timer.reader(_SlowStream(bytes(40))), timer.writer(destination), chunk_size=16
+            )
+        read, transform, write = (timer.phases[name] for name in PHASES)
+        assert destination.getvalue() == bytes(40)
+        assert (read.nbytes, transform.nbytes, write.nbytes) == (40, 40, 40)
+        # Three chunks and the empty read at the end
+        assert read.wall >= 4 * _SlowStream.DELAY
+        assert write.wall < _SlowStream.DELAY
+        assert transform.wall >= 0
+
+    def test_run_stats(self) -> None:
+        """Test the totals and both report formats."""
+        stats = RunStats(wall=0.5, cpu=0.25, peak_rss=peak_rss())
+        for _ in range(2):
+            timer = StreamTimer()
+            with timer.run() as transform:
+                transform.nbytes = reverse_stream(timer.reader(io.BytesIO(bytes(1000))), timer.writer(io.BytesIO()))
+            stats.add(timer)
+
+        report = json.loads(json.dumps(stats.to_dict()))
+        assert report["files"] == 2
+        assert report["bytes"] == 2000
+        assert report["throughput_mb_s"] == pytest.approx(2000 / 0.5 / 1e6)
+        assert set(report["phases"]) == set(PHASES)
+        assert report["phases"]["read"]["bytes"] == 2000
+        assert report["peak_rss_bytes"] is None or report["peak_rss_bytes"] > 0
+
+        text = stats.format()
+        assert text.startswith("2 file(s), 2000 bytes in 0.500 s (0.0 MB/s)")
+        assert all(f"\n{name} " in text for name in PHASES)
+
+    def test_empty_run(self) -> None:
+        """Test that a run without time reports no throughput."""
+        report = RunStats().to_dict()
+        assert report["throughput_mb_s"] is None
+        assert report["phases"]["read"]["throughput_mb_s"] is None
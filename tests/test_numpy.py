@@ -0,0 +1,116 @@
+"""Tests for NumPy array support."""
+
+import pytest
+
+from revbits._core import bitrev_permute, inverse_array
+from revbits.reverser import reverse_array, reverse_bits, reverse_bytes
+
+np = pytest.importorskip("numpy")
+
+UNSIGNED_DTYPES = ["uint8", "uint16", "uint32", "uint64"]
+
+
+def expected_reversal(array: "np.ndarray") -> list[int]:
+    """Reverse every element with reverse_bytes, one at a time."""
+    size = array.dtype.itemsize
+    return [
+        int.from_bytes(reverse_bytes(int(value).to_bytes(size, "little")), "little") for value in array.ravel().tolist()
+    ]
+
+
+class TestReverseArray:
+    """Tests for reverse_array function."""
+
+    @pytest.mark.parametrize("dtype", UNSIGNED_DTYPES)
+    def test_contiguous(self, dtype: str) -> None:
+        """Test a C-contiguous array of each unsigned type."""
+        array = np.arange(1, 101, dtype=dtype) * 3
+        result = reverse_array(array)
+        assert result.dtype == array.dtype
+        assert result.ravel().tolist() == expected_reversal(array)
+
+    @pytest.mark.parametrize("dtype", UNSIGNED_DTYPES)
+    def test_strided(self, dtype: str) -> None:
+        """Test a non-contiguous view of a 2-d array."""
+        array = (np.arange(48, dtype=dtype) * 7).reshape(6, 8)[::2, 1::3].T
+        assert not array.flags.c_contiguous
+        result = reverse_array(array)
+        assert result.shape == array.shape
+        assert result.ravel().tolist() == expected_reversal(array)
+
+    def test_in_place(self) -> None:
+        """Test in-place reversal by passing the array as out."""
+        array = np.array([1, 2, 0x80000000], dtype=np.uint32)
+        assert reverse_array(array, out=array) is array
+        assert array.tolist() == [0x80000000, 0x40000000, 1]
+
+    def test_in_place_strided(self) -> None:
+        """Test in-place reversal of a strided view, leaving other elements untouched."""
+        array = np.ones(6, dtype=np.uint8)
+        view = array[::2]
+        reverse_array(view, out=view)
+        assert array.tolist() == [0x80, 1, 0x80, 1, 0x80, 1]
+
+    def test_out_strided(self) -> None:
+        """Test writing into a strided output array."""
+        array = np.array([1, 2, 3], dtype=np.uint16)
+        out = np.zeros(6, dtype=np.uint16)
+        reverse_array(array, out=out[::2])
+        assert out.tolist() == [0x8000, 0, 0x4000, 0, 0xC000, 0]
+
+    def test_overlapping_views(self) -> None:
+        """Test that other views of the input's memory are rejected as out, leaving the array unchanged."""
+        array = np.arange(1, 9, dtype=np.uint16)
+        with pytest.raises(ValueError, match="overlaps the input"):
+            reverse_array(array, out=array[::-1])
+        with pytest.raises(ValueError, match="overlaps the input"):
+            reverse_array(array[:6:2], out=array[2::2])
+        assert array.tolist() == list(range(1, 9))
+
+    def test_zero_dim_and_empty(self) -> None:
+        """Test 0-d and empty arrays."""
+        assert reverse_array(np.array(1, dtype=np.uint64)).tolist() == 1 << 63
+        assert reverse_array(np.zeros((0, 4), dtype=np.uint32)).shape == (0, 4)
+
+    def test_round_trip(self) -> None:
+        """Test that reversing twice gives the original array."""
+        array = np.random.default_rng(0).integers(0, 2**63, size=1000, dtype=np.uint64)
+        assert np.array_equal(reverse_array(reverse_array(array)), array)
+
+    def test_signed_rejected(self) -> None:
+        """Test that signed integer arrays are rejected."""
+        with pytest.raises(TypeError, match="unsigned integer"):
+            reverse_array(np.arange(4, dtype=np.int32))
+
+    def test_float_rejected(self) -> None:
+        """Test that float arrays are rejected."""
+        with pytest.raises(TypeError, match="unsigned integer"):
+            reverse_array(np.zeros(4))
+
+    def test_shape_mismatch(self) -> None:
+        """Test error when out has a different shape."""
+        with pytest.raises(ValueError, match="does not match"):
+            reverse_array(np.zeros(4, dtype=np.uint8), out=np.zeros(5, dtype=np.uint8))
+
+    def test_dtype_mismatch(self) -> None:
+        """Test error when out has a different element size."""
+        with pytest.raises(ValueError, match="does not match"):
+            inverse_array(np.zeros(4, dtype=np.uint8), np.zeros(4, dtype=np.uint16))
+
+    def test_read_only_out(self) -> None:
+        """Test error when out is read-only."""
+        out = np.zeros(4, dtype=np.uint8)
+        out.flags.writeable = False
+        with pytest.raises(TypeError, match="read-only"):
+            reverse_array(np.zeros(4, dtype=np.uint8), out=out)
+
+
+class TestBitrevPermute:
+    """Tests for bitrev_permute on NumPy arrays."""
+
+    def test_complex(self) -> None:
+        """Test reordering complex FFT input in place."""
+        signal = np.arange(16, dtype=np.complex128) * (1 + 1j)
+        bitrev_permute(signal, signal.itemsize, 4)
+        assert signal.real.tolist() == [reverse_bits(i, 4) for i in range(16)]
+        assert (signal.imag == signal.real).all()
@@ -0,0 +1,142 @@
+"""Tests for the pipelined reading and writing of compressed streams."""
+
+import bz2
+import gzip
+import io
+import lzma
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from revbits.pipeline import CODECS, Codec, codec_for_path, open_codec, read_ahead, write_behind
+from revbits.reverser import reverse_buffer
+from revbits.stream import reverse_stream
+
+DATA = bytes((i * 31 + i // 256) % 256 for i in range(100_000))
+
+type _Codec = Callable[[bytes], bytes]
+
+_DECOMPRESS: dict[str, _Codec] = {"gzip": gzip.decompress, "bz2": bz2.decompress, "xz": lzma.decompress}
+_COMPRESS: dict[str, _Codec] = {"gzip": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+
+
+class _FailingWriter(io.BytesIO):
+    """Stream whose writes fail."""
+
+    def write(self, _data: "bytes | bytearray | memoryview") -> int:  # type: ignore[override]
+        msg = "disk full"
+        raise OSError(msg)
+
+
+class TestCodecs:
+    """Tests for the detection and opening of compression formats."""
+
+    @pytest.mark.parametrize(
+        ("name", "expected"),
+        [("a.gz", "gzip"), ("a.bin.GZ", "gzip"), ("a.bz2", "bz2"), ("a.xz", "xz"), ("a.bin", None), ("gz", None)],
+    )
+    def test_codec_for_path(self, name: str, expected: Codec | None) -> None:
+        """Test detection from the extension."""
+        assert codec_for_path(Path(name)) == expected
+
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_round_trip(self, codec: Codec) -> None:
+        """Test that written data decompresses with the standard library and reads back."""
+        buffer = io.BytesIO()
+        with open_codec(buffer, codec, "wb") as stream:
+            stream.write(DATA)
+        assert not buffer.closed
+        assert _DECOMPRESS[codec](buffer.getvalue()) == DATA
+        buffer.seek(0)
+        with open_codec(buffer, codec, "rb") as stream:
+            assert stream.read() == DATA
+
+    def test_unknown(self) -> None:
+        """Test error for an unknown codec."""
+        with pytest.raises(ValueError, match="Unknown codec 'zip'"):
+            open_codec(io.BytesIO(), "zip", "rb")  # type: ignore[arg-type]
+
+
+class TestReadAhead:
+    """Tests for read_ahead."""
+
+    @pytest.mark.parametrize("codec", [None, *CODECS])
+    def test_exact_reads(self, codec: Codec | None) -> None:
+        """Test that reads return the requested size until the end, whatever the chunks are."""
+        data = DATA if codec is None else _COMPRESS[codec](DATA)
+        with read_ahead(io.BytesIO(data), 1000, codec, depth=2) as reader:
+            assert not reader.seekable()
+            chunks = iter(lambda: reader.read(4096), b"")
+            assert [len(chunk) for chunk in chunks] == [4096] * 24 + [1696]
+        with read_ahead(io.BytesIO(data), 3000, codec) as reader:
+            assert reader.read(10) == DATA[:10]
+            assert reader.read() == DATA[10:]
+            assert reader.read(10) == b""
+
+    def test_corrupt_input(self) -> None:
+        """Test that errors of the background thread are raised by read."""
+        data = gzip.compress(DATA)[:-100]
+        with (
+            read_ahead(io.BytesIO(data), 4096, "gzip") as reader,
+            pytest.raises(ValueError, match="Invalid compressed"),
+        ):
+            reader.read()
+        with read_ahead(io.BytesIO(b"not xz data"), 4096, "xz") as reader, pytest.raises(ValueError, match="Invalid"):
+            reader.read()
+
+    def test_early_exit(self) -> None:
+        """Test that leaving the context stops a thread that waits for a full queue."""
+        with read_ahead(io.BytesIO(DATA), 100, depth=1) as reader:
+            assert reader.read(10) == DATA[:10]
+        assert [thread.name for thread in threading.enumerate() if thread.name == "revbits-read"] == []
+
+
+class TestWriteBehind:
+    """Tests for write_behind."""
+
+    @pytest.mark.parametrize("codec", [None, *CODECS])
+    def test_round_trip(self, codec: Codec | None) -> None:
+        """Test that every write reaches the destination in order."""
+        buffer = io.BytesIO()
+        with write_behind(buffer, codec, depth=1) as writer:
+            for start in range(0, len(DATA), 7000):
+                assert writer.write(memoryview(DATA)[start : start + 7000]) == len(DATA[start : start + 7000])
+        output = buffer.getvalue()
+        assert (output if codec is None else _DECOMPRESS[codec](output)) == DATA
+
+    def test_flush(self) -> None:
+        """Test that flush waits for the queued writes."""
+        buffer = io.BytesIO()
+        with write_behind(buffer) as writer:
+            writer.write(DATA)
+            writer.flush()
+            assert buffer.getvalue() == DATA
+
+    def test_write_error(self) -> None:
+        """Test that a failed write is raised in the writing thread."""
+
+        def write_all() -> None:
+            with write_behind(_FailingWriter(), depth=1) as writer:
+                for _ in range(10):
+                    writer.write(DATA)
+
+        with pytest.raises(OSError, match="disk full"):
+            write_all()
+
+
+class TestPipeline:
+    """Tests for reverse_stream between both stages."""
+
+    @pytest.mark.parametrize(("mode", "bit_width"), [("auto", None), ("byte", None), ("word", 32), ("whole", None)])
+    def test_modes(self, mode: str, bit_width: int | None) -> None:
+        """Test that every mode gives the result of reverse_buffer."""
+        destination = io.BytesIO()
+        with (
+            read_ahead(io.BytesIO(gzip.compress(DATA)), 4096, "gzip") as reader,
+            write_behind(destination, "xz") as writer,
+        ):
+            written = reverse_stream(reader, writer, 4096, mode, bit_width)  # type: ignore[arg-type]
+        assert written == len(DATA)
+        assert lzma.decompress(destination.getvalue()) == reverse_buffer(DATA, mode, bit_width)  # type: ignore[arg-type]
@@ -0,0 +1,186 @@
+"""Tests for the bit reversal of Intel HEX and Motorola S-record files."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from revbits import reverse_record_text
+from revbits._core import inverse_bytes
+from revbits.instrument import CallEvent, add_hook, remove_hook
+from revbits.records import MAX_LINE_LENGTH, format_for_path, reverse_records
+
+
+def ihex_record(record_type: int, address: int, data: bytes) -> bytes:
+    """An Intel HEX record with its checksum, without line ending."""
+    raw = bytes((len(data),)) + address.to_bytes(2, "big") + bytes((record_type,)) + data
+    return b":" + (raw + bytes((-sum(raw) & 0xFF,))).hex().upper().encode()
+
+
+def srec_record(record_type: int, address: int, data: bytes) -> bytes:
+    """An S-record with its checksum, without line ending; S0/S1/S5/S9 have 2-byte addresses, S2/S8 3, S3/S7 4."""
+    address_size = {0: 2, 1: 2, 2: 3, 3: 4, 5: 2, 7: 4, 8: 3, 9: 2}[record_type]
+    raw = address.to_bytes(address_size, "big") + data
+    raw = bytes((len(raw) + 1,)) + raw
+    return f"S{record_type}".encode() + (raw + bytes((~sum(raw) & 0xFF,))).hex().upper().encode()
+
+
+PAYLOAD = bytes(range(256))
+
+
+def ihex_file(data: bytes, record_size: int = 16, line_ending: bytes = b"\n") -> bytes:
+    """An Intel HEX file of ``data`` at address 0x10000, with an extended address record and an end record."""
+    lines = [ihex_record(4, 0, b"\x00\x01")]
+    lines += [ihex_record(0, i, data[i : i + record_size]) for i in range(0, len(data), record_size)]
+    lines.append(ihex_record(1, 0, b""))
+    return b"".join(line + line_ending for line in lines)
+
+
+def srec_file(data: bytes, record_type: int = 1, record_size: int = 16) -> bytes:
+    """An S-record file of ``data`` with a header, data records, a count record and a start address."""
+    lines = [srec_record(0, 0, b"HDR")]
+    lines += [srec_record(record_type, i, data[i : i + record_size]) for i in range(0, len(data), record_size)]
+    lines += [srec_record(5, len(lines) - 1, b""), srec_record(10 - record_type, 0, b"")]
+    return b"".join(line + b"\n" for line in lines)
+
+
+class TestReverseRecordText:
+    """Tests for reverse_record_text function."""
+
+    @pytest.mark.parametrize("line_ending", [b"\n", b"\r\n"])
+    def test_ihex(self, line_ending: bytes) -> None:
+        """Test that only the data bytes of data records are reversed."""
+        text = ihex_file(PAYLOAD, line_ending=line_ending)
+        assert reverse_record_text(text, "ihex") == ihex_file(inverse_bytes(PAYLOAD), line_ending=line_ending)
+
+    @pytest.mark.parametrize("record_type", [1, 2, 3])
+    def test_srec(self, record_type: int) -> None:
+        """Test the data records of every address size."""
+        text = srec_file(PAYLOAD, record_type)
+        assert reverse_record_text(text, "srec") == srec_file(inverse_bytes(PAYLOAD), record_type)
+
+    def test_round_trip(self) -> None:
+        """Test that reversing twice restores the text, including blank lines and a missing final newline."""
+        text = b"\n" + ihex_file(PAYLOAD, record_size=32) + b"  \n" + ihex_record(0, 0x20, b"\x12")
+        reversed_text = reverse_record_text(text, "ihex")
+        assert len(reversed_text) == len(text)
+        assert reversed_text != text
+        assert reverse_record_text(reversed_text, "ihex") == text
+
+    def test_lower_case(self) -> None:
+        """Test that lower-case digits are accepted and rewritten records are in upper case."""
+        record = ihex_record(0, 0x100, b"\x01\xab")
+        assert reverse_record_text(record.lower(), "ihex") == ihex_record(0, 0x100, b"\x80\xd5")
+        # Records without data are left unchanged
+        assert reverse_record_text(b":00000001ff", "ihex") == b":00000001ff"
+
+    @pytest.mark.parametrize(
+        ("text", "record_format", "message"),
+        [
+            (b":00000001FF\n:00000001FE\n", "ihex", "Invalid Intel HEX record in line 2: checksum mismatch"),
+            (b"00000001FF", "ihex", "Invalid Intel HEX record in line 1: expected ':'"),
+            (b":0000001FF", "ihex", "Invalid Intel HEX record in line 1: invalid hex digits"),
+            (b":02000000FFFE", "ihex", "Invalid Intel HEX record in line 1: length 2 does not match 1 data bytes"),
+            (b"\n\nX1030000FC", "srec", "Invalid S-record in line 3: expected 'S' and a record type"),
+            (b"S9040000FC", "srec", "Invalid S-record in line 1: count 4 does not match 3 bytes"),
+            (b"S3030000FC", "srec", "Invalid S-record in line 1: S3 record too short for its address"),
+            (b"S1030000FC", "ihex", "Invalid Intel HEX record in line 1: expected ':'"),
+            (b"", "elf", "Unknown record format 'elf'. Supported formats are ihex, srec."),
+        ],
+    )
+    def test_invalid(self, text: bytes, record_format: str, message: str) -> None:
+        """Test that malformed records are rejected with their line number."""
+        with pytest.raises(ValueError, match=f"^{message}$"):
+            reverse_record_text(text, record_format)  # type: ignore[arg-type]
+
+    def test_first_line(self) -> None:
+        """Test that first_line offsets the line numbers of errors."""
+        with pytest.raises(ValueError, match="in line 41:"):
+            reverse_record_text(b":00000001FF\n:00000001FE\n", "ihex", first_line=40)
+
+
+class TestReverseRecords:
+    """Tests for reverse_records function."""
+
+    @pytest.mark.parametrize("chunk_size", [8, 13, 100, 1 << 20])
+    def test_chunks(self, chunk_size: int) -> None:
+        """Test that lines split across chunks and CRLF endings split between chunks give the same result."""
+        text = ihex_file(PAYLOAD * 4, line_ending=b"\r\n")
+        destination = io.BytesIO()
+        assert reverse_records(io.BytesIO(text), destination, "ihex", chunk_size) == len(text)
+        assert destination.getvalue() == reverse_record_text(text, "ihex")
+
+    def test_srec(self) -> None:
+        """Test an S-record stream without a final newline."""
+        text = srec_file(PAYLOAD, 3).rstrip(b"\n")
+        destination = io.BytesIO()
+        reverse_records(io.BytesIO(text), destination, "srec", 64)
+        assert destination.getvalue() == srec_file(inverse_bytes(PAYLOAD), 3).rstrip(b"\n")
+
+    def test_empty(self) -> None:
+        """Test that an empty stream writes nothing."""
+        destination = io.BytesIO()
+        assert reverse_records(io.BytesIO(b""), destination, "srec") == 0
+        assert destination.getvalue() == b""
+
+    @pytest.mark.parametrize("chunk_size", [8, 50, 1 << 20])
+    def test_error_line(self, chunk_size: int) -> None:
+        """Test that errors count the lines of the previous chunks."""
+        lines = ihex_file(PAYLOAD).splitlines(keepends=True)
+        lines[10] = lines[10].replace(b"A", b"B")
+        with pytest.raises(ValueError, match=r"^Invalid Intel HEX record in line 11: checksum mismatch$"):
+            reverse_records(io.BytesIO(b"".join(lines)), io.BytesIO(), "ihex", chunk_size)
+
+    @pytest.mark.parametrize("chunk_size", [64, 1 << 20])
+    def test_line_too_long(self, chunk_size: int) -> None:
+        """Test that a line without end, like binary data, fails instead of being buffered whole."""
+        text = ihex_file(PAYLOAD) + b"0" * (MAX_LINE_LENGTH + 1)
+        with pytest.raises(ValueError, match=r"^Record in line 19 is too long \(more than 4096 bytes\)$"):
+            reverse_records(io.BytesIO(text), io.BytesIO(), "ihex", chunk_size)
+
+        source = io.BytesIO(bytes(10 * (MAX_LINE_LENGTH + chunk_size)))
+        with pytest.raises(ValueError, match=r"^Record in line 1 is too long"):
+            reverse_records(source, io.BytesIO(), "ihex", chunk_size)
+        assert source.tell() <= MAX_LINE_LENGTH + chunk_size
+
+    def test_invalid_arguments(self) -> None:
+        """Test unknown formats and too small chunks."""
+        with pytest.raises(ValueError, match="Unknown record format 'bin'"):
+            reverse_records(io.BytesIO(), io.BytesIO(), "bin")  # type: ignore[arg-type]
+        with pytest.raises(ValueError, match="too small"):
+            reverse_records(io.BytesIO(), io.BytesIO(), "ihex", 4)
+
+    def test_hook(self) -> None:
+        """Test that a registered hook receives the number of bytes written."""
+        events: list[CallEvent] = []
+        text = ihex_file(PAYLOAD)
+        add_hook(events.append)
+        try:
+            reverse_records(io.BytesIO(text), io.BytesIO(), "ihex")
+        finally:
+            remove_hook(events.append)
+        assert [(event.function, event.nbytes) for event in events] == [("reverse_records", len(text))]
+
+
+class TestFormatForPath:
+    """Tests for format_for_path function."""
+
+    @pytest.mark.parametrize(
+        ("name", "expected"),
+        [
+            ("image.hex", "ihex"),
+            ("IMAGE.HEX", "ihex"),
+            ("image.ihx", "ihex"),
+            ("image.s19", "srec"),
+            ("image.S37", "srec"),
+            ("image.mot", "srec"),
+            ("image.hex.gz", "ihex"),
+            ("image.srec.xz", "srec"),
+            ("image.bin", None),
+            ("image.gz", None),
+            ("image", None),
+        ],
+    )
+    def test_extensions(self, name: str, expected: str | None) -> None:
+        """Test the formats detected from file extensions."""
+        assert format_for_path(Path(name)) == expected
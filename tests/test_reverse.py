@@ -1,8 +1,35 @@
 """Comprehensive test suite for revbits package."""
 
+import array
+import os
+import subprocess
+import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pytest
 
-from revbits.reverser import reverse_byte, reverse_bytes
+from revbits._core import (
+    TransformChain,
+    active_kernel,
+    available_kernels,
+    bitrev_permute,
+    calibrate_kernels,
+    get_num_threads,
+    get_parallel_threshold,
+    inverse_bytes,
+    inverse_bytes_inplace,
+    inverse_whole,
+    inverse_words,
+    kernel_cache_path,
+    kernel_selection,
+    reverse_bitstream,
+    set_kernel,
+    set_num_threads,
+    set_parallel_threshold,
+)
+from revbits.reverser import reverse_bits, reverse_buffer, reverse_byte, reverse_bytes, reverse_words
 
 
 class TestReverseByte:
@@ -109,20 +136,25 @@ class TestReverseBytesExplicitWidth:
         assert reverse_bytes(b"\x01\x00\x00\x00\x00\x00\x00\x00", bit_width=64) == b"\x00\x00\x00\x00\x00\x00\x00\x80"
 
     def test_explicit_width_mismatch(self) -> None:
-        """Test error when bit_width doesn't match value length."""
+        """Test error when the value length is not a multiple of bit_width."""
         with pytest.raises(ValueError, match="does not match"):
             reverse_bytes(b"\x01", bit_width=16)
         with pytest.raises(ValueError, match="does not match"):
-            reverse_bytes(b"\x01\x00", bit_width=8)
+            reverse_bytes(b"\x01\x02\x03", bit_width=16)
         with pytest.raises(ValueError, match="does not match"):
-            reverse_bytes(b"\x01\x00\x00\x00", bit_width=16)
+            reverse_bytes(b"\x01\x00\x00\x00\x00\x00", bit_width=32)
 
-    def test_explicit_width_invalid_combination(self) -> None:
-        """Test error for invalid bit_width with non-standard length."""
-        with pytest.raises(ValueError, match="does not match"):
-            reverse_bytes(b"\x01\x02\x03", bit_width=8)
-        with pytest.raises(ValueError, match="does not match"):
-            reverse_bytes(b"\x01\x02\x03", bit_width=16)
+    def test_explicit_width_multiple_words(self) -> None:
+        """Test that every word is reversed when the value holds several words."""
+        assert reverse_bytes(b"\x01\x00", bit_width=8) == b"\x80\x00"
+        assert reverse_bytes(b"\x01\x02\x03", bit_width=8) == b"\x80\x40\xc0"
+        assert reverse_bytes(b"\x01\x00\x00\x00", bit_width=16) == b"\x00\x80\x00\x00"
+        assert reverse_bytes(b"\x12\x34\x56\x78" * 3, bit_width=32) == b"\x1e\x6a\x2c\x48" * 3
+
+    def test_explicit_width_unsupported(self) -> None:
+        """Test error for widths that are not 8, 16, 32 or 64 bits."""
+        with pytest.raises(ValueError, match="Unsupported bit_width"):
+            reverse_bytes(b"\x01\x02\x03", bit_width=24)  # type: ignore[arg-type]
 
 
 class TestReverseBytesRangeErrors:
@@ -260,3 +292,639 @@ def test_reverse_byte_parametrized(input_val: int, expected: int) -> None:
 def test_reverse_bytes_parametrized(input_bytes: bytes, expected_bytes: bytes) -> None:
     """Parametrized test for reverse_bytes with various patterns."""
     assert reverse_bytes(input_bytes) == expected_bytes
+
+
+class TestInverseBytesInplace:
+    """Tests for the native in-place reversal."""
+
+    def test_bytearray(self) -> None:
+        """Test in-place reversal of a bytearray."""
+        buffer = bytearray(b"\x01\x02\x03")
+        assert inverse_bytes_inplace(buffer) is None
+        assert buffer == b"\x80\x40\xc0"
+
+    def test_memoryview_slice(self) -> None:
+        """Test that only the viewed part of a buffer is modified."""
+        buffer = bytearray(b"\x01\x01\x01\x01")
+        inverse_bytes_inplace(memoryview(buffer)[1:3])
+        assert buffer == b"\x01\x80\x80\x01"
+
+    def test_read_only(self) -> None:
+        """Test error for read-only buffers."""
+        with pytest.raises(TypeError, match="read-only"):
+            inverse_bytes_inplace(b"\x01")
+
+    def test_typed_array(self) -> None:
+        """Test that the element format of the buffer is ignored."""
+        buffer = array.array("H", [0x0201, 0x0403])
+        inverse_bytes_inplace(buffer)
+        assert buffer.tobytes() == b"\x80\x40\xc0\x20"
+
+    def test_empty(self) -> None:
+        """Test in-place reversal of an empty buffer."""
+        buffer = bytearray()
+        inverse_bytes_inplace(buffer)
+        assert buffer == b""
+
+
+class TestInverseBytesOut:
+    """Tests for the native reversal into a caller-provided buffer."""
+
+    def test_any_buffer_input(self) -> None:
+        """Test that any buffer is accepted as input."""
+        assert inverse_bytes(bytearray(b"\x01\x02")) == b"\x80\x40"
+        assert inverse_bytes(memoryview(b"\x00\x01\x02")[1:]) == b"\x80\x40"
+
+    def test_out_bytearray(self) -> None:
+        """Test writing into a caller-provided bytearray."""
+        out = bytearray(3)
+        assert inverse_bytes(b"\x01\x02\x03", out) is out
+        assert out == b"\x80\x40\xc0"
+
+    def test_out_keyword_typed_array(self) -> None:
+        """Test writing into a typed array through the out keyword."""
+        out = array.array("I", [0])
+        inverse_bytes(b"\x01\x02\x03\x04", out=out)
+        assert out.tobytes() == b"\x80\x40\xc0\x20"
+
+    def test_out_same_buffer(self) -> None:
+        """Test that passing the input as out reverses it in place."""
+        buffer = bytearray(b"\x01\x02\x03")
+        assert inverse_bytes(buffer, out=buffer) is buffer
+        assert buffer == b"\x80\x40\xc0"
+
+    def test_out_length_mismatch(self) -> None:
+        """Test error when out has a different length."""
+        with pytest.raises(ValueError, match="does not match"):
+            inverse_bytes(b"\x01\x02\x03", out=bytearray(2))
+
+    def test_out_overlap(self) -> None:
+        """Test error when out partially overlaps the input."""
+        buffer = bytearray(4)
+        view = memoryview(buffer)
+        with pytest.raises(ValueError, match="overlaps"):
+            inverse_bytes(view[:3], out=view[1:])
+
+    def test_out_read_only(self) -> None:
+        """Test error when out is read-only."""
+        with pytest.raises(TypeError, match="read-only"):
+            inverse_bytes(b"\x01", out=b"\x00")
+
+    def test_large_buffer(self) -> None:
+        """Test a buffer large enough to be processed without the GIL."""
+        data = bytes(range(256)) * 1024
+        out = bytearray(len(data))
+        inverse_bytes(data, out=out)
+        assert out == inverse_bytes(data)
+        assert bytes(inverse_bytes(out)) == data
+
+
+class TestReverseWords:
+    """Tests for batched word reversal."""
+
+    @pytest.mark.parametrize("bit_width", [8, 16, 32, 64])
+    def test_matches_reverse_bytes(self, bit_width: int) -> None:
+        """Test that every word is reversed like a single reverse_bytes call."""
+        size = bit_width // 8
+        data = bytes(range(64))
+        expected = b"".join(reverse_bytes(data[i : i + size]) for i in range(0, len(data), size))
+        assert reverse_words(data, bit_width) == expected
+
+    def test_typed_array(self) -> None:
+        """Test reversing a native array of 32-bit words."""
+        words = array.array("I", [0x00000001, 0x80000000, 0x12345678])
+        result = array.array("I", reverse_words(words, 32))
+        assert list(result) == [0x80000000, 0x00000001, 0x1E6A2C48]
+
+    def test_empty(self) -> None:
+        """Test reversing an empty buffer."""
+        assert reverse_words(b"", 64) == b""
+
+    def test_out_in_place(self) -> None:
+        """Test reversing a typed array in place through out."""
+        words = array.array("H", [0x0001, 0x1234])
+        inverse_words(words, 16, out=words)
+        assert list(words) == [0x8000, 0x2C48]
+
+    def test_length_not_multiple(self) -> None:
+        """Test error when the length is not a whole number of words."""
+        with pytest.raises(ValueError, match="not a multiple"):
+            reverse_words(b"\x01\x02\x03", 16)
+
+    def test_unsupported_width(self) -> None:
+        """Test error for unsupported bit widths."""
+        with pytest.raises(ValueError, match="Unsupported bit_width"):
+            reverse_words(b"\x01\x02\x03", 24)
+
+
+def _reversed_words(data: bytes, size: int) -> bytes:
+    """Reference result of reversing every ``size``-byte word of ``data``."""
+    return b"".join(bytes(reverse_byte(b) for b in data[i : i + size][::-1]) for i in range(0, len(data), size))
+
+
+class TestVectorKernels:
+    """Tests for the vectorized kernels behind inverse_bytes and inverse_words."""
+
+    DATA = bytes((i * 167 + 13) % 256 for i in range(1024))
+
+    def test_active_kernel(self) -> None:
+        """Test that a kernel for the running CPU was selected."""
+        assert active_kernel() in available_kernels()
+
+    @pytest.mark.parametrize("bit_width", [8, 16, 32, 64])
+    def test_lengths_and_offsets(self, bit_width: int) -> None:
+        """Test lengths around the vector widths at unaligned offsets."""
+        size = bit_width // 8
+        view = memoryview(self.DATA)
+        for offset in range(4):
+            for length in range(0, 100, size):
+                chunk = view[offset : offset + length]
+                assert inverse_words(chunk, bit_width) == _reversed_words(bytes(chunk), size)
+
+    @pytest.mark.parametrize("bit_width", [8, 16, 32, 64])
+    def test_in_place(self, bit_width: int) -> None:
+        """Test vectorized reversal when the output is the input."""
+        buffer = bytearray(self.DATA)
+        inverse_words(buffer, bit_width, out=buffer)
+        assert buffer == _reversed_words(self.DATA, bit_width // 8)
+
+
+class TestKernelRegistry:
+    """Tests for listing, forcing and calibrating the kernels."""
+
+    @pytest.fixture(autouse=True)
+    def _restore(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+        """Keep the cache of the user untouched and restore the calibrated kernels."""
+        monkeypatch.setenv("REVBITS_CACHE_DIR", str(tmp_path))
+        yield
+        set_kernel(None)
+
+    @staticmethod
+    def _python(code: str, **env: str) -> str:
+        return subprocess.run(  # noqa: S603
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, env={**os.environ, **env}
+        ).stdout.strip()
+
+    def test_available(self) -> None:
+        """Test that the table and swap-and-mask kernels exist everywhere."""
+        kernels = available_kernels()
+        assert kernels[:3] == ["lut8", "lut16", "portable"]
+        assert set(kernel_selection().values()) <= set(kernels)
+        assert list(kernel_selection()) == ["small", "medium", "large"]
+
+    @pytest.mark.parametrize("kernel", available_kernels())
+    def test_forced_kernel(self, kernel: str) -> None:
+        """Test every kernel on all widths, lengths and alignments."""
+        set_kernel(kernel)
+        assert active_kernel() == kernel
+        view = memoryview(TestVectorKernels.DATA)
+        for bit_width in (8, 16, 32, 64):
+            size = bit_width // 8
+            for offset in range(4):
+                for length in range(0, 100, size):
+                    chunk = view[offset : offset + length]
+                    assert inverse_words(chunk, bit_width) == _reversed_words(bytes(chunk), size)
+
+    def test_size_class(self) -> None:
+        """Test forcing the kernel of one size class only."""
+        before = kernel_selection()
+        set_kernel("lut8", "small")
+        assert active_kernel(100) == "lut8"
+        assert active_kernel(1 << 20) == before["large"]
+        assert inverse_bytes(b"\x01\x02") == b"\x80\x40"
+        set_kernel(None, "small")
+        assert kernel_selection() == before
+
+    @pytest.mark.parametrize(
+        ("name", "size_class", "message"),
+        [("missing", None, "Unknown kernel 'missing'"), ("lut8", "huge", "Unknown size class 'huge'")],
+    )
+    def test_invalid(self, name: str, size_class: str | None, message: str) -> None:
+        """Test errors for unknown kernels and size classes."""
+        with pytest.raises(ValueError, match=message):
+            set_kernel(name, size_class)  # type: ignore[arg-type]
+
+    def test_calibrate(self, tmp_path: Path) -> None:
+        """Test that a calibration is applied and written to the cache."""
+        set_kernel("lut8")
+        selection = calibrate_kernels()
+        assert kernel_selection() == selection
+        assert kernel_cache_path() == str(tmp_path / "kernels.tsv")
+        lines = (tmp_path / "kernels.tsv").read_text().splitlines()
+        assert lines[0].startswith("#")
+        assert lines[1].split("\t")[1:] == list(selection.values())
+
+    def test_no_cache(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an empty REVBITS_CACHE_DIR disables the cache."""
+        monkeypatch.setenv("REVBITS_CACHE_DIR", "")
+        assert kernel_cache_path() is None
+        with pytest.raises(OSError, match="cache"):
+            calibrate_kernels()
+        assert set(calibrate_kernels(save=False).values()) <= set(available_kernels())
+
+    def test_cached_selection(self, tmp_path: Path) -> None:
+        """Test that later processes use the cached selection instead of calibrating."""
+        code = "import revbits; print(*revbits.kernel_selection().values())"
+        self._python(code, REVBITS_CACHE_DIR=str(tmp_path))
+        cache = tmp_path / "kernels.tsv"
+        header, entry = cache.read_text().splitlines()
+        cache.write_text(f"{header}\n{entry.split(chr(9))[0]}\tlut8\tlut16\tportable\n")
+
+        assert self._python(code, REVBITS_CACHE_DIR=str(tmp_path)) == "lut8 lut16 portable"
+
+    def test_deferred_calibration(self, tmp_path: Path) -> None:
+        """Test that a process reversing only small buffers neither calibrates nor writes the cache."""
+        small = "import revbits; revbits.reverse_bytes(bytes(5)); print(revbits.active_kernel(100))"
+        assert self._python(small, REVBITS_CACHE_DIR=str(tmp_path)) in available_kernels()
+        assert not (tmp_path / "kernels.tsv").exists()
+
+        self._python("import revbits; revbits.active_kernel(1 << 20)", REVBITS_CACHE_DIR=str(tmp_path))
+        assert (tmp_path / "kernels.tsv").exists()
+
+    def test_environment(self) -> None:
+        """Test that REVBITS_KERNEL forces a kernel for all sizes."""
+        code = "import revbits; print(*revbits.kernel_selection().values())"
+        assert self._python(code, REVBITS_KERNEL="lut16") == "lut16 lut16 lut16"
+
+
+class TestParallel:
+    """Tests for multi-threaded processing of large buffers."""
+
+    DATA = bytes((i * 131 + 7) % 256 for i in range(100_000))
+
+    @pytest.fixture(autouse=True)
+    def _small_threshold(self) -> Iterator[None]:
+        threshold = get_parallel_threshold()
+        set_parallel_threshold(1024)
+        yield
+        set_parallel_threshold(threshold)
+        set_num_threads(0)
+
+    @pytest.mark.parametrize("threads", [0, 2, 3, 16])
+    def test_bytes_identical_to_serial(self, threads: int) -> None:
+        """Test that parallel results are identical to the serial path."""
+        assert inverse_bytes(self.DATA, threads=threads) == inverse_bytes(self.DATA, threads=1)
+
+    @pytest.mark.parametrize("bit_width", [8, 16, 32, 64])
+    def test_words_identical_to_serial(self, bit_width: int) -> None:
+        """Test that parallel word reversal does not split words."""
+        data = self.DATA[:99_992]
+        assert reverse_words(data, bit_width, threads=7) == reverse_words(data, bit_width, threads=1)
+
+    def test_in_place(self) -> None:
+        """Test parallel in-place reversal."""
+        buffer = bytearray(self.DATA)
+        inverse_bytes_inplace(buffer, threads=4)
+        assert buffer == inverse_bytes(self.DATA, threads=1)
+
+    def test_out(self) -> None:
+        """Test parallel reversal into an output buffer."""
+        out = bytearray(len(self.DATA))
+        inverse_bytes(self.DATA, out=out, threads=4)
+        assert out == inverse_bytes(self.DATA, threads=1)
+
+    def test_huge_thread_count(self) -> None:
+        """Test that thread counts far above the CPU count are capped, also from concurrent callers."""
+        set_parallel_threshold(0)
+        expected = inverse_bytes(self.DATA, threads=1)
+        assert inverse_bytes(self.DATA, threads=10**6) == expected
+        set_num_threads(10**6)
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda _: inverse_bytes(self.DATA), range(16)))
+        assert results == [expected] * 16
+
+    def test_default_threads(self) -> None:
+        """Test setting and resetting the default thread count."""
+        set_num_threads(3)
+        assert get_num_threads() == 3
+        set_num_threads(0)
+        assert get_num_threads() >= 1
+
+    def test_threshold(self) -> None:
+        """Test reading back the parallel threshold."""
+        set_parallel_threshold(4096)
+        assert get_parallel_threshold() == 4096
+
+    def test_negative_threads(self) -> None:
+        """Test that negative thread counts are rejected."""
+        with pytest.raises(OverflowError):
+            set_num_threads(-1)
+
+
+def _reverse_bits_reference(value: int, width: int) -> int:
+    return int(f"{value:0{width}b}"[::-1], 2)
+
+
+class TestReverseBits:
+    """Tests for arbitrary-width integer reversal."""
+
+    @pytest.mark.parametrize("width", [1, 5, 8, 12, 24, 48, 63, 64, 65, 128, 129, 4096])
+    def test_matches_reference(self, width: int) -> None:
+        """Test widths below, at and above the machine word size."""
+        for value in (0, 1, 2**width - 1, (0x9E3779B97F4A7C15 * 2**width // 3) % 2**width):
+            assert reverse_bits(value, width) == _reverse_bits_reference(value, width)
+
+    def test_fixed_widths(self) -> None:
+        """Test that fixed widths agree with the word functions."""
+        assert reverse_bits(0x0001, 16) == 0x8000
+        assert reverse_bits(0x04C11DB7, 32) == 0xEDB88320
+        assert reverse_bits(0x42F0E1EBA9EA3693, 64) == 0xC96C5795D7870F42
+
+    def test_symmetric(self) -> None:
+        """Test that reversing twice gives the original value."""
+        value = 3**2000
+        width = value.bit_length() + 3
+        assert reverse_bits(reverse_bits(value, width), width) == value
+
+    def test_leading_zeros(self) -> None:
+        """Test that bits above the value become trailing zeros."""
+        assert reverse_bits(1, 100) == 1 << 99
+
+    @pytest.mark.parametrize(("value", "width"), [(32, 5), (-1, 8), (1 << 200, 200)])
+    def test_out_of_range(self, value: int, width: int) -> None:
+        """Test error for values that do not fit in the width."""
+        with pytest.raises(ValueError, match="out of range"):
+            reverse_bits(value, width)
+
+    def test_zero_width(self) -> None:
+        """Test error for a zero width."""
+        with pytest.raises(ValueError, match="at least 1"):
+            reverse_bits(0, 0)
+
+
+class TestReverseBuffer:
+    """Tests for reverse_buffer with an explicit mode."""
+
+    @pytest.mark.parametrize("length", [1, 2, 4, 5, 8, 100])
+    def test_byte_mode(self, length: int) -> None:
+        """Test that the byte mode does not depend on the length."""
+        data = bytes(range(1, length + 1))
+        assert reverse_buffer(data, "byte") == bytes(reverse_byte(b) for b in data)
+
+    def test_word_mode(self) -> None:
+        """Test reversing a long buffer of 32-bit words in one call."""
+        data = b"\x12\x34\x56\x78" * 1000
+        assert reverse_buffer(data, "word", bit_width=32) == b"\x1e\x6a\x2c\x48" * 1000
+
+    @pytest.mark.parametrize("length", [0, 1, 3, 8, 15, 16, 17, 100])
+    def test_whole_mode(self, length: int) -> None:
+        """Test that the whole mode mirrors the entire bit sequence."""
+        data = bytes((i * 37 + 5) % 256 for i in range(length))
+        expected = int(f"{int.from_bytes(data, 'big'):0{length * 8}b}"[::-1], 2) if length else 0
+        assert reverse_buffer(data, "whole") == expected.to_bytes(length, "big")
+
+    def test_whole_mode_in_place(self) -> None:
+        """Test inverse_whole writing into its own input."""
+        buffer = bytearray(range(50))
+        inverse_whole(buffer, out=buffer)
+        assert buffer == reverse_buffer(bytes(range(50)), "whole")
+
+    def test_auto_mode(self) -> None:
+        """Test that the auto mode keeps the length-based selection."""
+        assert reverse_buffer(b"\x01\x00", "auto") == reverse_bytes(b"\x01\x00")
+        assert reverse_buffer(b"\x01\x00\x00", "auto") == b"\x80\x00\x00"
+
+    def test_word_mode_requires_bit_width(self) -> None:
+        """Test error when the word mode has no bit_width."""
+        with pytest.raises(ValueError, match="requires a bit_width"):
+            reverse_buffer(b"\x01\x02", "word")
+
+    def test_bit_width_rejected(self) -> None:
+        """Test error when a mode without words gets a bit_width."""
+        with pytest.raises(ValueError, match="does not take a bit_width"):
+            reverse_buffer(b"\x01\x02", "whole", bit_width=16)
+
+    def test_unknown_mode(self) -> None:
+        """Test error for unknown modes."""
+        with pytest.raises(ValueError, match="Unknown mode"):
+            reverse_buffer(b"\x01", "nibble")  # type: ignore[arg-type]
+
+
+def permuted(data: bytes, item_size: int, log2n: int) -> bytes:
+    """Reorder the items of ``data`` into bit-reversed index order, one at a time."""
+    items = [data[i : i + item_size] for i in range(0, len(data), item_size)]
+    return b"".join(items[reverse_bits(i, log2n)] if log2n else items[i] for i in range(len(items)))
+
+
+class TestBitrevPermute:
+    """Tests for the in-place bit-reversal permutation."""
+
+    def test_indices(self) -> None:
+        """Test the order of eight one-byte items."""
+        buffer = bytearray(range(8))
+        assert bitrev_permute(buffer, 1, 3) is None
+        assert list(buffer) == [0, 4, 2, 6, 1, 5, 3, 7]
+
+    @pytest.mark.parametrize("item_size", [1, 2, 3, 4, 8, 16, 24])
+    @pytest.mark.parametrize("log2n", [0, 1, 5, 10, 13])
+    def test_matches_reference(self, item_size: int, log2n: int) -> None:
+        """Test item sizes with and without a dedicated path against the reference."""
+        data = bytes(i * 7 % 251 for i in range(item_size << log2n))
+        buffer = bytearray(data)
+        bitrev_permute(buffer, item_size, log2n)
+        assert buffer == permuted(data, item_size, log2n)
+
+    def test_involution(self) -> None:
+        """Test that permuting twice restores the original order."""
+        data = bytes(i % 256 for i in range(4 << 12))
+        buffer = bytearray(data)
+        bitrev_permute(buffer, 4, 12)
+        bitrev_permute(buffer, 4, 12)
+        assert buffer == data
+
+    def test_typed_array(self) -> None:
+        """Test that the element format of the buffer is ignored."""
+        buffer = array.array("I", range(4))
+        bitrev_permute(buffer, 4, 2)
+        assert buffer.tolist() == [0, 2, 1, 3]
+
+    def test_length_mismatch(self) -> None:
+        """Test error when the buffer does not hold 2**log2n items."""
+        with pytest.raises(ValueError, match="does not match"):
+            bitrev_permute(bytearray(10), 2, 3)
+        with pytest.raises(ValueError, match="does not match"):
+            bitrev_permute(bytearray(10), 1, 200)
+
+    def test_zero_item_size(self) -> None:
+        """Test error for items of zero bytes."""
+        with pytest.raises(ValueError, match="at least 1"):
+            bitrev_permute(bytearray(), 0, 3)
+
+    def test_read_only(self) -> None:
+        """Test error for read-only buffers."""
+        with pytest.raises(TypeError, match="read-only"):
+            bitrev_permute(b"\x00\x01", 1, 1)
+
+
+def _bitstream_reference(data: bytes, nbits: int, bit_order: str) -> bytes:
+    """Reverse the first nbits bits of data through a string of digits."""
+    digits = "".join(f"{byte:08b}" if bit_order == "msb" else f"{byte:08b}"[::-1] for byte in data)
+    digits = digits[:nbits][::-1].ljust(len(data) * 8, "0")
+    chunks = [digits[i : i + 8] for i in range(0, len(digits), 8)]
+    return bytes(int(chunk if bit_order == "msb" else chunk[::-1], 2) for chunk in chunks)
+
+
+class TestReverseBitstream:
+    """Tests for the reversal of bit sequences of any length."""
+
+    DATA = bytes((i * 167 + 13) % 256 for i in range(300))
+
+    @pytest.mark.parametrize("bit_order", ["msb", "lsb"])
+    @pytest.mark.parametrize("nbits", [0, 1, 7, 8, 9, 13, 63, 64, 65, 127, 1001, 2399, 2400])
+    def test_matches_reference(self, nbits: int, bit_order: str) -> None:
+        """Test lengths around byte and word boundaries in both bit orders."""
+        data = self.DATA[: (nbits + 7) // 8]
+        expected = _bitstream_reference(data, nbits, bit_order)
+        assert reverse_bitstream(data, nbits, bit_order=bit_order) == expected  # type: ignore[call-overload]
+
+    def test_examples(self) -> None:
+        """Test sequences small enough to check by hand."""
+        # 1100 1010 1 -> 1 0101 0011
+        assert reverse_bitstream(b"\xca\x80", 9) == b"\xa9\x80"
+        assert reverse_bitstream(b"\x01", 3, bit_order="lsb") == b"\x04"
+
+    def test_whole_bytes(self) -> None:
+        """Test that a whole number of bytes is a whole-buffer reversal."""
+        assert reverse_bitstream(self.DATA, len(self.DATA) * 8) == inverse_whole(self.DATA)
+
+    def test_padding_ignored(self) -> None:
+        """Test that the padding bits of the input do not reach the result."""
+        assert reverse_bitstream(b"\x12\x3f", 12) == reverse_bitstream(b"\x12\x30", 12)
+
+    def test_involution(self) -> None:
+        """Test that reversing twice restores a sequence with clear padding."""
+        # A 13,337-bit capture fills 1668 bytes, the last one with a single bit
+        nbits = 13_337
+        data = (self.DATA * 6)[:1667] + b"\x80"
+        assert reverse_bitstream(reverse_bitstream(data, nbits), nbits) == data
+
+    def test_out(self) -> None:
+        """Test writing into a separate buffer and in place."""
+        data = bytearray(self.DATA[:100])
+        expected = _bitstream_reference(bytes(data), 797, "msb")
+        target = bytearray(100)
+        assert reverse_bitstream(data, 797, target) is target
+        assert target == expected
+        assert reverse_bitstream(data, 797, data) is data
+        assert data == expected
+
+    def test_length_mismatch(self) -> None:
+        """Test error when the buffer does not hold exactly nbits bits."""
+        with pytest.raises(ValueError, match="does not match 16 bits"):
+            reverse_bitstream(b"\x00", 16)
+        with pytest.raises(ValueError, match="does not match 7 bits"):
+            reverse_bitstream(b"\x00\x00", 7)
+
+    def test_unknown_bit_order(self) -> None:
+        """Test error for an unknown bit order."""
+        with pytest.raises(ValueError, match="Unknown bit order 'big'"):
+            reverse_bitstream(b"\x00", 8, bit_order="big")  # type: ignore[call-overload]
+
+
+def _chain_reference(ops: list[str], data: bytes, offset: int = 0) -> bytes:
+    """Apply the operations one after another, one byte at a time."""
+    for op in ops:
+        if op == "reverse":
+            data = inverse_bytes(data)
+        elif op == "invert":
+            data = bytes(byte ^ 0xFF for byte in data)
+        elif op.startswith("swap"):
+            step = int(op[4:]) // 8 - 1
+            data = bytes(data[i ^ step] for i in range(len(data)))
+        else:
+            key = bytes.fromhex(op.removeprefix("xor:"))
+            data = bytes(byte ^ key[(offset + i) % len(key)] for i, byte in enumerate(data))
+    return data
+
+
+class TestTransformChain:
+    """Tests for chains of operations applied in one pass."""
+
+    DATA = bytes((i * 167 + 13) % 256 for i in range(4096 + 40))
+
+    @pytest.mark.parametrize(
+        "ops",
+        [
+            "reverse",
+            "invert",
+            "swap64",
+            "reverse,swap32",
+            "swap16,reverse,xor:5a",
+            "reverse,swap32,xor:deadbeef,invert",
+            "xor:0102030405,swap64,reverse",
+            "swap16,swap32",
+            "invert,reverse,invert",
+        ],
+    )
+    def test_matches_reference(self, ops: str) -> None:
+        """Test that a chain equals its operations applied one by one."""
+        chain = TransformChain(ops)
+        expected = _chain_reference(ops.split(","), self.DATA)
+        assert chain.apply(self.DATA) == expected
+
+    def test_word_reversal(self) -> None:
+        """Test that a bit reversal followed by a byte swap reverses whole words."""
+        assert TransformChain("reverse,swap32").apply(self.DATA) == inverse_words(self.DATA, 32)
+        assert TransformChain(["swap64", "reverse"]).apply(self.DATA) == inverse_words(self.DATA, 64)
+
+    def test_offset(self) -> None:
+        """Test that chunks transformed at their offsets equal the whole buffer."""
+        chain = TransformChain("swap32,xor:00112233445566,invert")
+        expected = chain.apply(self.DATA)
+        chunks = [chain.apply(self.DATA[i : i + 1000], offset=i) for i in range(0, len(self.DATA), 1000)]
+        assert b"".join(chunks) == expected
+        assert chain.apply(self.DATA[12:], offset=12) == expected[12:]
+
+    def test_out(self) -> None:
+        """Test writing into a separate buffer and in place."""
+        chain = TransformChain("reverse,xor:0f")
+        data = bytearray(self.DATA)
+        expected = chain.apply(self.DATA)
+        target = bytearray(len(data))
+        assert chain.apply(data, target) is target
+        assert target == expected
+        assert chain.apply(data, out=data) is data
+        assert data == expected
+
+    def test_threads(self) -> None:
+        """Test that chunks split across threads keep the phase of the XOR key."""
+        data = bytes((i * 31 + 7) % 256 for i in range(1 << 20))
+        chain = TransformChain("swap64,reverse,xor:a1b2c3")
+        previous = get_parallel_threshold()
+        set_parallel_threshold(1024)
+        try:
+            assert chain.apply(data, threads=3) == chain.apply(data, threads=1)
+        finally:
+            set_parallel_threshold(previous)
+
+    def test_properties(self) -> None:
+        """Test the canonical operations, block size and repr."""
+        chain = TransformChain(" Reverse, SWAP32 ,xor:0xFF00")
+        assert chain.ops == ("reverse", "swap32", "xor:ff00")
+        assert chain.block_size == 4
+        assert repr(chain) == "TransformChain('reverse,swap32,xor:ff00')"
+        assert TransformChain("swap16,swap32").block_size == 4
+        assert TransformChain("xor:12,invert").block_size == 1
+
+    @pytest.mark.parametrize(
+        ("ops", "message"),
+        [
+            ("rotate", "Unknown operation 'rotate'"),
+            ("reverse,", "Unknown operation ''"),
+            ("xor:abc", "Invalid XOR key"),
+            ("xor:zz", "Invalid XOR key"),
+            ([], "at least one operation"),
+        ],
+    )
+    def test_invalid(self, ops: str | list[str], message: str) -> None:
+        """Test errors for invalid chains."""
+        with pytest.raises(ValueError, match=message):
+            TransformChain(ops)
+
+    def test_block_multiple(self) -> None:
+        """Test errors for lengths and offsets that split a word of a byte swap."""
+        chain = TransformChain("swap64")
+        with pytest.raises(ValueError, match="Buffer length 12 is not a multiple"):
+            chain.apply(bytes(12))
+        with pytest.raises(ValueError, match="Offset 4 is not a multiple"):
+            chain.apply(bytes(8), offset=4)
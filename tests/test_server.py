@@ -0,0 +1,310 @@
+"""Tests for the local job server and its client."""
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from revbits._core import inverse_bytes, inverse_words
+from revbits.server import JobServer, ProtocolError, Response, client_main, create_server, request
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="requires Unix domain sockets")
+
+
+def _start(socket_path: Path, idle_timeout: float | None) -> tuple[JobServer, threading.Thread]:
+    server = create_server(socket_path, idle_timeout)
+    thread = threading.Thread(target=server.serve_until_idle, args=(0.05,))
+    thread.start()
+    return server, thread
+
+
+@pytest.fixture
+def server(tmp_path: Path) -> Iterator[JobServer]:
+    """A server on a thread of the test process, without idle timeout."""
+    server, thread = _start(tmp_path / "revbits.sock", None)
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+class TestJobs:
+    """Tests for jobs run through request."""
+
+    def test_file_job(self, server: JobServer, tmp_path: Path) -> None:
+        """Test that relative paths refer to the working directory of the client."""
+        (tmp_path / "input.bin").write_bytes(b"\x01\x02\x03\x04\x05")
+        response = request(server.socket_path, ["input.bin", "-o", "out/output.bin"], cwd=tmp_path)
+        assert response == Response(0, "", b"")
+        assert (tmp_path / "out" / "output.bin").read_bytes() == inverse_bytes(b"\x01\x02\x03\x04\x05")
+
+    def test_inline_payload(self, server: JobServer) -> None:
+        """Test that standard input and output are sent over the socket, also in more than one read."""
+        data = bytes(range(256)) * 8192
+        response = request(server.socket_path, ["-", "--mode", "word", "--bit-width", "32"], stdin=data)
+        assert response == Response(0, "", inverse_words(data, 32))
+
+    def test_compressed_payload(self, server: JobServer) -> None:
+        """Test codecs applied to inline payloads."""
+        import gzip  # noqa: PLC0415
+
+        data = bytes(range(256)) * 16
+        response = request(server.socket_path, ["-", "--input-codec", "gzip"], stdin=gzip.compress(data))
+        assert response.stdout == inverse_bytes(data)
+
+    def test_failed_input(self, server: JobServer, tmp_path: Path) -> None:
+        """Test that failed inputs give exit status 1 and the error report of the CLI."""
+        response = request(server.socket_path, ["missing.bin"], cwd=tmp_path)
+        assert response.exit_code == 1
+        assert response.stderr == (
+            "ERROR: Failed to reverse 1 of 1 input(s):\n"
+            f"ERROR:   {tmp_path / 'missing.bin'}: Input file does not exist\n"
+        )
+
+    @pytest.mark.parametrize(
+        ("argv", "message"),
+        [
+            (["a.bin", "--bit-order", "lsb"], "--bit-order requires --bits"),
+            (["a.bin", "--mode", "sideways"], "argument --mode: invalid choice"),
+            ([], "the following arguments are required: files"),
+            (["a.bin", "--version"], "--help and --version are not run by the server"),
+        ],
+    )
+    def test_invalid_arguments(self, server: JobServer, argv: list[str], message: str) -> None:
+        """Test that argument errors give exit status 2 and the usage of the CLI."""
+        response = request(server.socket_path, argv)
+        assert response.exit_code == 2
+        assert response.stderr.startswith("usage: revbits")
+        assert message in response.stderr
+
+    def test_stats(self, server: JobServer, tmp_path: Path) -> None:
+        """Test that the --stats report is part of the error output."""
+        (tmp_path / "input.bin").write_bytes(bytes(100))
+        response = request(server.socket_path, ["input.bin", "--stats-json"], cwd=tmp_path)
+        assert response.exit_code == 0
+        report = json.loads(response.stderr)
+        assert (report["files"], report["bytes"]) == (1, 100)
+
+    def test_concurrent_jobs(self, server: JobServer) -> None:
+        """Test jobs sent from many threads at once."""
+        inputs = [bytes((i * 7 + worker) % 256 for i in range(50_000)) for worker in range(8)]
+        with ThreadPoolExecutor(8) as executor:
+            responses = list(executor.map(lambda data: request(server.socket_path, ["-"], stdin=data), inputs))
+        assert [response.stdout for response in responses] == [inverse_bytes(data) for data in inputs]
+
+    def test_protocol_errors(self, server: JobServer) -> None:
+        """Test that malformed requests close the connection without stopping the server."""
+        for message in (b"not json\n", b'{"argv": "a.bin", "cwd": "/"}\n', b"[]\n"):
+            with socket.socket(socket.AF_UNIX) as connection:
+                connection.connect(str(server.socket_path))
+                connection.sendall(message)
+                assert connection.recv(1) == b""
+        assert request(server.socket_path, ["-"], stdin=b"\x01").stdout == b"\x80"
+
+    @pytest.mark.parametrize("size", ['"5"', "-1", "1e3", "true", str(10**12)])
+    def test_invalid_payload_size(self, server: JobServer, size: str) -> None:
+        """Test that payload sizes that are not a number of bytes within the limit close the connection."""
+        with socket.socket(socket.AF_UNIX) as connection:
+            connection.connect(str(server.socket_path))
+            connection.sendall(b'{"version": 1, "argv": ["-"], "cwd": "/"}\n')
+            with connection.makefile("rb") as file:
+                assert json.loads(file.readline()) == {"stdin": True, "size": 0}
+            connection.sendall(f'{{"size": {size}}}\n'.encode())
+            assert connection.recv(1) == b""
+        assert request(server.socket_path, ["-"], stdin=b"\x01").stdout == b"\x80"
+
+    def test_internal_error(self, server: JobServer, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an unexpected exception of a job is reported to the client with exit status 1."""
+
+        def fail(_: object) -> None:
+            msg = "boom"
+            raise RuntimeError(msg)
+
+        monkeypatch.setattr("revbits.cli.run", fail)
+        response = request(server.socket_path, ["-"], stdin=b"\x01")
+        assert response.exit_code == 1
+        assert "RuntimeError('boom')" in response.stderr
+        monkeypatch.undo()
+        assert request(server.socket_path, ["-"], stdin=b"\x01").stdout == b"\x80"
+
+    def test_version_mismatch(self, server: JobServer) -> None:
+        """Test that clients of another protocol version are rejected."""
+        with socket.socket(socket.AF_UNIX) as connection:
+            connection.connect(str(server.socket_path))
+            connection.sendall(b'{"version": 99, "argv": ["-"], "cwd": "/"}\n')
+            header = connection.makefile("rb").readline()
+        assert b'"exit_code": 2' in header
+        assert b"version 1 of the protocol" in header
+
+
+class TestServerLifetime:
+    """Tests for starting and stopping the server."""
+
+    def test_idle_timeout(self, tmp_path: Path) -> None:
+        """Test that the server stops and removes its socket after the idle timeout."""
+        socket_path = tmp_path / "revbits.sock"
+        server, thread = _start(socket_path, 0.3)
+        try:
+            for _ in range(3):
+                time.sleep(0.1)
+                assert request(socket_path, ["-"], stdin=b"\x01").stdout == b"\x80"
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+        finally:
+            server.server_close()
+        assert not socket_path.exists()
+        with pytest.raises(OSError, match=r"No such file|Connection refused"):
+            request(socket_path, ["-"])
+
+    def test_default_socket(self, tmp_path: Path) -> None:
+        """Test that the default socket is created in a directory of the user only, without XDG_RUNTIME_DIR."""
+        env = {key: value for key, value in os.environ.items() if key != "XDG_RUNTIME_DIR"}
+        env["TMPDIR"] = str(tmp_path)
+        directory = tmp_path / f"revbits-{os.getuid()}"
+        process = subprocess.Popen([sys.executable, "-m", "revbits", "serve", "--idle-timeout", "0.5"], env=env)
+        try:
+            deadline = time.monotonic() + 10
+            while not (directory / "revbits.sock").exists() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert directory.stat().st_mode & 0o777 == 0o700
+            assert process.wait(timeout=10) == 0
+        finally:
+            process.kill()
+
+        directory.chmod(0o755)
+        result = subprocess.run(
+            [sys.executable, "-m", "revbits", "serve"], env=env, capture_output=True, text=True, check=False
+        )
+        assert result.returncode == 1
+        assert "only the user can access" in result.stderr
+
+    def test_socket_permissions(self, server: JobServer) -> None:
+        """Test that only the owner may connect."""
+        assert server.socket_path.stat().st_mode & 0o777 == 0o600
+
+    def test_other_user_refused(self, server: JobServer, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that connections of processes of other users are closed without running a job."""
+        monkeypatch.setattr("revbits.server._peer_uid", lambda _: os.getuid() + 1)
+        with pytest.raises(ProtocolError):
+            request(server.socket_path, ["-"], stdin=b"\x01")
+        monkeypatch.undo()
+        assert request(server.socket_path, ["-"], stdin=b"\x01").stdout == b"\x80"
+
+    def test_already_running(self, server: JobServer) -> None:
+        """Test that a second server on the same socket is refused."""
+        with pytest.raises(FileExistsError, match="listening"):
+            create_server(server.socket_path)
+
+    def test_stale_socket(self, tmp_path: Path) -> None:
+        """Test that the socket of a server that no longer runs is replaced."""
+        socket_path = tmp_path / "revbits.sock"
+        with socket.socket(socket.AF_UNIX) as stale:
+            stale.bind(str(socket_path))
+        server, thread = _start(socket_path, None)
+        try:
+            assert request(socket_path, ["-"], stdin=b"\x03").stdout == b"\xc0"
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+
+    def test_not_a_socket(self, tmp_path: Path) -> None:
+        """Test that other files are not replaced."""
+        path = tmp_path / "revbits.sock"
+        path.write_text("data")
+        with pytest.raises(FileExistsError, match="not a socket"):
+            create_server(path)
+        assert path.read_text() == "data"
+
+
+class TestClient:
+    """Tests for revbits --server."""
+
+    def test_forward(
+        self, server: JobServer, monkeypatch: pytest.MonkeyPatch, capsysbinary: pytest.CaptureFixture[bytes]
+    ) -> None:
+        """Test that the client prints the output of the job and exits with its status."""
+        monkeypatch.setattr("sys.stdin", SimpleNamespace(buffer=io.BytesIO(b"\x01\x02")))
+        client_main(["-", "--server", str(server.socket_path)])
+        assert capsysbinary.readouterr().out == b"\x40\x80"
+
+        with pytest.raises(SystemExit) as exc_info:
+            client_main([f"--server={server.socket_path}", "missing.bin"])
+        assert exc_info.value.code == 1
+        assert b"Input file does not exist" in capsysbinary.readouterr().err
+
+    def test_refused(
+        self, server: JobServer, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that a connection closed by the server gives an error message and exit status 1."""
+        monkeypatch.setattr("revbits.server._peer_uid", lambda _: os.getuid() + 1)
+        with pytest.raises(SystemExit) as exc_info:
+            client_main(["missing.bin", "--server", str(server.socket_path)])
+        assert exc_info.value.code == 1
+        assert "revbits: error: Connection closed by the server\n" in capsys.readouterr().err
+
+    def test_local_fallback(self, tmp_path: Path) -> None:
+        """Test that jobs run locally when no server is listening."""
+        input_file = tmp_path / "input.bin"
+        input_file.write_bytes(b"\x01\x02\x03")
+        client_main([str(input_file), "-i", "--server", str(tmp_path / "missing.sock")])
+        assert input_file.read_bytes() == b"\x80\x40\xc0"
+
+    def test_thin_client(self, server: JobServer, tmp_path: Path) -> None:
+        """Test that a forwarded run does not import the CLI or the native module."""
+        input_file = tmp_path / "input.bin"
+        input_file.write_bytes(b"\x01\x02\x03")
+        code = (
+            "import sys; from revbits.__main__ import main; "
+            f"sys.argv = ['revbits', '--server', {str(server.socket_path)!r}, {str(input_file)!r}, '-i']; main(); "
+            "print([m for m in ('revbits.cli', 'revbits._core') if m in sys.modules])"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)  # noqa: S603
+        assert result.stdout.strip() == "[]"
+        assert input_file.read_bytes() == b"\x80\x40\xc0"
+
+    def test_serve_command(self, tmp_path: Path) -> None:
+        """Test revbits serve in a process of its own."""
+        socket_path = tmp_path / "revbits.sock"
+        process = subprocess.Popen(  # noqa: S603
+            [sys.executable, "-m", "revbits", "serve", "--socket", str(socket_path), "--idle-timeout", "0.5"]
+        )
+        try:
+            deadline = time.monotonic() + 10
+            while not socket_path.exists() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert request(socket_path, ["-"], stdin=b"\x01\x02").stdout == b"\x40\x80"
+            assert process.wait(timeout=10) == 0
+        finally:
+            process.kill()
+        assert not socket_path.exists()
+
+    def test_connection_closed(self, tmp_path: Path) -> None:
+        """Test that a server closing the connection before its response raises ProtocolError."""
+        socket_path = tmp_path / "closing.sock"
+        with socket.socket(socket.AF_UNIX) as listener:
+            listener.bind(str(socket_path))
+            listener.listen()
+
+            def accept_and_close() -> None:
+                connection, _ = listener.accept()
+                with connection, connection.makefile("rb") as file:
+                    file.readline()
+
+            thread = threading.Thread(target=accept_and_close)
+            thread.start()
+            with pytest.raises(ProtocolError):
+                request(socket_path, ["-"])
+            thread.join()
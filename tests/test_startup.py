@@ -0,0 +1,76 @@
+"""Tests for the import time of the package and the CLI."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import revbits
+
+STARTUP_BUDGET = 0.05
+"""Maximum cumulative import time of ``revbits.cli`` in seconds."""
+
+HEAVY_MODULES = ("loguru", "asyncio", "numpy", "concurrent.futures")
+
+
+def _run_python(code: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)  # noqa: S603
+
+
+def _import_seconds(module: str) -> float:
+    """Cumulative import time of ``module`` in a fresh interpreter, from ``-X importtime``."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.removeprefix("import time:").split("|")]
+        if fields[-1] == module:
+            return int(fields[1]) / 1e6
+    pytest.fail(f"{module} not found in the -X importtime output")
+
+
+class TestLazyImports:
+    """Tests for the lazy loading of modules."""
+
+    def test_cli_import(self) -> None:
+        """Test that importing the CLI loads none of the heavy modules."""
+        result = _run_python(f"import sys, revbits.cli; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])")
+        assert result.stdout.strip() == "[]"
+
+    def test_cli_run(self, tmp_path: Path) -> None:
+        """Test that a run without -v does not import loguru."""
+        input_file = tmp_path / "input.bin"
+        input_file.write_bytes(b"\x01\x02\x03")
+        code = (
+            "import sys; from revbits.cli import main; "
+            f"sys.argv = ['revbits', {str(input_file)!r}, '-i']; main(); "
+            "print('loguru' in sys.modules)"
+        )
+        assert _run_python(code).stdout.strip() == "False"
+        assert input_file.read_bytes() == b"\x80\x40\xc0"
+
+    def test_package_attributes(self) -> None:
+        """Test that the public names are resolved on first access."""
+        result = _run_python(
+            "import sys, revbits; before = 'revbits.aio' in sys.modules; revbits.areverse_file; "
+            "print(before, 'revbits.aio' in sys.modules)"
+        )
+        assert result.stdout.split() == ["False", "True"]
+        assert sorted(set(revbits.__all__) - set(dir(revbits))) == []
+        assert revbits.reverse_bytes(b"\x01") == b"\x80"
+
+    def test_unknown_attribute(self) -> None:
+        """Test that unknown names still raise AttributeError."""
+        with pytest.raises(AttributeError, match="no attribute 'missing'"):
+            revbits.missing  # noqa: B018
+
+
+@pytest.mark.benchmark
+class TestStartupBudget:
+    """Tests for the startup time budget, not part of the default run."""
+
+    def test_cli_import_time(self) -> None:
+        """Test that importing the CLI stays within the budget (best of three runs)."""
+        seconds = min(_import_seconds("revbits.cli") for _ in range(3))
+        assert seconds < STARTUP_BUDGET, f"revbits.cli took {seconds * 1000:.1f} ms to import"
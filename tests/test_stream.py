@@ -0,0 +1,357 @@
+"""Tests for chunked streaming reversal."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from revbits import Reverser, TransformChain
+from revbits.reverser import BitWidth, Mode, reverse_buffer, reverse_bytes
+from revbits.stream import (
+    INCOMPLETE_SUFFIX,
+    MIN_CHUNK_SIZE,
+    Range,
+    reverse_file_in_place,
+    reverse_stream,
+    transform_file_in_place,
+    transform_stream,
+)
+
+
+class TestReverseStream:
+    """Tests for reverse_stream function."""
+
+    def test_empty_input(self) -> None:
+        """Test that empty input writes nothing."""
+        destination = io.BytesIO()
+        assert reverse_stream(io.BytesIO(b""), destination) == 0
+        assert destination.getvalue() == b""
+
+    @pytest.mark.parametrize("length", [1, 2, 3, 4, 5, 8, 9, 16, 17, 100])
+    def test_matches_reverse_bytes(self, length: int) -> None:
+        """Test that streaming gives the same result as a single reverse_bytes call."""
+        data = bytes(range(length))
+        destination = io.BytesIO()
+        written = reverse_stream(io.BytesIO(data), destination, chunk_size=MIN_CHUNK_SIZE)
+        assert written == length
+        assert destination.getvalue() == reverse_bytes(data)
+
+    def test_multiple_chunks(self) -> None:
+        """Test input spanning many chunks, including a partial last chunk."""
+        data = bytes(range(256)) * 40 + b"\x01\x02\x03"
+        destination = io.BytesIO()
+        assert reverse_stream(io.BytesIO(data), destination, chunk_size=1000) == len(data)
+        assert destination.getvalue() == reverse_bytes(data)
+
+    def test_chunk_size_too_small(self) -> None:
+        """Test error for chunk sizes below the minimum."""
+        with pytest.raises(ValueError, match="too small"):
+            reverse_stream(io.BytesIO(b"\x01"), io.BytesIO(), chunk_size=MIN_CHUNK_SIZE - 1)
+
+
+class _ShortReads(io.RawIOBase):
+    """Unbuffered, non-seekable stream returning at most 3 bytes per read."""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: "memoryview | bytearray") -> int:  # type: ignore[override]
+        chunk = self._data.read(min(3, len(buffer)))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+class TestReverseStreamModes:
+    """Tests for reverse_stream with an explicit mode."""
+
+    DATA = bytes((i * 73 + 11) % 256 for i in range(1000))
+
+    @pytest.mark.parametrize(("mode", "bit_width"), [("byte", None), ("word", 16), ("word", 64), ("whole", None)])
+    def test_matches_reverse_buffer(self, mode: Mode, bit_width: BitWidth | None) -> None:
+        """Test that every mode gives the same result as a single reverse_buffer call."""
+        destination = io.BytesIO()
+        assert reverse_stream(io.BytesIO(self.DATA), destination, 24, mode, bit_width) == len(self.DATA)
+        assert destination.getvalue() == reverse_buffer(self.DATA, mode, bit_width)
+
+    def test_byte_mode_small_input(self) -> None:
+        """Test that the byte mode does not switch to word reversal for 4-byte inputs."""
+        destination = io.BytesIO()
+        reverse_stream(io.BytesIO(b"\x01\x00\x00\x00"), destination, mode="byte")
+        assert destination.getvalue() == b"\x80\x00\x00\x00"
+
+    def test_auto_mode_with_bit_width(self) -> None:
+        """Test that auto with a bit_width reverses every word like reverse_bytes."""
+        destination = io.BytesIO()
+        reverse_stream(io.BytesIO(self.DATA), destination, 8, bit_width=32)
+        assert destination.getvalue() == reverse_bytes(self.DATA, bit_width=32)
+
+    def test_word_mode_short_reads(self) -> None:
+        """Test words split across short reads of an unbuffered stream."""
+        destination = io.BytesIO()
+        reverse_stream(_ShortReads(self.DATA), destination, 16, "word", 32)
+        assert destination.getvalue() == reverse_buffer(self.DATA, "word", 32)
+
+    def test_whole_mode_not_seekable(self) -> None:
+        """Test the whole mode on a stream that cannot be read backwards."""
+        destination = io.BytesIO()
+        reverse_stream(_ShortReads(self.DATA), destination, 16, "whole")
+        assert destination.getvalue() == reverse_buffer(self.DATA, "whole")
+
+    def test_word_mode_partial_word(self) -> None:
+        """Test error when the input ends in the middle of a word."""
+        with pytest.raises(ValueError, match="not a multiple of bit_width 32"):
+            reverse_stream(io.BytesIO(b"\x01" * 10), io.BytesIO(), 8, "word", 32)
+
+
+class TestReverseFileRanges:
+    """Tests for reverse_file_in_place with ranges."""
+
+    DATA = bytes((i * 31 + 3) % 256 for i in range(200_000))
+
+    @pytest.fixture
+    def path(self, tmp_path: Path) -> Path:
+        """A file holding DATA."""
+        path = tmp_path / "image.bin"
+        path.write_bytes(self.DATA)
+        return path
+
+    def _expected(self, ranges: list[tuple[int, int]], mode: Mode, bit_width: BitWidth | None) -> bytes:
+        data = bytearray(self.DATA)
+        for offset, length in ranges:
+            data[offset : offset + length] = reverse_buffer(data[offset : offset + length], mode, bit_width)
+        return bytes(data)
+
+    @pytest.mark.parametrize(("mode", "bit_width"), [("auto", None), ("byte", None), ("word", 32), ("whole", None)])
+    @pytest.mark.parametrize(
+        "ranges",
+        [[(0, 4)], [(5, 8)], [(70_001, 4096 * 3 + 4)], [(12, 400), (65_536 * 2 + 7, 60_000), (199_996, 4)]],
+    )
+    def test_regions(self, path: Path, ranges: list[tuple[int, int]], mode: Mode, bit_width: BitWidth | None) -> None:
+        """Test that only the regions change, each as if it were a file of its own."""
+        written = reverse_file_in_place(path, 4096, mode, bit_width, ranges=ranges)
+        assert written == sum(length for _, length in ranges)
+        assert path.read_bytes() == self._expected(ranges, mode, bit_width)
+        assert not (path.parent / f"image.bin{INCOMPLETE_SUFFIX}").exists()
+
+    def test_to_end(self, path: Path) -> None:
+        """Test that a length of None extends to the end of the file."""
+        assert reverse_file_in_place(path, ranges=[(1000, None)]) == len(self.DATA) - 1000
+        assert path.read_bytes() == self._expected([(1000, len(self.DATA) - 1000)], "auto", None)
+
+    def test_empty(self, path: Path) -> None:
+        """Test that empty regions leave the file untouched."""
+        assert reverse_file_in_place(path, ranges=[]) == 0
+        assert reverse_file_in_place(path, ranges=[(100, 0), (len(self.DATA), None)]) == 0
+        assert path.read_bytes() == self.DATA
+
+    @pytest.mark.parametrize(
+        ("ranges", "message"),
+        [
+            ([(-1, 4)], "must not be negative"),
+            ([(0, -4)], "must not be negative"),
+            ([(199_999, 2)], "Range 199999:2 exceeds the file size of 200000 bytes"),
+            ([(200_001, None)], "Range 200001: exceeds"),
+            ([(100, 50), (0, 101)], "Ranges 0:101 and 100:50 overlap"),
+            ([(0, 6)], "not a multiple"),
+        ],
+    )
+    def test_invalid(self, path: Path, ranges: list[Range], message: str) -> None:
+        """Test that invalid regions are rejected before the file is modified."""
+        with pytest.raises(ValueError, match=message):
+            reverse_file_in_place(path, mode="word", bit_width=32, ranges=ranges)
+        assert path.read_bytes() == self.DATA
+        assert not (path.parent / f"image.bin{INCOMPLETE_SUFFIX}").exists()
+
+
+class TestReverser:
+    """Tests for the incremental Reverser object."""
+
+    @staticmethod
+    def _feed(reverser: Reverser, data: bytes, pieces: list[int]) -> bytes:
+        output = []
+        offset = 0
+        index = 0
+        while offset < len(data):
+            size = pieces[index % len(pieces)]
+            output.append(reverser.update(data[offset : offset + size]))
+            offset += size
+            index += 1
+        output.append(reverser.finalize())
+        return b"".join(output)
+
+    @pytest.mark.parametrize(
+        ("mode", "bit_width"),
+        [("auto", None), ("auto", 32), ("byte", None), ("word", 16), ("word", 64), ("whole", None)],
+    )
+    @pytest.mark.parametrize("length", [0, 1, 2, 8, 9, 64, 1000])
+    @pytest.mark.parametrize("pieces", [[1], [3, 5, 7], [1000]])
+    def test_matches_reverse_buffer(
+        self, mode: Mode, bit_width: BitWidth | None, length: int, pieces: list[int]
+    ) -> None:
+        """Test that any fragmentation gives the result of a single call."""
+        if bit_width and length % (bit_width // 8):
+            pytest.skip("not a whole number of words")
+        data = bytes(i * 37 % 256 for i in range(length))
+        assert self._feed(Reverser(mode, bit_width), data, pieces) == reverse_buffer(data, mode, bit_width)
+
+    def test_output_as_soon_as_words_complete(self) -> None:
+        """Test that complete words are returned immediately and the rest is carried."""
+        reverser = Reverser("word", 32)
+        assert reverser.update(b"\x01\x00\x00") == b""
+        assert reverser.pending == 3
+        assert reverser.update(b"\x00\x02\x00") == b"\x00\x00\x00\x80"
+        assert reverser.pending == 2
+        assert reverser.update(bytearray(b"\x00\x00")) == b"\x00\x00\x00\x40"
+        assert reverser.finalize() == b""
+
+    def test_whole_waits_for_end(self) -> None:
+        """Test that the whole mode returns everything from finalize."""
+        reverser = Reverser("whole")
+        assert reverser.update(b"\x01") == b""
+        assert reverser.update(memoryview(b"\x02\x03")) == b""
+        assert reverser.pending == 3
+        assert reverser.finalize() == b"\xc0\x40\x80"
+
+    def test_partial_word(self) -> None:
+        """Test that finalize rejects an incomplete last word."""
+        reverser = Reverser("word", 16)
+        assert reverser.update(b"\x01\x02\x03") == b"\x40\x80"
+        with pytest.raises(ValueError, match="not a multiple of bit_width 16"):
+            reverser.finalize()
+
+    def test_reusable(self) -> None:
+        """Test that finalize resets the object for the next stream."""
+        reverser = Reverser()
+        assert reverser.update(bytes(9)) == bytes(9)
+        assert reverser.finalize() == b""
+        assert reverser.update(b"\x01\x00") == b""
+        assert reverser.finalize() == b"\x00\x80"
+        assert (reverser.mode, reverser.bit_width) == ("auto", None)
+
+    @pytest.mark.parametrize(
+        ("mode", "bit_width", "message"),
+        [
+            ("bogus", None, "Unknown mode"),
+            ("word", None, "requires"),
+            ("byte", 8, "does not take"),
+            ("word", 24, "Unsupported"),
+        ],
+    )
+    def test_invalid(self, mode: str, bit_width: int | None, message: str) -> None:
+        """Test errors for invalid modes and bit widths."""
+        with pytest.raises(ValueError, match=message):
+            Reverser(mode, bit_width)  # type: ignore[arg-type]
+
+
+class TestReverseFileInPlace:
+    """Tests for reverse_file_in_place function."""
+
+    def test_small_file(self, tmp_path: Path) -> None:
+        """Test that a file fitting in one chunk keeps whole-word reversal."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"\x01\x00")
+        assert reverse_file_in_place(path) == 2
+        assert path.read_bytes() == b"\x00\x80"
+
+    def test_multiple_chunks(self, tmp_path: Path) -> None:
+        """Test in-place reversal of a file spanning several chunks."""
+        data = bytes(range(256)) * 10 + b"\x10"
+        path = tmp_path / "data.bin"
+        path.write_bytes(data)
+        assert reverse_file_in_place(path, chunk_size=300) == len(data)
+        assert path.read_bytes() == reverse_bytes(data)
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        """Test that an empty file is left untouched."""
+        path = tmp_path / "empty.bin"
+        path.write_bytes(b"")
+        assert reverse_file_in_place(path) == 0
+        assert path.read_bytes() == b""
+
+    def test_window_not_page_aligned(self, tmp_path: Path) -> None:
+        """Test that chunk sizes which are not a multiple of the page size work."""
+        data = bytes(range(256)) * 100
+        path = tmp_path / "data.bin"
+        path.write_bytes(data)
+        assert reverse_file_in_place(path, chunk_size=1000) == len(data)
+        assert path.read_bytes() == reverse_bytes(data)
+
+    def test_marker_removed(self, tmp_path: Path) -> None:
+        """Test that no marker file is left behind after a successful run."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"\x01\x02\x03")
+        reverse_file_in_place(path)
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_interrupted_run_detected(self, tmp_path: Path) -> None:
+        """Test that a marker from an interrupted run prevents another run."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"\x01\x02\x03")
+        (tmp_path / f"data.bin{INCOMPLETE_SUFFIX}").touch()
+        with pytest.raises(FileExistsError, match="interrupted"):
+            reverse_file_in_place(path)
+        assert path.read_bytes() == b"\x01\x02\x03"
+
+    @pytest.mark.parametrize(("mode", "bit_width"), [("byte", None), ("word", 32), ("whole", None)])
+    @pytest.mark.parametrize("length", [4, 4100, 3 * 4096 + 12])
+    def test_modes(self, tmp_path: Path, mode: Mode, bit_width: BitWidth | None, length: int) -> None:
+        """Test every mode on files smaller and larger than the window."""
+        data = bytes((i * 31 + 3) % 256 for i in range(length))
+        path = tmp_path / "data.bin"
+        path.write_bytes(data)
+        reverse_file_in_place(path, 4096, mode, bit_width)
+        assert path.read_bytes() == reverse_buffer(data, mode, bit_width)
+
+    def test_partial_word(self, tmp_path: Path) -> None:
+        """Test that a file with a partial word is rejected before it is modified."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"\x01\x02\x03")
+        with pytest.raises(ValueError, match="not a multiple"):
+            reverse_file_in_place(path, mode="word", bit_width=16)
+        assert path.read_bytes() == b"\x01\x02\x03"
+        assert not (tmp_path / f"data.bin{INCOMPLETE_SUFFIX}").exists()
+
+
+class TestTransform:
+    """Tests for transform_stream and transform_file_in_place."""
+
+    CHAIN = TransformChain("reverse,swap32,xor:0a0b0c0d0e")
+    DATA = bytes((i * 31 + 3) % 256 for i in range(3 * 4096 + 12))
+
+    def test_stream(self) -> None:
+        """Test that chunks continue the XOR key of the previous chunk."""
+        destination = io.BytesIO()
+        assert transform_stream(io.BytesIO(self.DATA), destination, self.CHAIN, chunk_size=1001) == len(self.DATA)
+        assert destination.getvalue() == self.CHAIN.apply(self.DATA)
+
+    def test_short_reads(self) -> None:
+        """Test that reads ending within a word are carried over."""
+        destination = io.BytesIO()
+        transform_stream(_ShortReads(self.DATA[:100]), destination, self.CHAIN, chunk_size=MIN_CHUNK_SIZE)
+        assert destination.getvalue() == self.CHAIN.apply(self.DATA[:100])
+
+    def test_stream_partial_block(self) -> None:
+        """Test error when the input ends within a word of the chain."""
+        with pytest.raises(ValueError, match="Input length 10 bytes is not a multiple of the block size"):
+            transform_stream(io.BytesIO(bytes(10)), io.BytesIO(), self.CHAIN)
+
+    @pytest.mark.parametrize("chunk_size", [1000, 4096, 1 << 20])
+    def test_file_in_place(self, tmp_path: Path, chunk_size: int) -> None:
+        """Test in-place transforms of files smaller and larger than the window."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(self.DATA)
+        assert transform_file_in_place(path, self.CHAIN, chunk_size) == len(self.DATA)
+        assert path.read_bytes() == self.CHAIN.apply(self.DATA)
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_file_in_place_partial_block(self, tmp_path: Path) -> None:
+        """Test that a file that is not a whole number of words is left untouched."""
+        path = tmp_path / "data.bin"
+        path.write_bytes(b"\x01\x02\x03")
+        with pytest.raises(ValueError, match="not a multiple of the block size"):
+            transform_file_in_place(path, self.CHAIN)
+        assert path.read_bytes() == b"\x01\x02\x03"
+        assert list(tmp_path.iterdir()) == [path]
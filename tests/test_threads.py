@@ -0,0 +1,162 @@
+"""Stress tests for calls made concurrently from many threads.
+
+On free-threaded interpreters (3.13t, 3.14t) these calls run in parallel
+without a GIL; on other builds they interleave wherever the GIL is released.
+"""
+
+import subprocess
+import sys
+import sysconfig
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pytest
+
+from revbits import instrument
+from revbits._core import (
+    Reverser,
+    TransformChain,
+    available_kernels,
+    get_parallel_threshold,
+    inverse_bytes,
+    inverse_bytes_inplace,
+    inverse_whole,
+    inverse_words,
+    kernel_selection,
+    reverse_bitstream,
+    set_kernel,
+    set_parallel_threshold,
+)
+from revbits.instrument import CallEvent, Hook, add_hook, remove_hook
+
+WORKERS = 8
+ROUNDS = 50
+
+FREE_THREADED = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+
+
+def _data(size: int, seed: int) -> bytes:
+    return bytes((i * 167 + seed) % 256 for i in range(size))
+
+
+def _run_together(task: Callable[[int], None], workers: int = WORKERS) -> None:
+    """Run ``task(worker)`` on ``workers`` threads that start at the same time."""
+    barrier = threading.Barrier(workers)
+
+    def run(worker: int) -> None:
+        barrier.wait()
+        task(worker)
+
+    with ThreadPoolExecutor(workers) as executor:
+        for future in [executor.submit(run, worker) for worker in range(workers)]:
+            future.result()
+
+
+class TestConcurrentCalls:
+    """Tests that concurrent calls on private buffers give the single-threaded results."""
+
+    @pytest.mark.parametrize("size", [100, 70_000, 300_000])
+    def test_transforms(self, size: int) -> None:
+        """Test every bulk transform from many threads, below and above the GIL release size."""
+        inputs = [_data(size, worker) for worker in range(WORKERS)]
+        chain = TransformChain("reverse,swap32,xor:5a3c")
+        expected = [
+            (inverse_bytes(data), inverse_words(data, 32), inverse_whole(data), chain.apply(data)) for data in inputs
+        ]
+
+        def task(worker: int) -> None:
+            data = inputs[worker]
+            for _ in range(ROUNDS // 5):
+                assert inverse_bytes(data) == expected[worker][0]
+                assert inverse_words(data, 32) == expected[worker][1]
+                assert inverse_whole(data) == expected[worker][2]
+                assert chain.apply(data) == expected[worker][3]
+                assert reverse_bitstream(data, size * 8) == expected[worker][2]
+                buffer = bytearray(data)
+                inverse_bytes_inplace(buffer)
+                assert buffer == expected[worker][0]
+
+        _run_together(task)
+
+    def test_split_across_threads(self) -> None:
+        """Test calls that each split their buffer across threads of their own."""
+        data = _data(1 << 20, 7)
+        expected = inverse_bytes(data, threads=1)
+        previous = get_parallel_threshold()
+        set_parallel_threshold(64 << 10)
+
+        def task(_: int) -> None:
+            for _ in range(5):
+                assert inverse_bytes(data, threads=4) == expected
+
+        try:
+            _run_together(task)
+        finally:
+            set_parallel_threshold(previous)
+
+    def test_reverser_per_thread(self) -> None:
+        """Test one Reverser per thread fed in small chunks."""
+        data = _data(10_000, 3)
+        expected = inverse_words(data, 64)
+
+        def task(_: int) -> None:
+            reverser = Reverser("word", 64)
+            for _ in range(ROUNDS // 10):
+                output = b"".join(reverser.update(data[i : i + 13]) for i in range(0, len(data), 13))
+                assert output + reverser.finalize() == expected
+
+        _run_together(task)
+
+    def test_kernel_switches(self) -> None:
+        """Test that switching kernels while other threads reverse keeps the results correct."""
+        data = _data(50_000, 11)
+        expected = inverse_bytes(data)
+        selection = kernel_selection()
+        kernels = available_kernels()
+
+        def task(worker: int) -> None:
+            for i in range(ROUNDS):
+                if worker == 0:
+                    set_kernel(kernels[i % len(kernels)])
+                else:
+                    assert inverse_bytes(data) == expected
+
+        try:
+            _run_together(task)
+        finally:
+            for size_class, kernel in selection.items():
+                set_kernel(kernel, size_class)  # type: ignore[arg-type]
+
+    def test_hooks(self) -> None:
+        """Test that concurrent hook changes are not lost."""
+        events: list[CallEvent] = []
+        # Distinct objects: bound methods of one object compare equal, partials do not
+        registered: list[Hook] = [partial(list.append, events) for _ in range(WORKERS)]
+
+        def task(worker: int) -> None:
+            for _ in range(ROUNDS):
+                add_hook(registered[worker])
+                remove_hook(registered[worker])
+            add_hook(registered[worker])
+
+        try:
+            _run_together(task)
+            assert sorted(map(id, instrument.hooks)) == sorted(map(id, registered))
+        finally:
+            for hook in registered:
+                remove_hook(hook)
+
+
+@pytest.mark.skipif(not FREE_THREADED, reason="requires a free-threaded interpreter")
+def test_gil_stays_disabled() -> None:
+    """Test that importing the native module does not enable the GIL again."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import revbits._core, sys; print(sys._is_gil_enabled())"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
+    assert "GIL" not in result.stderr